@@ -0,0 +1,335 @@
+"""
+AutoGen Core - Bounded Mailboxes and Priority Lanes
+Per-agent-type admission queues with backpressure for any in-process agent runtime
+
+SingleThreadedAgentRuntime starts a handler for every message as soon as it is
+delivered, so a flood of batch work competes equally with interactive requests.
+`MailboxRuntime` wraps a runtime and puts a mailbox in front of every agent type:
+
+- at most `concurrency` messages for the type are handled at once;
+- waiting messages queue in priority lanes (interactive ahead of batch, FIFO within a lane);
+- at most `capacity` messages wait; beyond that the overflow policy applies:
+  BLOCK (the sender waits for space), DROP_OLDEST (the oldest lowest-priority
+  message fails with MessageDroppedError) or REJECT (MailboxFullError).
+
+    runtime = MailboxRuntime(SingleThreadedAgentRuntime(), per_type={
+        "worker": MailboxConfig(capacity=16, concurrency=4, policy=OverflowPolicy.DROP_OLDEST),
+    })
+    await WorkerAgent.register(runtime, "worker", lambda: WorkerAgent(...))
+    runtime.start()
+    await runtime.send_message(task, AgentId("worker", "default"), priority=Priority.BATCH)
+
+Priority is taken from the `priority=` argument, else the message's own
+`priority` attribute, else inherited from the handler that is sending (so the
+work a batch task fans out stays batch), else INTERACTIVE. Agents registered
+through the wrapper send through it, so their nested messages are covered too.
+
+`stats()` reports queue depth, wait p50/p95 per lane, drops and rejections per agent type.
+"""
+
+import asyncio
+import contextvars
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum, IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Union
+
+from autogen_core import AgentId, AgentInstantiationContext, AgentType, CancellationToken, MessageContext
+
+
+class Priority(IntEnum):
+    """Mailbox lane; lower values are served first"""
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+class OverflowPolicy(str, Enum):
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    REJECT = "reject"
+
+
+class MailboxFullError(RuntimeError):
+    """Raised to the sender when a REJECT mailbox is full"""
+
+
+class MessageDroppedError(RuntimeError):
+    """Raised to the sender when its queued message was evicted from a DROP_OLDEST mailbox"""
+
+
+@dataclass
+class MailboxConfig:
+    capacity: int = 100      # messages waiting (not counting the ones being handled)
+    concurrency: int = 4     # messages of this agent type handled at once
+    policy: OverflowPolicy = OverflowPolicy.BLOCK
+
+
+def as_priority(value: Union[Priority, int, str, None]) -> Optional[Priority]:
+    """Accept Priority, 0/1 or "interactive"/"batch" (e.g. from a message field); None/"" mean unset"""
+    if isinstance(value, Priority):
+        return value
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        return Priority[value.upper()]
+    return Priority(value)
+
+
+_current_priority: contextvars.ContextVar[Optional[Priority]] = contextvars.ContextVar("mailbox_priority", default=None)
+
+
+def _first_priority(*values: Any) -> Priority:
+    # Not `or`: INTERACTIVE is 0 and therefore falsy
+    for value in values:
+        priority = as_priority(value)
+        if priority is not None:
+            return priority
+    return Priority.INTERACTIVE
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@dataclass
+class _MailboxMetrics:
+    submitted: int = 0
+    processed: int = 0
+    dropped: int = 0
+    rejected: int = 0
+    blocked: int = 0
+    max_depth: int = 0
+    waits: Dict[Priority, Deque[float]] = field(
+        default_factory=lambda: {p: deque(maxlen=1024) for p in Priority}
+    )
+
+
+class Mailbox:
+    """Admission queue for one agent type"""
+
+    def __init__(self, agent_type: str, config: MailboxConfig) -> None:
+        if config.capacity < 0 or config.concurrency < 1:
+            raise ValueError("Mailbox needs capacity >= 0 and concurrency >= 1")
+        self.agent_type = agent_type
+        self.config = config
+        self.running = 0
+        self._lanes: Dict[Priority, Deque[asyncio.Future]] = {p: deque() for p in Priority}
+        self._space_waiters: Dict[Priority, Deque[asyncio.Future]] = {p: deque() for p in Priority}
+        self.metrics = _MailboxMetrics()
+
+    @property
+    def depth(self) -> int:
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def _evict(self, incoming: Priority) -> bool:
+        """Drop the oldest message of the lowest priority not above `incoming`; False if none"""
+        for priority in sorted(Priority, reverse=True):
+            if priority < incoming:
+                break
+            lane = self._lanes[priority]
+            while lane:
+                victim = lane.popleft()
+                if not victim.done():
+                    victim.set_exception(MessageDroppedError(f"{self.agent_type} mailbox full; message dropped"))
+                    self.metrics.dropped += 1
+                    return True
+        return False
+
+    async def _make_room(self, priority: Priority) -> None:
+        policy = self.config.policy
+        while self.depth >= self.config.capacity:
+            if policy == OverflowPolicy.REJECT:
+                self.metrics.rejected += 1
+                raise MailboxFullError(f"{self.agent_type} mailbox full ({self.config.capacity} waiting)")
+            if policy == OverflowPolicy.DROP_OLDEST:
+                if not self._evict(priority):
+                    # Everything waiting outranks this message: it is the one to drop
+                    self.metrics.dropped += 1
+                    raise MessageDroppedError(f"{self.agent_type} mailbox full of higher-priority work")
+                continue
+            self.metrics.blocked += 1
+            waiter = asyncio.get_running_loop().create_future()
+            self._space_waiters[priority].append(waiter)
+            await waiter
+
+    def _grant(self) -> None:
+        """Hand free handler slots to waiting messages, then free queue space for blocked senders"""
+        while self.running < self.config.concurrency:
+            ticket = None
+            for priority in Priority:
+                lane = self._lanes[priority]
+                while lane and ticket is None:
+                    candidate = lane.popleft()
+                    if not candidate.done():
+                        ticket = candidate
+                if ticket is not None:
+                    break
+            if ticket is None:
+                break
+            self.running += 1
+            ticket.set_result(None)
+        free = self.config.capacity - self.depth
+        for priority in Priority:
+            waiters = self._space_waiters[priority]
+            while free > 0 and waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    free -= 1
+
+    def _release(self) -> None:
+        self.running -= 1
+        self.metrics.processed += 1
+        self._grant()
+
+    async def run(self, priority: Priority, work: Callable[[], Awaitable[Any]]) -> Any:
+        """Wait for a handler slot in `priority`'s lane, then run `work`"""
+        self.metrics.submitted += 1
+        queued_at = time.monotonic()
+        if self.running < self.config.concurrency and self.depth == 0:
+            self.running += 1
+        else:
+            await self._make_room(priority)
+            ticket = asyncio.get_running_loop().create_future()
+            self._lanes[priority].append(ticket)
+            self.metrics.max_depth = max(self.metrics.max_depth, self.depth)
+            try:
+                await ticket
+            except asyncio.CancelledError:
+                if ticket in self._lanes[priority]:
+                    self._lanes[priority].remove(ticket)
+                    self._grant()
+                elif ticket.done() and not ticket.cancelled() and ticket.exception() is None:
+                    self._release()  # slot was granted just as the sender gave up
+                raise
+        self.metrics.waits[priority].append(time.monotonic() - queued_at)
+        try:
+            return await work()
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        m = self.metrics
+        lanes = {}
+        for priority in Priority:
+            waits = list(m.waits[priority])
+            lanes[priority.name.lower()] = {
+                "depth": len(self._lanes[priority]),
+                "wait_p50_ms": round(_percentile(waits, 0.50) * 1000, 1),
+                "wait_p95_ms": round(_percentile(waits, 0.95) * 1000, 1),
+            }
+        return {
+            "policy": self.config.policy.value,
+            "capacity": self.config.capacity,
+            "concurrency": self.config.concurrency,
+            "depth": self.depth,
+            "max_depth": m.max_depth,
+            "running": self.running,
+            "submitted": m.submitted,
+            "processed": m.processed,
+            "dropped": m.dropped,
+            "rejected": m.rejected,
+            "blocked": m.blocked,
+            "lanes": lanes,
+        }
+
+
+class MailboxRuntime:
+    """
+    Wraps an in-process agent runtime (SingleThreadedAgentRuntime or a gRPC
+    worker runtime) and gates every agent type behind a Mailbox.
+
+    Everything except `register_factory` and `send_message` is delegated to
+    the wrapped runtime. Register agents through this wrapper: their handlers
+    are gated, and they send through it so nested messages keep their priority.
+    """
+
+    def __init__(
+        self,
+        runtime: Any,
+        default: Optional[MailboxConfig] = None,
+        per_type: Optional[Dict[str, MailboxConfig]] = None
+    ) -> None:
+        self._runtime = runtime
+        self._default = default or MailboxConfig()
+        self._per_type = per_type or {}
+        self._mailboxes: Dict[str, Mailbox] = {}
+        self._priorities: Dict[str, Priority] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._runtime, name)
+
+    def mailbox(self, agent_type: str) -> Mailbox:
+        if agent_type not in self._mailboxes:
+            self._mailboxes[agent_type] = Mailbox(agent_type, self._per_type.get(agent_type, self._default))
+        return self._mailboxes[agent_type]
+
+    def _priority_for(self, message: Any, ctx: MessageContext) -> Priority:
+        return _first_priority(self._priorities.get(ctx.message_id), getattr(message, "priority", None))
+
+    async def register_factory(
+        self,
+        type: Union[str, AgentType],
+        agent_factory: Callable[[], Any],
+        *,
+        expected_class: Optional[type] = None
+    ) -> AgentType:
+        """Register through the wrapped runtime, gating each instance's handler"""
+        agent_type = type.type if isinstance(type, AgentType) else type
+        mailbox = self.mailbox(agent_type)
+
+        async def gated_factory() -> Any:
+            # Bind the agent to this wrapper so its own sends go through the mailboxes
+            with AgentInstantiationContext.populate_context((self, AgentInstantiationContext.current_agent_id())):
+                agent = agent_factory()
+                if asyncio.iscoroutine(agent):
+                    agent = await agent
+            handle = agent.on_message
+
+            async def on_message(message: Any, ctx: MessageContext) -> Any:
+                priority = self._priority_for(message, ctx)
+
+                async def work() -> Any:
+                    _current_priority.set(priority)
+                    return await handle(message, ctx)
+
+                return await mailbox.run(priority, work)
+
+            agent.on_message = on_message
+            return agent
+
+        return await self._runtime.register_factory(type, gated_factory, expected_class=expected_class)
+
+    async def send_message(
+        self,
+        message: Any,
+        recipient: AgentId,
+        *,
+        sender: Optional[AgentId] = None,
+        cancellation_token: Optional[CancellationToken] = None,
+        message_id: Optional[str] = None,
+        priority: Union[Priority, int, str, None] = None
+    ) -> Any:
+        """Send with an explicit priority (else the message's, else the current handler's)"""
+        resolved = _first_priority(priority, getattr(message, "priority", None), _current_priority.get())
+        message_id = message_id or str(uuid.uuid4())
+        self._priorities[message_id] = resolved
+        try:
+            return await self._runtime.send_message(
+                message,
+                recipient,
+                sender=sender,
+                cancellation_token=cancellation_token,
+                message_id=message_id
+            )
+        finally:
+            self._priorities.pop(message_id, None)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-agent-type mailbox metrics"""
+        return {agent_type: mailbox.stats() for agent_type, mailbox in self._mailboxes.items()}
@@ -6,41 +6,51 @@ A production-quality multi-agent system using AutoGen
 import asyncio
 import os
 from dotenv import load_dotenv
-from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.teams import RoundRobinGroupChat
-from autogen_agentchat.conditions import TextMentionTermination
-from autogen_ext.models.openai import OpenAIChatCompletionClient
-from autogen_core import CancellationToken
-from tools import search_web, execute_python_code, save_to_file
 
-load_dotenv()
 
-# Initialize model
-model_client = OpenAIChatCompletionClient(model="gpt-4o-mini")
+def code_cache_enabled() -> bool:
+    """Whether the Coder's code runs go through code_cache (opt-in with CODE_CACHE=1)"""
+    return os.getenv("CODE_CACHE", "0").lower() in ("1", "true", "on")
 
-# Create agents
-coder = AssistantAgent(
-    name="Coder",
-    model_client=model_client,
-    tools=[execute_python_code, save_to_file],
-    system_message="""You are an expert Python developer. Write clean, efficient code. 
-When asked to solve a problem, write the code and test it using execute_python_code tool.""",
-    reflect_on_tool_use=True
-)
 
-reviewer = AssistantAgent(
-    name="Reviewer",
-    model_client=model_client,
-    system_message="""You are a senior code reviewer. Review code for:
+def build_team():
+    """Create a fresh Coder/Reviewer team and its termination condition"""
+    # Imported here so `import app` (batch_runner) does not load the autogen/openai stack
+    from autogen_agentchat.agents import AssistantAgent
+    from autogen_agentchat.teams import RoundRobinGroupChat
+    from model_registry import get_model_client
+    from tools import execute_python_code, save_to_file, list_files, read_file, grep_file
+    from termination import smart_termination
+    
+    execute = execute_python_code
+    if code_cache_enabled():
+        # Review rounds re-run the same tests; deterministic snippets are answered from the cache
+        from code_cache import cached_execution
+        execute = cached_execution(execute_python_code)
+    
+    coder = AssistantAgent(
+        name="Coder",
+        model_client=get_model_client(agent="Coder"),
+        tools=[execute, save_to_file, list_files, read_file, grep_file],
+        system_message="""You are an expert Python developer. Write clean, efficient code. 
+When asked to solve a problem, write the code and test it using execute_python_code tool.""",
+        reflect_on_tool_use=True
+    )
+    
+    reviewer = AssistantAgent(
+        name="Reviewer",
+        model_client=get_model_client(agent="Reviewer"),
+        system_message="""You are a senior code reviewer. Review code for:
 - Correctness and logic errors
 - Edge cases and error handling
 - Code quality and best practices
 Provide constructive feedback. When satisfied, say 'APPROVED'."""
-)
-
-# Create team
-termination = TextMentionTermination("APPROVED")
-team = RoundRobinGroupChat([coder, reviewer], termination_condition=termination, max_turns=10)
+    )
+    
+    # Stop on approval, or when Coder and Reviewer start repeating themselves
+    termination = smart_termination(final_text="APPROVED", max_messages=20, max_tokens=40000, max_seconds=240)
+    team = RoundRobinGroupChat([coder, reviewer], termination_condition=termination, max_turns=10)
+    return team, termination
 
 
 async def run_code_review(task: str):
@@ -49,17 +59,28 @@ async def run_code_review(task: str):
     print(f"📋 Task: {task}\n")
     print("="*80)
     
-    result = await team.run(task=task)
+    from transcript_archive import record_result, run_timed
+    team, termination = build_team()
+    result, timing = await run_timed(team, task)
     
     print("\n" + "="*80)
     print("\n📊 CONVERSATION SUMMARY:")
     print("="*80)
+    print(f"🏁 Stop reason: {result.stop_reason} {termination.report()}")
     
     for i, message in enumerate(result.messages, 1):
         print(f"\n[{i}] {message.source}:")
         print(f"{message.content[:500]}...")  # Truncate for readability
         print("-"*80)
     
+    if code_cache_enabled():
+        from code_cache import get_code_cache
+        print(f"⚡ Code cache: {get_code_cache().report()}")
+    
+    run_id = record_result(result, task, "app", termination, **timing)
+    if run_id:
+        print(f"\n🗄️  Transcript archived as run {run_id}")
+    
     return result
 
 
@@ -72,6 +93,7 @@ TASKS = [
 
 
 async def main():
+    load_dotenv()
     print("\n" + "="*80)
     print(" "*20 + "🤖 AutoGen Multi-Agent Code Review System")
     print("="*80)
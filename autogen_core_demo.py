@@ -4,21 +4,82 @@ Demonstrates RoutedAgent pattern and SingleThreadedAgentRuntime
 """
 
 import asyncio
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
 from dotenv import load_dotenv
-from autogen_core import AgentId, MessageContext, RoutedAgent, message_handler, SingleThreadedAgentRuntime
+from autogen_core import AgentId, CancellationToken, MessageContext, RoutedAgent, message_handler, SingleThreadedAgentRuntime
 from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.messages import TextMessage
-from autogen_ext.models.openai import OpenAIChatCompletionClient
+from model_registry import get_model_client, utilization_report
+from worker_pool import WorkerPool
+from serialization import register_message
+from agent_mailbox import MailboxConfig, MailboxRuntime, Priority
+from tracing import setup_tracing
+from memoize import memo_report, memoize_handler
+from transcript_archive import open_runtime_transcript
 
 load_dotenv()
 
 
 # Define message type for agent communication
+@register_message
 @dataclass
 class TaskMessage:
     content: str
     task_type: str
+    session_id: str = ""  # keeps follow-ups on the same worker instance
+
+
+@register_message
+@dataclass
+class ScatterTask:
+    """Fan one question out to several specialist workers"""
+    content: str
+    task_type: str
+    workers: List[str] = field(default_factory=list)  # worker agent types
+    quorum: int = 0          # replies needed before answering; 0 = wait for all
+    timeout_s: float = 60.0  # per-worker timeout
+    session_id: str = ""
+
+
+async def gather_first_k(
+    calls: Dict[str, Callable[[CancellationToken], Awaitable[Any]]],
+    k: int,
+    timeout_s: float
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Start every call concurrently and collect results as they complete.
+    Returns once `k` calls succeeded (or all finished); the stragglers are
+    cancelled. Latency is that of the k-th fastest call, not the sum.
+    """
+    tokens = {name: CancellationToken() for name in calls}
+    tasks = {
+        asyncio.create_task(asyncio.wait_for(call(tokens[name]), timeout_s)): name
+        for name, call in calls.items()
+    }
+    results: Dict[str, Any] = {}
+    failures: Dict[str, str] = {}
+    pending = set(tasks)
+    try:
+        while pending and len(results) < k:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = tasks[task]
+                try:
+                    results[name] = task.result()
+                except asyncio.TimeoutError:
+                    failures[name] = f"timed out after {timeout_s}s"
+                except Exception as e:
+                    failures[name] = str(e)
+    finally:
+        # Pending calls are left over either because the quorum was met or because we were cancelled
+        reason = "not needed (quorum reached)" if len(results) >= k else "cancelled"
+        for task in pending:
+            tokens[tasks[task]].cancel()
+            task.cancel()
+            failures.setdefault(tasks[task], reason)
+    return results, failures
 
 
 # Create RoutedAgent that wraps AssistantAgent
@@ -28,50 +89,85 @@ class WorkerAgent(RoutedAgent):
     def __init__(self, name: str, specialty: str) -> None:
         super().__init__(name)
         self.specialty = specialty
-        model = OpenAIChatCompletionClient(model="gpt-4o-mini")
-        self._delegate = AssistantAgent(
-            name,
-            model_client=model,
-            system_message=f"You are a {specialty} specialist. Provide expert advice in your field."
+        self._name = name
+        self._model = get_model_client(agent=name)
+        self._delegate = self._new_delegate()
+    
+    def _new_delegate(self) -> AssistantAgent:
+        return AssistantAgent(
+            self._name,
+            model_client=self._model,
+            system_message=f"You are a {self.specialty} specialist. Provide expert advice in your field."
         )
     
     @message_handler
+    # Memoized replies must depend on the message alone. Follow-ups in a session depend on the
+    # delegate's history, so they always reach it; one-shot questions get a delegate with no history
+    # (a fresh one, so they neither see nor wipe a session's context on this pooled instance).
+    @memoize_handler(ttl_s=600, maxsize=256, bypass=lambda message: bool(message.session_id))
     async def handle_task(self, message: TaskMessage, ctx: MessageContext) -> TaskMessage:
         """Handle incoming task messages"""
         print(f"\n[{self.id.type}] Received: {message.content[:50]}...")
         
         # Process with delegate agent
+        delegate = self._delegate if message.session_id else self._new_delegate()
         text_msg = TextMessage(content=message.content, source="user")
-        response = await self._delegate.on_messages([text_msg], ctx.cancellation_token)
+        response = await delegate.on_messages([text_msg], ctx.cancellation_token)
         reply = response.chat_message.content
         
         print(f"[{self.id.type}] Response: {reply[:100]}...")
         
-        return TaskMessage(content=reply, task_type=message.task_type)
+        return TaskMessage(content=reply, task_type=message.task_type, session_id=message.session_id)
 
 
 class CoordinatorAgent(RoutedAgent):
     """Coordinator that delegates to worker agents"""
     
-    def __init__(self) -> None:
+    def __init__(self, pool_size: int = 4) -> None:
         super().__init__("Coordinator")
+        # All "worker" instances come from one factory; spread work across them
+        self.pool = WorkerPool("worker", size=pool_size)
     
     @message_handler
     async def handle_task(self, message: TaskMessage, ctx: MessageContext) -> TaskMessage:
         """Coordinate between multiple workers"""
         print(f"\n[COORDINATOR] Processing task: {message.task_type}")
         
-        # Send to appropriate workers
-        if "code" in message.task_type.lower():
-            worker_id = AgentId("worker", "coder")
-        else:
-            worker_id = AgentId("worker", "researcher")
-        
-        # Send message to worker and get response
-        response = await self.send_message(message, worker_id)
+        # Send to the least-loaded worker instance (sticky per session) and get response
+        response = await self.pool.send(
+            self,
+            message,
+            session_key=message.session_id or None,
+            cancellation_token=ctx.cancellation_token
+        )
         
-        print(f"[COORDINATOR] Got response from worker")
+        print(f"[COORDINATOR] Got response from worker ({self.pool.stats()['outstanding']})")
         return response
+    
+    @message_handler
+    async def handle_scatter(self, message: ScatterTask, ctx: MessageContext) -> TaskMessage:
+        """Send the task to several specialists at once and merge their answers"""
+        quorum = message.quorum or len(message.workers)
+        print(f"\n[COORDINATOR] Scatter to {len(message.workers)} workers (quorum {quorum})")
+        
+        task = TaskMessage(content=message.content, task_type=message.task_type, session_id=message.session_id)
+        
+        def call(worker_type: str) -> Callable[[CancellationToken], Awaitable[TaskMessage]]:
+            return lambda token: self.send_message(task, AgentId(worker_type, "default"), cancellation_token=token)
+        
+        started = time.perf_counter()
+        replies, failures = await gather_first_k(
+            {worker: call(worker) for worker in message.workers},
+            quorum,
+            message.timeout_s
+        )
+        elapsed = time.perf_counter() - started
+        print(f"[COORDINATOR] Gathered {len(replies)}/{len(message.workers)} replies in {elapsed:.1f}s")
+        
+        # Merge in the order the caller listed the workers
+        sections = [f"## {worker}\n{replies[worker].content}" for worker in message.workers if worker in replies]
+        sections += [f"## {worker}\n(no answer: {reason})" for worker, reason in failures.items()]
+        return TaskMessage(content="\n\n".join(sections), task_type=message.task_type)
 
 
 async def demo():
@@ -80,8 +176,17 @@ async def demo():
     print("🔧 AUTOGEN CORE DEMO (Lab 3 Feature)")
     print("="*80 + "\n")
     
-    # Create runtime
-    runtime = SingleThreadedAgentRuntime()
+    # Create runtime; every agent type gets a bounded mailbox with interactive/batch lanes.
+    # Every message the runtime delivers is also appended to the transcript archive.
+    transcript = open_runtime_transcript("AutoGen Core demo session", "autogen_core_demo")
+    runtime = MailboxRuntime(
+        SingleThreadedAgentRuntime(
+            tracer_provider=setup_tracing("autogen_core_demo"),
+            intervention_handlers=[transcript] if transcript else None
+        ),
+        default=MailboxConfig(capacity=50, concurrency=4),
+        per_type={"worker": MailboxConfig(capacity=16, concurrency=2)}
+    )
     
     # Register agents
     await WorkerAgent.register(
@@ -95,13 +200,27 @@ async def demo():
         lambda: CoordinatorAgent()
     )
     
+    # Specialists for scatter-gather questions
+    specialists = {
+        "python_expert": ("PythonExpert", "Python programming"),
+        "algorithms_expert": ("AlgorithmsExpert", "algorithms and data structures"),
+        "testing_expert": ("TestingExpert", "software testing"),
+    }
+    for agent_type, (name, specialty) in specialists.items():
+        await WorkerAgent.register(
+            runtime,
+            agent_type,
+            lambda name=name, specialty=specialty: WorkerAgent(name, specialty)
+        )
+    
     # Start runtime
     runtime.start()
     
-    print("✅ Runtime started with 2 agents registered\n")
+    print(f"✅ Runtime started with {2 + len(specialists)} agent types registered\n")
     print("Agents:")
     print("  - Coordinator (routes tasks)")
-    print("  - Worker/CodeExpert (handles coding tasks)\n")
+    print("  - Worker/CodeExpert (handles coding tasks)")
+    print(f"  - Specialists: {', '.join(specialists)}\n")
     
     # Send task
     task = TaskMessage(
@@ -115,9 +234,63 @@ async def demo():
     print(f"\n📊 Final Result:")
     print(f"   {result.content[:200]}...\n")
     
+    # Several independent tasks at once: the pool spreads them over worker instances.
+    # They go in the batch lane, so the interactive question below is served first.
+    questions = [
+        "Explain Python generators in two sentences",
+        "Explain Python decorators in two sentences",
+        "Explain Python context managers in two sentences",
+    ]
+    batch = [
+        runtime.send_message(TaskMessage(content=q, task_type="code_question"), coordinator_id, priority=Priority.BATCH)
+        for q in questions
+    ]
+    interactive = runtime.send_message(
+        TaskMessage(content="What does `yield from` do? One sentence.", task_type="code_question"),
+        coordinator_id
+    )
+    answers = await asyncio.gather(*batch, interactive)
+    print(f"\n📊 {len(answers)} concurrent tasks answered by the worker pool\n")
+    
+    # Scatter-gather: ask all specialists at once, answer when the fastest 2 replied
+    scatter = ScatterTask(
+        content="What should I watch out for when implementing a binary search tree in Python?",
+        task_type="code_question",
+        workers=list(specialists),
+        quorum=2,
+        timeout_s=45.0
+    )
+    merged = await runtime.send_message(scatter, coordinator_id)
+    
+    print(f"\n📊 Merged Specialist Answer:")
+    print(f"   {merged.content[:400]}...\n")
+    
+    # Asking the first question again is answered from the worker's memo cache
+    started = time.perf_counter()
+    await runtime.send_message(task, coordinator_id)
+    print(f"♻️  Repeated question answered in {(time.perf_counter() - started) * 1000:.0f}ms")
+    for handler, stats in memo_report().items():
+        print(f"   {handler}: {stats['hits']} hits / {stats['misses']} misses (hit rate {stats['hit_rate']:.0%})")
+    print()
+    
+    print("🔌 Shared model client usage per agent:")
+    for usage in utilization_report().values():
+        for agent, stats in usage["agents"].items():
+            print(f"   {agent}: {stats['requests']} requests, {stats['prompt_tokens'] + stats['completion_tokens']} tokens")
+    
+    print("📬 Mailboxes per agent type:")
+    for agent_type, stats in runtime.stats().items():
+        lanes = stats["lanes"]
+        print(f"   {agent_type}: max depth {stats['max_depth']}, "
+              f"wait p95 interactive {lanes['interactive']['wait_p95_ms']}ms / batch {lanes['batch']['wait_p95_ms']}ms, "
+              f"dropped {stats['dropped']}, rejected {stats['rejected']}")
+    
     # Cleanup
     await runtime.stop()
     await runtime.close()
+    if transcript:
+        transcript.close()
+        print(f"🗄️  Runtime transcript archived as run {transcript.run.run_id} ({transcript.run.messages} messages)")
     
     print("✅ AutoGen Core demo complete!")
 
@@ -0,0 +1,212 @@
+"""
+AutoGen Multi-Agent System - Batch Task Runner
+Runs many tasks through the teams concurrently and streams results to JSONL
+
+Usage:
+    python batch_runner.py tasks.txt --team multi_agent --parallel 4 --rate 30 --out results.jsonl
+
+Tasks are read from a text file (one task per line) or a JSONL file with
+{"id": ..., "task": ...} objects. Rerunning the same command resumes the batch:
+tasks already recorded as "ok" in the output file are skipped.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+def load_tasks(path: str) -> List[Dict[str, str]]:
+    """Read tasks from a .txt or .jsonl file; ids are stable so batches can resume"""
+    tasks = []
+    seen: Dict[str, int] = {}
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                item = json.loads(line)
+                task = item["task"]
+                task_id = str(item.get("id") or hashlib.sha1(task.encode()).hexdigest()[:12])
+            else:
+                task = line
+                task_id = hashlib.sha1(task.encode()).hexdigest()[:12]
+            # Identical tasks listed twice are two separate runs
+            seen[task_id] = seen.get(task_id, 0) + 1
+            if seen[task_id] > 1:
+                task_id = f"{task_id}-{seen[task_id]}"
+            tasks.append({"id": task_id, "task": task})
+    return tasks
+
+
+def completed_ids(out_path: str) -> Set[str]:
+    """Ids already finished successfully in a previous (possibly interrupted) run"""
+    done: Set[str] = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partial line from a killed run
+            if record.get("status") == "ok":
+                done.add(record["id"])
+    return done
+
+
+class RateLimiter:
+    """Spaces task starts so no more than `per_minute` begin in any minute"""
+
+    def __init__(self, per_minute: Optional[float]) -> None:
+        self._interval = 60.0 / per_minute if per_minute else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self._interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _team_multi_agent(mode: str) -> Tuple[Any, Any]:
+    import multi_agent
+    termination = multi_agent.build_termination()
+    return multi_agent.build_team(mode, termination, agents=multi_agent.build_agents()), termination
+
+
+def _team_code_review() -> Tuple[Any, Any]:
+    import app
+    return app.build_team()
+
+
+# Every factory call returns a brand-new (team, termination) pair, so tasks never share state
+TEAMS: Dict[str, Callable[[], Tuple[Any, Any]]] = {
+    "multi_agent": lambda: _team_multi_agent("round_robin"),
+    "dag": lambda: _team_multi_agent("dag"),
+    "relevance": lambda: _team_multi_agent("relevance"),
+    "code_review": _team_code_review,
+}
+
+
+def _summarize(task: Dict[str, str], result: Any, termination: Any, elapsed: float) -> Dict[str, Any]:
+    tokens = 0
+    for message in result.messages:
+        if message.models_usage is not None:
+            tokens += message.models_usage.prompt_tokens + message.models_usage.completion_tokens
+    final = result.messages[-1] if result.messages else None
+    return {
+        "id": task["id"],
+        "task": task["task"],
+        "status": "ok",
+        "final_answer": str(final.content) if final else "",
+        "final_agent": str(final.source) if final else "",
+        "messages": len(result.messages),
+        "tokens": tokens,
+        "stop_reason": result.stop_reason,
+        "stop": termination.report() if termination is not None else {},
+        "elapsed_s": round(elapsed, 2),
+        "finished_at": datetime.now().isoformat()
+    }
+
+
+async def run_batch(
+    tasks: List[Dict[str, str]],
+    team_factory: Callable[[], Tuple[Any, Any]],
+    out_path: str,
+    parallel: int = 4,
+    rate_per_min: Optional[float] = None,
+    resume: bool = True
+) -> Dict[str, Any]:
+    """Run tasks with bounded concurrency, appending one JSONL record as each finishes"""
+    skip = completed_ids(out_path) if resume else set()
+    todo = [t for t in tasks if t["id"] not in skip]
+    semaphore = asyncio.Semaphore(parallel)
+    limiter = RateLimiter(rate_per_min)
+    write_lock = asyncio.Lock()
+    stats = {"total": len(tasks), "skipped": len(tasks) - len(todo), "ok": 0, "error": 0}
+    batch_started = time.monotonic()
+
+    with open(out_path, "a") as out:
+        async def write(record: Dict[str, Any]) -> None:
+            async with write_lock:
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+
+        async def run_one(task: Dict[str, str]) -> None:
+            async with semaphore:
+                await limiter.wait()
+                started = time.monotonic()
+                try:
+                    team, termination = team_factory()
+                    from transcript_archive import record_result, run_timed
+                    result, timing = await run_timed(team, task["task"])
+                    record = _summarize(task, result, termination, time.monotonic() - started)
+                    record["run_id"] = await asyncio.to_thread(
+                        record_result, result, task["task"], "batch_runner", termination, task_id=task["id"], **timing
+                    )
+                    stats["ok"] += 1
+                except Exception as e:
+                    record = {
+                        "id": task["id"],
+                        "task": task["task"],
+                        "status": "error",
+                        "error": f"{type(e).__name__}: {e}",
+                        "elapsed_s": round(time.monotonic() - started, 2),
+                        "finished_at": datetime.now().isoformat()
+                    }
+                    stats["error"] += 1
+                await write(record)
+                print(f"[{stats['ok'] + stats['error']}/{len(todo)}] {record['status']:5} {task['id']} ({record['elapsed_s']}s)")
+
+        await asyncio.gather(*(run_one(task) for task in todo))
+
+    elapsed = time.monotonic() - batch_started
+    stats["elapsed_s"] = round(elapsed, 2)
+    stats["tasks_per_min"] = round(len(todo) / elapsed * 60, 2) if elapsed > 0 else 0.0
+    return stats
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run a file of tasks through an AutoGen team")
+    parser.add_argument("tasks", help="Task file (.txt, one task per line, or .jsonl)")
+    parser.add_argument("--team", choices=sorted(TEAMS), default="multi_agent")
+    parser.add_argument("--parallel", type=int, default=4, help="Tasks running at once")
+    parser.add_argument("--rate", type=float, default=None, help="Max task starts per minute")
+    parser.add_argument("--out", default="results.jsonl", help="JSONL output (also the resume log)")
+    parser.add_argument("--no-resume", action="store_true", help="Rerun tasks already in the output")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from tracing import setup_tracing
+    load_dotenv()  # the team modules no longer load .env when imported
+    setup_tracing("batch_runner")  # no-op unless AGENT_TRACING is set
+
+    tasks = load_tasks(args.tasks)
+    print(f"\n📦 Batch: {len(tasks)} tasks → team={args.team}, parallel={args.parallel}, rate={args.rate or '∞'}/min")
+    print(f"📝 Output: {args.out}\n")
+
+    stats = await run_batch(tasks, TEAMS[args.team], args.out, args.parallel, args.rate, not args.no_resume)
+
+    print(f"\n✅ Batch complete: {stats['ok']} ok, {stats['error']} failed, {stats['skipped']} resumed from earlier runs")
+    print(f"⏱️  {stats['elapsed_s']}s, {stats['tasks_per_min']} tasks/min\n")
+    
+    from model_registry import utilization_report
+    for model_key, usage in utilization_report().items():
+        print(f"🔌 {model_key}: {usage['requests_last_min']} requests / {usage['tokens_last_min']} tokens in the last minute")
+        for agent, stats_ in usage["agents"].items():
+            print(f"   {agent:12} {stats_['requests']:5} requests, busy {stats_['busy_s']:.0f}s, waited {stats_['waiting_s']:.0f}s for limits")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,226 @@
+"""
+AutoGen Multi-Agent System - Tool Micro-Benchmarks
+Latency, concurrent throughput and client-side parse/allocation cost of every network tool, offline
+
+    python bench_tools.py
+    python bench_tools.py --latency-ms 100 --concurrency 1,8,32 --calls 200 --json bench.json
+    python bench_tools.py --tools search_web,get_weather
+
+The tools in tools.py are pointed at fake_providers.py running in a separate
+process (so its CPU and memory do not count against the tools). For each tool:
+
+- latency: sequential calls against a server with --latency-ms injected; the
+  overhead column is what the tool adds on top of the server's delay
+- throughput: calls/s with N concurrent callers (threads, as the tool pool uses)
+- overhead: CPU time and peak traced allocation per call against a zero-latency
+  server, plus the time to decode one response body alone
+
+Run it before and after a tool-layer change to see what moved.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import tools
+from fake_providers import provider_env
+
+# tool name -> (function, argument, raw response path for the decode benchmark)
+TOOLS: Dict[str, Tuple[Callable[[str], Dict[str, Any]], str, str]] = {
+    "search_web": (tools.search_web, "message queues",
+                   "/search?engine=google&q=message+queues&api_key=fake"),
+    "brave_search": (tools.brave_search, "machine learning", "/res/v1/web/search?q=machine+learning"),
+    "get_stock_data": (tools.get_stock_data, "AAPL", "/query?function=GLOBAL_QUOTE&symbol=AAPL&apikey=fake"),
+    "get_weather": (tools.get_weather, "New York", "/data/2.5/weather?q=New+York&appid=fake&units=metric"),
+}
+
+
+def _succeeded(result: Dict[str, Any]) -> bool:
+    return "error" not in result
+
+
+class FakeServer:
+    """fake_providers.py in a child process"""
+
+    def __init__(self, latency_ms: float, results: int) -> None:
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_providers.py")
+        self.process = subprocess.Popen(
+            [sys.executable, script, "--port", str(self.port), "--latency-ms", str(latency_ms),
+             "--jitter", "0", "--results", str(results)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        self.url = f"http://127.0.0.1:{self.port}"
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=0.2).close()
+                return
+            except OSError:
+                time.sleep(0.05)
+        self.close()
+        raise RuntimeError("fake provider server did not start")
+
+    def __enter__(self) -> "FakeServer":
+        os.environ.update(provider_env(self.url))
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.process.terminate()
+        self.process.wait()
+
+
+def _percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] if ordered else 0.0
+
+
+def bench_latency(tool: Callable[[str], Dict[str, Any]], argument: str, calls: int) -> Dict[str, Any]:
+    """Sequential calls: latency distribution and failures"""
+    durations, failures = [], 0
+    tool(argument)  # warm up imports
+    for _ in range(calls):
+        started = time.perf_counter()
+        failures += not _succeeded(tool(argument))
+        durations.append((time.perf_counter() - started) * 1000)
+    return {
+        "p50_ms": round(_percentile(durations, 50), 2),
+        "p95_ms": round(_percentile(durations, 95), 2),
+        "mean_ms": round(statistics.mean(durations), 2),
+        "failures": failures
+    }
+
+
+def bench_throughput(tool: Callable[[str], Dict[str, Any]], argument: str, callers: int, calls: int) -> Dict[str, Any]:
+    """`calls` calls spread over `callers` threads: calls/s and latency under contention"""
+    def timed(_: int) -> Tuple[float, bool]:
+        started = time.perf_counter()
+        ok = _succeeded(tool(argument))
+        return (time.perf_counter() - started) * 1000, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        results = list(pool.map(timed, range(calls)))
+    elapsed = time.perf_counter() - started
+    durations = [d for d, _ in results]
+    return {
+        "callers": callers,
+        "calls_per_s": round(calls / elapsed, 1),
+        "p95_ms": round(_percentile(durations, 95), 2),
+        "failures": sum(not ok for _, ok in results)
+    }
+
+
+def bench_overhead(tool: Callable[[str], Dict[str, Any]], argument: str, raw_url: str, calls: int) -> Dict[str, Any]:
+    """Client CPU and allocations per call (zero-latency server), and decode time of one body"""
+    import requests
+
+    tool(argument)
+    cpu_started, wall_started = time.process_time(), time.perf_counter()
+    for _ in range(calls):
+        tool(argument)
+    cpu_ms = (time.process_time() - cpu_started) * 1000 / calls
+    wall_ms = (time.perf_counter() - wall_started) * 1000 / calls
+
+    tracemalloc.start()
+    peaks = []
+    for _ in range(min(calls, 20)):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tool(argument)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    headers = {"X-Subscription-Token": "fake"}
+    body = requests.get(raw_url, headers=headers, timeout=10).text
+    repeats = 2000
+    started = time.perf_counter()
+    for _ in range(repeats):
+        json.loads(body)
+    decode_us = (time.perf_counter() - started) * 1e6 / repeats
+    return {
+        "cpu_ms_per_call": round(cpu_ms, 3),
+        "wall_ms_per_call": round(wall_ms, 3),
+        "alloc_peak_kb": round(statistics.median(peaks) / 1024, 1),
+        "body_bytes": len(body),
+        "decode_us": round(decode_us, 1)
+    }
+
+
+def run(names: List[str], latency_ms: float, calls: int, concurrency: List[int], results: int) -> Dict[str, Any]:
+    report: Dict[str, Any] = {"latency_ms": latency_ms, "calls": calls, "tools": {}}
+    with FakeServer(latency_ms, results):
+        for name in names:
+            tool, argument, _ = TOOLS[name]
+            print(f"⏱️  {name}: latency and throughput ...", flush=True)
+            entry = {"latency": bench_latency(tool, argument, calls)}
+            entry["latency"]["overhead_ms"] = round(entry["latency"]["p50_ms"] - latency_ms, 2)
+            entry["throughput"] = [bench_throughput(tool, argument, n, max(calls, n * 4)) for n in concurrency]
+            report["tools"][name] = entry
+    with FakeServer(0.0, results) as server:
+        for name in names:
+            tool, argument, raw_path = TOOLS[name]
+            print(f"🧮 {name}: parse and allocation overhead ...", flush=True)
+            report["tools"][name]["overhead"] = bench_overhead(tool, argument, server.url + raw_path, calls)
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print("\n" + "="*100)
+    print(f"🔧 NETWORK TOOL BENCHMARK (fake providers, {report['latency_ms']:.0f}ms injected latency)")
+    print("="*100 + "\n")
+    print(f"{'tool':<16} {'p50':>9} {'p95':>9} {'overhead':>9} {'fail':>5}   {'cpu/call':>9} {'alloc':>9} {'body':>8} {'decode':>9}")
+    for name, entry in report["tools"].items():
+        latency, overhead = entry["latency"], entry.get("overhead", {})
+        print(f"{name:<16} {latency['p50_ms']:>7.1f}ms {latency['p95_ms']:>7.1f}ms {latency['overhead_ms']:>7.1f}ms "
+              f"{latency['failures']:>5}   {overhead.get('cpu_ms_per_call', 0):>7.2f}ms "
+              f"{overhead.get('alloc_peak_kb', 0):>7.1f}KB {overhead.get('body_bytes', 0):>7}B "
+              f"{overhead.get('decode_us', 0):>7.1f}µs")
+    print("\nThroughput (calls/s by concurrent callers):\n")
+    levels = [t["callers"] for t in next(iter(report["tools"].values()))["throughput"]]
+    print(f"{'tool':<16}" + "".join(f"{n:>12}" for n in levels))
+    for name, entry in report["tools"].items():
+        print(f"{name:<16}" + "".join(f"{t['calls_per_s']:>12}" for t in entry["throughput"]))
+    ideal = [round(n * 1000 / report["latency_ms"], 1) if report["latency_ms"] else None for n in levels]
+    if all(ideal):
+        print(f"{'(ideal)':<16}" + "".join(f"{i:>12}" for i in ideal))
+    print()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the network tools against local fake providers")
+    parser.add_argument("--tools", default=",".join(TOOLS), help="Comma-separated tool names")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Latency the fake server injects")
+    parser.add_argument("--calls", type=int, default=50, help="Calls per measurement")
+    parser.add_argument("--concurrency", default="1,4,16", help="Concurrent caller counts")
+    parser.add_argument("--results", type=int, default=10, help="Results per fake search response")
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args(argv)
+
+    names = [n for n in args.tools.split(",") if n]
+    unknown = [n for n in names if n not in TOOLS]
+    if unknown:
+        parser.error(f"unknown tools: {', '.join(unknown)} (choose from {', '.join(TOOLS)})")
+    report = run(names, args.latency_ms, args.calls, [int(n) for n in args.concurrency.split(",")], args.results)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+AutoGen Multi-Agent System - Code Execution Cache
+Opt-in result cache for execute_python_code: identical deterministic snippets skip the interpreter launch
+
+    coder = AssistantAgent(..., tools=[cached_execution(execute_python_code)])
+
+app.py wraps its Coder's execute_python_code with it only when CODE_CACHE=1.
+
+The key is a hash of the normalized code (parsed and unparsed, so comments and
+formatting do not matter) plus a fingerprint of the interpreter that runs it
+(version, executable, installed packages, PYTHONPATH). Code that reads the
+clock, randomness, the network, files, the environment or other processes is
+never cached, nor is code that builds sets unless PYTHONHASHSEED is fixed (their
+iteration order changes between runs otherwise). Results (stdout, stderr, return code) are kept in an LRU and in
+`cache/code_cache.sqlite`, so they survive restarts. Timeouts are not cached.
+"""
+
+import ast
+import functools
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+DEFAULT_CACHE_PATH = os.path.join("cache", "code_cache.sqlite")
+
+# Imports whose results depend on something other than the code
+IMPURE_MODULES = {
+    "time", "datetime", "calendar", "random", "secrets", "uuid", "os", "sys", "subprocess", "shutil",
+    "tempfile", "glob", "pathlib", "io", "socket", "ssl", "http", "urllib", "requests", "httpx", "aiohttp",
+    "ftplib", "smtplib", "threading", "multiprocessing", "concurrent", "asyncio", "signal", "platform",
+    "getpass", "sqlite3", "pickle", "shelve", "dbm", "csv", "fileinput", "webbrowser", "psutil",
+    "builtins", "importlib",  # builtins.open(...), importlib.import_module("os")
+    # Impure submodules of otherwise pure packages (matched on dotted prefixes)
+    "numpy.random", "scipy.stats", "torch.random", "pandas.io", "numpy.lib.npyio",
+}
+IMPURE_CALLS = {"open", "input", "exec", "eval", "compile", "__import__", "hash", "id", "breakpoint", "globals", "vars"}
+# Attribute names that read time, randomness, files or the environment on otherwise pure libraries
+IMPURE_ATTRIBUTES = {
+    "random", "now", "today", "utcnow", "time", "perf_counter", "urandom", "environ", "getenv",
+    "read_csv", "read_json", "read_excel", "read_parquet", "read_sql", "to_csv", "to_json", "to_excel",
+    "load", "loadtxt", "genfromtxt", "save", "savetxt", "savefig", "fromfile", "tofile", "show", "seed",
+}
+
+
+def _fixed_hash_seed() -> bool:
+    """Whether snippets run with a fixed PYTHONHASHSEED (execute_python_code inherits the environment)"""
+    return os.getenv("PYTHONHASHSEED", "random").isdigit()
+
+
+def _impure_module(name: str) -> bool:
+    """Whether `name` or any of its parent packages is in IMPURE_MODULES"""
+    parts = name.split(".")
+    return any(".".join(parts[:i]) in IMPURE_MODULES for i in range(1, len(parts) + 1))
+
+
+def impurity(code: str) -> Optional[str]:
+    """Why `code` may not be deterministic, or None if it looks pure"""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None  # the same syntax error every time
+    # Iterating or printing a set of strings follows the per-run hash seed
+    check_sets = not _fixed_hash_seed()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if _impure_module(alias.name):
+                    return f"imports {alias.name}"
+        elif isinstance(node, ast.ImportFrom):
+            module = node.module or ""
+            if module and _impure_module(module):
+                return f"imports {module}"
+            for alias in node.names:
+                # `from numpy import random` pulls in an impure submodule by name,
+                # `from pandas import read_csv` an impure function
+                if module and _impure_module(f"{module}.{alias.name}"):
+                    return f"imports {module}.{alias.name}"
+                if alias.name in IMPURE_ATTRIBUTES or alias.name in IMPURE_CALLS:
+                    return f"imports {alias.name} from {module}"
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            if node.func.id in IMPURE_CALLS or node.func.id in IMPURE_ATTRIBUTES:
+                return f"calls {node.func.id}()"
+            if check_sets and node.func.id in ("set", "frozenset"):
+                return "builds a set (order depends on the hash seed)"
+        elif isinstance(node, ast.Attribute) and node.attr in IMPURE_ATTRIBUTES:
+            return f"uses .{node.attr}"
+        elif check_sets and isinstance(node, (ast.Set, ast.SetComp)):
+            return "builds a set (order depends on the hash seed)"
+    return None
+
+
+def normalize(code: str) -> str:
+    """Canonical source: comments, blank lines and formatting removed"""
+    try:
+        return ast.unparse(ast.parse(code))
+    except SyntaxError:
+        return "\n".join(line.rstrip() for line in code.strip().splitlines())
+
+
+_fingerprint: Optional[str] = None
+
+
+def interpreter_fingerprint(python: str = "python3") -> str:
+    """Hash of the interpreter execute_python_code launches and its installed packages (computed once)"""
+    global _fingerprint
+    if _fingerprint is None:
+        probe = (
+            "import sys, importlib.metadata as m\n"
+            "print(sys.version)\n"
+            "print(sorted((d.metadata['Name'] or '', d.version) for d in m.distributions()))"
+        )
+        executable = os.path.realpath(shutil.which(python) or python)
+        try:
+            output = subprocess.run([python, "-c", probe], capture_output=True, text=True, timeout=30).stdout
+        except (OSError, subprocess.TimeoutExpired):
+            output = ""
+        parts = [executable, output, os.getenv("PYTHONPATH", ""), os.getenv("PYTHONHASHSEED", "")]
+        _fingerprint = hashlib.sha256("\0".join(parts).encode()).hexdigest()[:16]
+    return _fingerprint
+
+
+class CodeCache:
+    """LRU of execution results with SQLite persistence"""
+
+    def __init__(self, maxsize: int = 256, path: Optional[str] = DEFAULT_CACHE_PATH, disk_maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.disk_maxsize = disk_maxsize
+        self.stats = {"hits": 0, "misses": 0, "skipped": 0, "evictions": 0}
+        self.skip_reasons: Dict[str, int] = {}
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, result TEXT, used REAL)")
+
+    def key(self, code: str) -> Tuple[Optional[str], Optional[str]]:
+        """(cache key, None) for cacheable code, else (None, reason)"""
+        reason = impurity(code)
+        if reason:
+            return None, reason
+        return hashlib.sha256(f"{interpreter_fingerprint()}\0{normalize(code)}".encode()).hexdigest(), None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return dict(self._entries[key])
+            if self._db is None:
+                return None
+            row = self._db.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            with self._db:
+                self._db.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), key))
+            result = json.loads(row[0])
+            self._remember(key, result)
+            return dict(result)
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._remember(key, result)
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?)", (key, json.dumps(result), time.time()))
+                    self._db.execute(
+                        "DELETE FROM results WHERE key NOT IN (SELECT key FROM results ORDER BY used DESC LIMIT ?)",
+                        (self.disk_maxsize,)
+                    )
+
+    def _remember(self, key: str, result: Dict[str, Any]) -> None:
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def report(self) -> Dict[str, Any]:
+        return {**self.stats, "size": len(self._entries), "skip_reasons": dict(self.skip_reasons)}
+
+
+_cache: Optional[CodeCache] = None
+
+
+def get_code_cache() -> CodeCache:
+    """The process-wide cache (path from CODE_CACHE_PATH)"""
+    global _cache
+    if _cache is None:
+        _cache = CodeCache(path=os.getenv("CODE_CACHE_PATH", DEFAULT_CACHE_PATH))
+    return _cache
+
+
+def cached_execution(execute: Callable[[str], Dict[str, Any]], cache: Optional[CodeCache] = None) -> Callable[[str], Dict[str, Any]]:
+    """Wrap execute_python_code with the cache; keeps its name, docstring and signature"""
+    @functools.wraps(execute)
+    def wrapper(code: str) -> Dict[str, Any]:
+        store = cache or get_code_cache()
+        key, reason = store.key(code)
+        if key is None:
+            store.stats["skipped"] += 1
+            store.skip_reasons[reason] = store.skip_reasons.get(reason, 0) + 1
+            return execute(code)
+        hit = store.get(key)
+        if hit is not None:
+            store.stats["hits"] += 1
+            return {**hit, "cached": True}
+        store.stats["misses"] += 1
+        result = execute(code)
+        if "returncode" in result:  # timeouts and launch failures are not cached
+            store.put(key, result)
+        return result
+    return wrapper
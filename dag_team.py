@@ -0,0 +1,249 @@
+"""
+AutoGen Multi-Agent System - Dependency Graph Team
+Runs independent agents concurrently and joins their results downstream
+"""
+
+import asyncio
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from autogen_agentchat.base import ChatAgent, TaskResult, TerminationCondition
+from autogen_agentchat.messages import AgentEvent, ChatMessage, TextMessage
+from autogen_core import CancellationToken
+
+# The Reviewer's revision request: REVISE at the start of a line (markdown bullets/emphasis allowed),
+# so prose such as "no need to revise" or "REVISED" does not loop the graph back
+REVISE_DIRECTIVE = re.compile(r"^[\s>*_#`-]*REVISE\b", re.MULTILINE)
+
+
+@dataclass
+class Edge:
+    """
+    Directed edge; a conditional edge only fires when `condition(message)` is true.
+    With `trigger=False` the edge never fires or gates the target: it only hands the
+    source's latest output to the target whenever something else makes it run.
+    """
+    source: str
+    target: str
+    condition: Optional[Callable[[ChatMessage], bool]] = None
+    trigger: bool = True
+
+
+class DAGTeam:
+    """
+    Team built from a dependency graph instead of a fixed speaking order.
+
+    - Entry nodes (no incoming edges except loop back-edges) start on the task
+      concurrently.
+    - A node runs once every unconditional parent has produced output and at
+      least one incoming edge has fired since its last run (join semantics).
+      Back-edges into entry nodes never gate them; like conditional edges they
+      only re-run the node when they fire.
+    - Conditional edges fire only when their predicate accepts the source's
+      reply, which allows loops such as Reviewer -> Coder on "REVISE".
+    - Non-trigger edges (`trigger=False`) carry context: when the target runs it
+      also receives each such source's latest output it has not seen yet.
+
+    Wall-clock time follows the critical path of the graph rather than the sum
+    of all turns. `last_timings` holds the per-node timings of the latest run.
+    """
+
+    def __init__(
+        self,
+        participants: List[ChatAgent],
+        edges: Sequence[Union[Edge, Tuple[str, str]]],
+        termination_condition: Optional[TerminationCondition] = None,
+        max_turns: Optional[int] = None
+    ) -> None:
+        self._agents: Dict[str, ChatAgent] = {agent.name: agent for agent in participants}
+        if len(self._agents) != len(participants):
+            raise ValueError("Participant names must be unique")
+
+        self._edges: List[Edge] = [e if isinstance(e, Edge) else Edge(*e) for e in edges]
+        for edge in self._edges:
+            for name in (edge.source, edge.target):
+                if name not in self._agents:
+                    raise ValueError(f"Edge references unknown participant: {name}")
+
+        self._entry_nodes = {name for name in self._agents if self._is_entry(name)}
+        if not self._entry_nodes:
+            raise ValueError("Graph has no entry node")
+        # Parents a node waits for; an entry node's incoming edges are all back-edges, so it waits for none
+        self._required: Dict[str, Set[str]] = {
+            name: set() if name in self._entry_nodes else {e.source for e in self._incoming(name) if e.condition is None}
+            for name in self._agents
+        }
+
+        self._termination_condition = termination_condition
+        self._max_turns = max_turns or 3 * len(participants)
+        self.last_timings: Dict[str, Any] = {}
+
+    def _descendants(self, name: str) -> Set[str]:
+        seen: Set[str] = set()
+        frontier = [name]
+        while frontier:
+            for edge in self._outgoing(frontier.pop()):
+                if edge.target not in seen:
+                    seen.add(edge.target)
+                    frontier.append(edge.target)
+        return seen
+
+    def _is_entry(self, name: str) -> bool:
+        # Every incoming edge must be a back-edge from one of the node's own descendants
+        descendants = self._descendants(name)
+        return all(edge.source in descendants for edge in self._incoming(name))
+
+    def _incoming(self, name: str) -> List[Edge]:
+        return [e for e in self._edges if e.target == name and e.trigger]
+
+    def _outgoing(self, name: str) -> List[Edge]:
+        return [e for e in self._edges if e.source == name and e.trigger]
+
+    def _context_sources(self, name: str) -> List[str]:
+        return list(dict.fromkeys(e.source for e in self._edges if e.target == name and not e.trigger))
+
+    async def run(self, task: str, cancellation_token: Optional[CancellationToken] = None) -> TaskResult:
+        """Run the graph to completion and return all messages"""
+        result = None
+        async for item in self.run_stream(task, cancellation_token):
+            if isinstance(item, TaskResult):
+                result = item
+        return result
+
+    async def run_stream(
+        self,
+        task: str,
+        cancellation_token: Optional[CancellationToken] = None
+    ) -> AsyncGenerator[Union[AgentEvent, ChatMessage, TaskResult], None]:
+        """Run the graph, yielding messages as each node finishes and a final TaskResult"""
+        if self._termination_condition is not None:
+            await self._termination_condition.reset()
+
+        task_message = TextMessage(content=task, source="user")
+        messages: List[Union[AgentEvent, ChatMessage]] = [task_message]
+        yield task_message
+
+        outputs: Dict[str, ChatMessage] = {}
+        fired: Dict[str, Set[str]] = {name: set() for name in self._agents}
+        runs: Dict[str, int] = {name: 0 for name in self._agents}
+        delivered: Dict[str, Dict[str, ChatMessage]] = {name: {} for name in self._agents}  # context already sent
+        pending: Dict[asyncio.Task, str] = {}
+        node_timings: List[Dict[str, Any]] = []
+        turns = 0
+        stop_reason: Optional[str] = None
+        run_started = time.perf_counter()
+
+        def is_ready(name: str) -> bool:
+            if name in pending.values():
+                return False
+            if not self._required[name].issubset(outputs):
+                return False
+            if runs[name] == 0 and name in self._entry_nodes:
+                return True
+            return bool(fired[name])
+
+        async def run_node(name: str, inputs: List[ChatMessage], token: CancellationToken) -> Tuple[Any, float, float]:
+            started = time.perf_counter() - run_started
+            response = await self._agents[name].on_messages(inputs, token)
+            return response, started, time.perf_counter() - run_started
+
+        token = cancellation_token or CancellationToken()
+        try:
+            while stop_reason is None:
+                for name in self._agents:
+                    if turns >= self._max_turns or not is_ready(name):
+                        continue
+                    inputs: List[ChatMessage] = [task_message] if runs[name] == 0 else []
+                    for source in self._context_sources(name):
+                        if source in outputs and source not in fired[name] and delivered[name].get(source) is not outputs[source]:
+                            delivered[name][source] = outputs[source]
+                            inputs.append(outputs[source])
+                    inputs += [outputs[source] for source in sorted(fired[name])]
+                    fired[name].clear()
+                    runs[name] += 1
+                    turns += 1
+                    pending[asyncio.create_task(run_node(name, inputs, token))] = name
+
+                if not pending:
+                    stop_reason = "Maximum number of turns reached." if turns >= self._max_turns else "Graph completed."
+                    break
+
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    name = pending.pop(finished)
+                    response, started, ended = finished.result()
+                    node_timings.append({"agent": name, "start_s": round(started, 3), "end_s": round(ended, 3)})
+
+                    produced = list(response.inner_messages or []) + [response.chat_message]
+                    for message in produced:
+                        messages.append(message)
+                        yield message
+
+                    outputs[name] = response.chat_message
+                    for edge in self._outgoing(name):
+                        if edge.condition is None or edge.condition(response.chat_message):
+                            fired[edge.target].add(name)
+
+                    if self._termination_condition is not None and stop_reason is None:
+                        stop_message = await self._termination_condition(produced)
+                        if stop_message is not None:
+                            stop_reason = stop_message.content
+        finally:
+            for running in pending:
+                running.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        wall_s = time.perf_counter() - run_started
+        self.last_timings = {
+            "wall_s": round(wall_s, 3),
+            "serial_s": round(sum(t["end_s"] - t["start_s"] for t in node_timings), 3),
+            "nodes": node_timings
+        }
+        yield TaskResult(messages=messages, stop_reason=stop_reason)
+
+    async def reset(self) -> None:
+        """Reset every participant and the termination condition"""
+        for agent in self._agents.values():
+            await agent.on_reset(CancellationToken())
+        if self._termination_condition is not None:
+            await self._termination_condition.reset()
+
+
+def research_code_review_graph(
+    researcher: ChatAgent,
+    coder: ChatAgent,
+    reviewer: ChatAgent,
+    synthesizer: ChatAgent,
+    termination_condition: Optional[TerminationCondition] = None,
+    max_turns: Optional[int] = None
+) -> DAGTeam:
+    """
+    The 4-agent scenario as a graph:
+
+        Researcher ─┐
+                    ├─> Reviewer ──(no REVISE)──> Synthesizer
+        Coder ──────┘      │
+          ^────(REVISE)────┘
+
+    The Synthesizer is triggered by the Reviewer's approval only, and also receives
+    the Researcher's findings and the Coder's latest code and output (context edges).
+    """
+    def needs_revision(message: ChatMessage) -> bool:
+        return REVISE_DIRECTIVE.search(str(message.content)) is not None
+
+    return DAGTeam(
+        [researcher, coder, reviewer, synthesizer],
+        edges=[
+            Edge(researcher.name, reviewer.name),
+            Edge(coder.name, reviewer.name),
+            Edge(reviewer.name, coder.name, condition=needs_revision),
+            Edge(reviewer.name, synthesizer.name, condition=lambda m: not needs_revision(m)),
+            Edge(researcher.name, synthesizer.name, trigger=False),
+            Edge(coder.name, synthesizer.name, trigger=False)
+        ],
+        termination_condition=termination_condition,
+        max_turns=max_turns
+    )
@@ -4,87 +4,173 @@ Real-time process transparency with workflow streaming
 """
 
 import asyncio
+import importlib
 import json
-from datetime import datetime
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
 from fastapi.responses import StreamingResponse, HTMLResponse
-from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.teams import RoundRobinGroupChat
-from autogen_agentchat.conditions import MaxMessageTermination
-from autogen_ext.models.openai import OpenAIChatCompletionClient
 from dotenv import load_dotenv
-from tools import search_web, brave_search, execute_python_code, save_to_file, get_stock_data, get_weather
+from opentelemetry import context as otel_context
+from opentelemetry import trace
+from tools import search_web, brave_search, save_to_file, get_stock_data, get_weather
+from tools import list_files, read_file, grep_file
+from tool_executor import ParallelToolExecutor
+from tracing import get_tracer, setup_tracing
+from transcript_store import get_store, memory_report, open_store
 
-load_dotenv()
+# Imported by run_agent_system; preloaded in the background once the server is up
+AGENT_STACK = ("autogen_agentchat.agents", "autogen_agentchat.teams", "autogen_ext.models.openai",
+               "model_registry", "dag_team", "termination")
 
-app = FastAPI(title="AutoGen Multi-Agent System")
-model = OpenAIChatCompletionClient(model="gpt-4o-mini")
 
+def _import_agent_stack() -> None:
+    for module in AGENT_STACK:
+        importlib.import_module(module)
 
-async def run_agent_system(task: str):
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    load_dotenv()
+    setup_tracing("dashboard")  # no-op unless AGENT_TRACING is set
+    # The server accepts connections right away; the first task does not wait for the imports either
+    warmup = asyncio.create_task(asyncio.to_thread(_import_agent_stack))
+    yield
+    await warmup
+
+
+app = FastAPI(title="AutoGen Multi-Agent System", lifespan=lifespan)
+
+
+async def run_agent_system(task: str, mode: str = "round_robin"):
     """Run 4-agent system with full process transparency"""
+    from autogen_agentchat.agents import AssistantAgent
+    from autogen_agentchat.base import TaskResult
+    from autogen_agentchat.teams import RoundRobinGroupChat
+    from model_registry import get_model_client
+    from dag_team import research_code_review_graph
+    from termination import smart_termination
+    from findings_index import record_final_answer, record_findings, search_prior_findings
+    from vector_memory import recall_memory, remember_run
+    from kernel_session import KernelSession
     
-    # Create agents
-    researcher = AssistantAgent(
-        name="Researcher",
-        model_client=model,
-        tools=[search_web, brave_search, get_stock_data, get_weather],
-        system_message="You search for information, get stock data, weather, and provide research. Be concise.",
-        reflect_on_tool_use=True
-    )
-    
-    coder = AssistantAgent(
-        name="Coder",
-        model_client=model,
-        tools=[execute_python_code],
-        system_message="Write and test code. Keep it simple and show results.",
-        reflect_on_tool_use=True
-    )
-    
-    reviewer = AssistantAgent(
-        name="Reviewer",
-        model_client=model,
-        system_message="Review briefly and provide key feedback."
-    )
-    
-    synthesizer = AssistantAgent(
-        name="Synthesizer",
-        model_client=model,
-        system_message="Provide final summary. Be concise."
-    )
-    
-    team = RoundRobinGroupChat(
-        [researcher, coder, reviewer, synthesizer],
-        termination_condition=MaxMessageTermination(10)
-    )
-    
-    yield f"data: {json.dumps({'type': 'start', 'task': task})}\n\n"
-    
+    kernel = None
+    store = None
     try:
-        result = await team.run(task=task)
-        
-        for i, msg in enumerate(result.messages):
-            # Extract content
-            content = str(msg.content) if msg.content else ""
-            
-            # Check if it's a function call
-            is_tool = "FunctionCall" in content or "FunctionExecution" in content
-            
-            event_data = {
-                'type': 'message',
-                'id': i,
-                'agent': str(msg.source),
-                'content': content[:1000],  # Limit length
-                'is_tool': is_tool,
-                'timestamp': datetime.now().isoformat()
-            }
-            yield f"data: {json.dumps(event_data)}\n\n"
-            await asyncio.sleep(0.05)
-        
-        yield f"data: {json.dumps({'type': 'complete', 'total': len(result.messages)})}\n\n"
+        # The Coder's interpreter lives for this run only. Created inside the try, so the finally
+        # stops it even when building the agents fails or the client leaves early.
+        kernel = KernelSession()
+        
+        # Tool calls emitted in the same turn run concurrently (max 4 at once)
+        executor = ParallelToolExecutor(max_concurrency=4)
+        
+        # Create agents
+        researcher = AssistantAgent(
+            name="Researcher",
+            model_client=get_model_client(agent="Researcher"),
+            tools=executor.wrap_all([
+                search_prior_findings, recall_memory, record_findings(search_web), record_findings(brave_search),
+                get_stock_data, get_weather
+            ]),
+            system_message="You search for information, get stock data, weather, and provide research. Check "
+                           "search_prior_findings before searching the web; refetch when its hits are stale. Be concise.",
+            reflect_on_tool_use=True
+        )
+        
+        coder = AssistantAgent(
+            name="Coder",
+            model_client=get_model_client(agent="Coder"),
+            tools=executor.wrap_all([recall_memory, *kernel.tools(), list_files, read_file, grep_file]),
+            system_message="Write and test code with run_python; variables and imports persist between calls, so work step "
+                           "by step. recall_memory finds code from earlier runs. Page through sandbox files with "
+                           "read_file and grep_file rather than printing them. Keep it simple and show results.",
+            reflect_on_tool_use=True
+        )
+        
+        reviewer = AssistantAgent(
+            name="Reviewer",
+            model_client=get_model_client(agent="Reviewer"),
+            system_message="Review briefly and provide key feedback. If the code must be changed, start a line with 'REVISE' and list the fixes."
+        )
+        
+        synthesizer = AssistantAgent(
+            name="Synthesizer",
+            model_client=get_model_client(agent="Synthesizer"),
+            system_message="Provide final summary. Be concise. Start it with 'FINAL ANSWER:'."
+        )
+        
+        # Stop as soon as the answer is final, the agents converge, or a budget runs out
+        termination = smart_termination(final_text="FINAL ANSWER:", max_messages=10, max_tokens=50000, max_seconds=180)
+        
+        if mode == "dag":
+            # Researcher and Coder work in parallel; Reviewer joins, Synthesizer closes
+            team = research_code_review_graph(
+                researcher, coder, reviewer, synthesizer,
+                termination_condition=termination,
+                max_turns=10
+            )
+        else:
+            team = RoundRobinGroupChat(
+                [researcher, coder, reviewer, synthesizer],
+                termination_condition=termination
+            )
+        
+        # Message bodies are kept under a per-session memory cap; older ones spill to disk. Opened
+        # inside the try so a client that leaves at the first event still gets its store finished.
+        store = open_store()
+        yield f"data: {json.dumps({'type': 'start', 'task': task, 'mode': mode, 'session': store.session_id})}\n\n"
+        
+        # Messages are forwarded as the team produces them. The span is made current only while the
+        # team runs (not across our yields), so it does not leak into the response's context.
+        span = get_tracer().start_span("task", attributes={"task": task[:200], "team.mode": mode})
+        span_context = trace.set_span_in_context(span)
+        messages = team.run_stream(task=task)
+        result, started, message_times = None, time.time(), []
+        try:
+            while True:
+                token = otel_context.attach(span_context)
+                try:
+                    item = await messages.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    otel_context.detach(token)
+                if isinstance(item, TaskResult):
+                    result = item
+                    continue
+                message_times.append(time.time())
+                content = str(item.content) if item.content else ""
+                entry = store.append_message(item)
+                yield f"data: {json.dumps(store.event(entry, content))}\n\n"
+        finally:
+            span.end()
+        ended = time.time()
+        
+        from transcript_archive import record_result
+        await asyncio.to_thread(record_final_answer, task, result.messages)
+        await asyncio.to_thread(remember_run, task, result.messages)
+        timings = {"graph_timings": team.last_timings} if mode == "dag" else {}
+        await asyncio.to_thread(
+            record_result, result, task, "dashboard", termination, started=started, ended=ended,
+            message_times=message_times, mode=mode, tool_timings=executor.summary(), **timings
+        )
+        
+        yield f"data: {json.dumps({'type': 'tool_timings', 'turns': executor.summary()})}\n\n"
+        if mode == "dag":
+            yield f"data: {json.dumps({'type': 'graph_timings', **team.last_timings})}\n\n"
+        store.finish()
+        yield f"data: {json.dumps({'type': 'transcript', **store.stats()})}\n\n"
+        yield f"data: {json.dumps({'type': 'complete', 'total': len(result.messages), 'stop': termination.report() or {'reason': result.stop_reason}})}\n\n"
     
     except Exception as e:
         yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+    finally:
+        if store is not None:
+            store.finish()  # unfinished stores are never evicted
+        # close() waits for a running execute to release the kernel; keep that off the event loop,
+        # and shielded so a disconnect that cancels the stream still stops the interpreter
+        if kernel is not None:
+            await asyncio.shield(asyncio.to_thread(kernel.close))
 
 
 @app.get("/")
@@ -467,6 +553,20 @@ async def dashboard():
                                     ${toolBadge}
                                     <div class=\"msg-content\">${content}</div>
                                 `;
+                                if (data.truncated) {
+                                    // Long bodies arrive as a preview; the rest is fetched (from memory or disk) on demand
+                                    const more = document.createElement('a');
+                                    more.href = '#';
+                                    more.className = 'timestamp';
+                                    more.textContent = `Show full message (${Math.round(data.size / 1024)} KB)`;
+                                    more.onclick = async (event) => {
+                                        event.preventDefault();
+                                        const full = await fetch(`/transcript/${data.session}/${data.id}`);
+                                        msgDiv.querySelector('.msg-content').textContent = await full.text();
+                                        more.remove();
+                                    };
+                                    msgDiv.appendChild(more);
+                                }
                                 conv.appendChild(msgDiv);
                                 conv.scrollTop = conv.scrollHeight;
                             }
@@ -504,10 +604,41 @@ async def dashboard():
     return HTMLResponse(content=html)
 
 
+@app.get("/utilization")
+async def utilization():
+    """Shared model client load, per agent, across all sessions"""
+    from model_registry import utilization_report
+    return utilization_report()
+
+
+@app.get("/transcript/{session_id}")
+async def transcript(session_id: str):
+    """Message metadata and memory accounting for a session"""
+    store = get_store(session_id)
+    if store is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired session")
+    return store.summary()
+
+
+@app.get("/transcript/{session_id}/{message_id}")
+async def transcript_message(session_id: str, message_id: int):
+    """The full body of one message, streamed from memory or its spill file"""
+    store = get_store(session_id)
+    if store is None or not 0 <= message_id < len(store.entries):
+        raise HTTPException(status_code=404, detail="Unknown message")
+    return StreamingResponse(store.iter_body(message_id), media_type="text/plain; charset=utf-8")
+
+
+@app.get("/transcripts")
+async def transcripts():
+    """Resident and spilled transcript bytes across sessions"""
+    return memory_report()
+
+
 @app.get("/stream")
-async def stream(task: str):
+async def stream(task: str, mode: str = "round_robin"):
     return StreamingResponse(
-        run_agent_system(task),
+        run_agent_system(task, mode),
         media_type="text/event-stream"
     )
 
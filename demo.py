@@ -5,36 +5,35 @@ Demonstrates team collaboration between two agents
 
 import asyncio
 from dotenv import load_dotenv
-from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.teams import RoundRobinGroupChat
-from autogen_agentchat.conditions import TextMentionTermination, MaxMessageTermination
-from autogen_agentchat.messages import TextMessage
-from autogen_ext.models.openai import OpenAIChatCompletionClient
 
-load_dotenv()
 
-# Initialize model
-model = OpenAIChatCompletionClient(model="gpt-4o-mini")
-
-# Create two agents
-researcher = AssistantAgent(
-    name="Researcher",
-    model_client=model,
-    system_message="You are a helpful research assistant. Find information and provide brief summaries."
-)
-
-critic = AssistantAgent(
-    name="Critic",
-    model_client=model,
-    system_message="You review research and provide constructive feedback. When satisfied, respond with 'APPROVED'."
-)
-
-# Create team
-termination = MaxMessageTermination(8)  # Stop after 8 messages
-team = RoundRobinGroupChat([researcher, critic], termination_condition=termination)
+def build_team():
+    """Create the Researcher/Critic team (imports the autogen stack on first call)"""
+    from autogen_agentchat.agents import AssistantAgent
+    from autogen_agentchat.teams import RoundRobinGroupChat
+    from model_registry import get_model_client
+    from termination import smart_termination
+    
+    # Create two agents
+    researcher = AssistantAgent(
+        name="Researcher",
+        model_client=get_model_client(agent="Researcher"),
+        system_message="You are a helpful research assistant. Find information and provide brief summaries."
+    )
+    
+    critic = AssistantAgent(
+        name="Critic",
+        model_client=get_model_client(agent="Critic"),
+        system_message="You review research and provide constructive feedback. When satisfied, respond with 'APPROVED'."
+    )
+    
+    # Create team
+    termination = smart_termination(final_text="APPROVED", max_messages=8)  # Stop on approval or after 8 messages
+    return RoundRobinGroupChat([researcher, critic], termination_condition=termination)
 
 
 async def demo():
+    load_dotenv()
     print("\n" + "="*80)
     print("🤖  AUTO GEN MULTI-AGENT DEMO")
     print("="*80 + "\n")
@@ -46,7 +45,9 @@ async def demo():
     print("="*80)
     print("\n💬 CONVERSATION:\n")
     
-    result = await team.run(task=task)
+    from transcript_archive import record_result, run_timed
+    team = build_team()
+    result, timing = await run_timed(team, task)
     
     for i, msg in enumerate(result.messages, 1):
         print(f"\n[{i}] {msg.source}:")
@@ -56,6 +57,10 @@ async def demo():
     print("\n✅ Collaboration complete!")
     print(f"📊 Total messages: {len(result.messages)}")
     print(f"🏁 Stop reason: {result.stop_reason}\n")
+    
+    run_id = record_result(result, task, "demo", **timing)
+    if run_id:
+        print(f"🗄️  Transcript archived as run {run_id}\n")
 
 
 if __name__ == "__main__":
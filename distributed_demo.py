@@ -4,22 +4,62 @@ Demonstrates agents running across multiple worker processes
 """
 
 import asyncio
-from dataclasses import dataclass
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List
 from dotenv import load_dotenv
-from autogen_core import AgentId, MessageContext, RoutedAgent, message_handler
+from autogen_core import AgentId, JSON_DATA_CONTENT_TYPE, MessageContext, RoutedAgent, message_handler, SingleThreadedAgentRuntime
 from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.messages import TextMessage
-from autogen_ext.models.openai import OpenAIChatCompletionClient
+from model_registry import get_model_client
+from serialization import register_message, serializers_for
+from agent_mailbox import MailboxConfig, MailboxRuntime, Priority
+from tracing import setup_tracing
+from memoize import memo_report, memoize_handler
+from transcript_archive import open_runtime_transcript
 from autogen_ext.runtimes.grpc import GrpcWorkerAgentRuntimeHost, GrpcWorkerAgentRuntime
 
 load_dotenv()
 
 
+@register_message(version=2)
 @dataclass
 class ResearchTask:
     """Message type for research tasks"""
     query: str
     complexity: str
+    priority: str = ""  # mailbox lane ("interactive"/"batch"); empty inherits the sender's
+
+
+@register_message
+@dataclass
+class ResearchBatch:
+    """A stream of research queries for the pipelined coordinator"""
+    queries: List[str]
+    complexity: str = "medium"
+    window: int = 2  # max tasks in flight per stage
+
+    def __post_init__(self) -> None:
+        # With no lanes every stage would wait on its empty queue forever
+        if self.window < 1:
+            raise ValueError(f"window must be at least 1, got {self.window}")
+
+
+@register_message
+@dataclass
+class BatchResult:
+    """Pipeline output plus throughput and per-stage utilization"""
+    results: List[str]
+    wall_s: float
+    tasks_per_min: float
+    stage_utilization: Dict[str, float] = field(default_factory=dict)
+
+
+# Compact binary (compressed above 1KB) payloads between gRPC workers. The 0.4 gRPC
+# runtime only routes the JSON content type, so these replace the JSON serializers.
+WIRE_SERIALIZERS = serializers_for(ResearchTask, ResearchBatch, BatchResult, content_type=JSON_DATA_CONTENT_TYPE)
 
 
 class ResearchAgent(RoutedAgent):
@@ -27,7 +67,7 @@ class ResearchAgent(RoutedAgent):
     
     def __init__(self) -> None:
         super().__init__("ResearchAgent")
-        model = OpenAIChatCompletionClient(model="gpt-4o-mini")
+        model = get_model_client(agent="ResearchAgent")
         self._delegate = AssistantAgent(
             "Researcher",
             model_client=model,
@@ -35,10 +75,14 @@ class ResearchAgent(RoutedAgent):
         )
     
     @message_handler
+    @memoize_handler(ttl_s=3600, maxsize=512, disk_path=os.path.join("cache", "research_memo.sqlite"), ignore=("priority",))
     async def handle_research(self, message: ResearchTask, ctx: MessageContext) -> ResearchTask:
         """Handle research tasks"""
         print(f"[RESEARCH AGENT] Processing: {message.query}")
         
+        # Each query stands alone: without earlier queries in the delegate's context the reply depends
+        # on the message only, which is what lets it be memoized (a hit never reaches the delegate)
+        await self._delegate.on_reset(ctx.cancellation_token)
         text_msg = TextMessage(content=message.query, source="user")
         response = await self._delegate.on_messages([text_msg], ctx.cancellation_token)
         
@@ -53,7 +97,7 @@ class AnalysisAgent(RoutedAgent):
     
     def __init__(self) -> None:
         super().__init__("AnalysisAgent")
-        model = OpenAIChatCompletionClient(model="gpt-4o-mini")
+        model = get_model_client(agent="AnalysisAgent")
         self._delegate = AssistantAgent(
             "Analyst",
             model_client=model,
@@ -102,6 +146,53 @@ class CoordinatorAgent(RoutedAgent):
         
         print("[COORDINATOR] ✅ Distributed workflow complete!\n")
         return final_result
+    
+    @message_handler
+    async def coordinate_batch(self, message: ResearchBatch, ctx: MessageContext) -> BatchResult:
+        """
+        Pipeline mode: research of task N+1 overlaps analysis of task N.
+        Each stage has `window` lanes (one agent instance per lane, so two
+        in-flight tasks never interleave in one agent's conversation); a batch
+        then takes about
+        N x the slowest stage instead of N x (research + analysis).
+        """
+        print(f"\n[COORDINATOR] Pipelining {len(message.queries)} tasks (window {message.window} per stage)")
+        stages = ["research", "analysis"]
+        lanes: Dict[str, asyncio.Queue] = {}
+        busy_s: Dict[str, float] = {stage: 0.0 for stage in stages}
+        for stage in stages:
+            lanes[stage] = asyncio.Queue()
+            for lane in range(message.window):
+                lanes[stage].put_nowait(f"lane-{lane}")
+        
+        async def run_stage(stage: str, task: ResearchTask) -> ResearchTask:
+            lane = await lanes[stage].get()
+            started = time.perf_counter()
+            try:
+                return await self.send_message(task, AgentId(stage, lane), cancellation_token=ctx.cancellation_token)
+            finally:
+                busy_s[stage] += time.perf_counter() - started
+                lanes[stage].put_nowait(lane)
+        
+        async def run_task(index: int, query: str) -> str:
+            researched = await run_stage("research", ResearchTask(query=query, complexity=message.complexity))
+            analyzed = await run_stage("analysis", researched)
+            print(f"[COORDINATOR] ✅ Task {index + 1}/{len(message.queries)} done")
+            return analyzed.query
+        
+        started = time.perf_counter()
+        results = await asyncio.gather(*(run_task(i, q) for i, q in enumerate(message.queries)))
+        wall_s = time.perf_counter() - started
+        
+        return BatchResult(
+            results=list(results),
+            wall_s=round(wall_s, 2),
+            tasks_per_min=round(len(results) / wall_s * 60, 2) if wall_s > 0 else 0.0,
+            stage_utilization={
+                stage: round(busy_s[stage] / (wall_s * message.window), 2) if wall_s > 0 else 0.0
+                for stage in stages
+            }
+        )
 
 
 async def run_distributed_demo():
@@ -127,6 +218,9 @@ async def run_distributed_demo():
     print("  🔧 Worker 2 - AnalysisAgent")
     print("  🔧 Worker 3 - CoordinatorAgent\n")
     
+    # Spans for every hop when AGENT_TRACING is set; the gRPC runtime propagates trace context
+    tracer_provider = setup_tracing("distributed_demo")
+    
     # Create and start gRPC host
     print("[SETUP] Creating gRPC host...")
     host = GrpcWorkerAgentRuntimeHost(address="localhost:50051")
@@ -135,23 +229,26 @@ async def run_distributed_demo():
     
     # Create Worker 1 - Research Agent
     print("[SETUP] Starting Worker 1 (ResearchAgent)...")
-    worker1 = GrpcWorkerAgentRuntime(host_address="localhost:50051")
+    worker1 = MailboxRuntime(GrpcWorkerAgentRuntime(host_address="localhost:50051", tracer_provider=tracer_provider))
     await worker1.start()
     await ResearchAgent.register(worker1, "research", lambda: ResearchAgent())
+    worker1.add_message_serializer(WIRE_SERIALIZERS)
     print("✅ Worker 1 ready\n")
     
     # Create Worker 2 - Analysis Agent
     print("[SETUP] Starting Worker 2 (AnalysisAgent)...")
-    worker2 = GrpcWorkerAgentRuntime(host_address="localhost:50051")
+    worker2 = MailboxRuntime(GrpcWorkerAgentRuntime(host_address="localhost:50051", tracer_provider=tracer_provider))
     await worker2.start()
     await AnalysisAgent.register(worker2, "analysis", lambda: AnalysisAgent())
+    worker2.add_message_serializer(WIRE_SERIALIZERS)
     print("✅ Worker 2 ready\n")
     
     # Create Worker 3 - Coordinator
     print("[SETUP] Starting Worker 3 (CoordinatorAgent)...")
-    worker3 = GrpcWorkerAgentRuntime(host_address="localhost:50051")
+    worker3 = MailboxRuntime(GrpcWorkerAgentRuntime(host_address="localhost:50051", tracer_provider=tracer_provider))
     await worker3.start()
     await CoordinatorAgent.register(worker3, "coordinator", lambda: CoordinatorAgent())
+    worker3.add_message_serializer(WIRE_SERIALIZERS)
     print("✅ Worker 3 ready\n")
     
     print("="*90)
@@ -182,5 +279,77 @@ async def run_distributed_demo():
     print("   communicating via gRPC network protocol!\n")
 
 
+async def run_pipeline_demo():
+    """Pipelined batch on one in-process runtime (works without the gRPC host)"""
+    print("\n" + "="*90)
+    print("🏭 PIPELINED RESEARCH → ANALYSIS DEMO")
+    print("="*90 + "\n")
+    
+    # Two handlers per stage; the third lane's work waits in the stage's mailbox
+    transcript = open_runtime_transcript("Pipelined research batch", "distributed_demo --pipeline")
+    runtime = MailboxRuntime(
+        SingleThreadedAgentRuntime(
+            tracer_provider=setup_tracing("distributed_demo"),
+            intervention_handlers=[transcript] if transcript else None
+        ),
+        per_type={stage: MailboxConfig(capacity=8, concurrency=2) for stage in ("research", "analysis")}
+    )
+    await ResearchAgent.register(runtime, "research", lambda: ResearchAgent())
+    await AnalysisAgent.register(runtime, "analysis", lambda: AnalysisAgent())
+    await CoordinatorAgent.register(runtime, "coordinator", lambda: CoordinatorAgent())
+    runtime.start()
+    
+    batch = ResearchBatch(
+        queries=[
+            "What are the key benefits of distributed AI agent systems?",
+            "How do message queues improve system reliability?",
+            "What is backpressure in stream processing?",
+            "Why do microservices use service discovery?",
+        ],
+        window=3
+    )
+    batch_run = asyncio.create_task(
+        runtime.send_message(batch, AgentId("coordinator", "default"), priority=Priority.BATCH)
+    )
+    
+    # An interactive request arriving mid-batch goes ahead of the queued batch work
+    await asyncio.sleep(1.0)
+    started = time.perf_counter()
+    await runtime.send_message(
+        ResearchTask(query="In one sentence, what is a mailbox in the actor model?", complexity="low"),
+        AgentId("coordinator", "interactive")
+    )
+    interactive_s = time.perf_counter() - started
+    result = await batch_run
+    
+    print("="*90)
+    print(f"\n📊 {len(result.results)} tasks in {result.wall_s}s → {result.tasks_per_min} tasks/min")
+    for stage, utilization in result.stage_utilization.items():
+        print(f"   {stage:9} utilization: {utilization:.0%}")
+    print(f"\n🚦 Interactive request during the batch: {interactive_s:.1f}s")
+    for agent_type, stats in runtime.stats().items():
+        lanes = stats["lanes"]
+        print(f"   {agent_type:11} max depth {stats['max_depth']}, wait p95 "
+              f"interactive {lanes['interactive']['wait_p95_ms']}ms / batch {lanes['batch']['wait_p95_ms']}ms")
+    
+    # The same batch again: research answers come from the memo cache, only analysis calls the model
+    started = time.perf_counter()
+    await runtime.send_message(batch, AgentId("coordinator", "default"), priority=Priority.BATCH)
+    print(f"\n♻️  Repeated batch: {time.perf_counter() - started:.1f}s")
+    for handler, stats in memo_report().items():
+        print(f"   {handler}: {stats['hits']} hits, {stats['disk_hits']} disk hits, "
+              f"{stats['misses']} misses, {stats['coalesced']} coalesced")
+    
+    await runtime.stop()
+    await runtime.close()
+    if transcript:
+        transcript.close()
+        print(f"🗄️  Runtime transcript archived as run {transcript.run.run_id} ({transcript.run.messages} messages)")
+    print()
+
+
 if __name__ == "__main__":
-    asyncio.run(run_distributed_demo())
+    if "--pipeline" in sys.argv:
+        asyncio.run(run_pipeline_demo())
+    else:
+        asyncio.run(run_distributed_demo())
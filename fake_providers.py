@@ -0,0 +1,353 @@
+"""
+AutoGen Multi-Agent System - Fake Providers
+Local HTTP stand-in for SerpApi, Brave Search, Alpha Vantage and OpenWeather, with injectable faults
+
+    with FakeProviders(latency_ms=80, error_rate=0.05) as fake:
+        result = search_web("message queues")   # served locally
+
+    python fake_providers.py --port 8999 --latency-ms 50 --rps 5   # standalone; prints the env to export
+
+Each route returns the provider's real response shape (the fields tools.py
+reads plus the usual envelope), so the tools' request building and parsing
+run unchanged. Latency (with jitter), random server errors and a per-provider
+rate limit are injected the way each provider reports them: HTTP 429 for
+SerpApi, Brave and OpenWeather, and a 200 with a "Note" for Alpha Vantage.
+Missing API keys get each provider's auth error. While running, the provider
+base URLs and dummy keys are set in os.environ (see tools.API_BASES).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from tools import API_BASES
+
+PROVIDERS = ("serpapi", "brave", "alpha_vantage", "openweather")
+ROUTES = {
+    "/search": "serpapi",
+    "/search.json": "serpapi",
+    "/res/v1/web/search": "brave",
+    "/query": "alpha_vantage",
+    "/data/2.5/weather": "openweather",
+}
+KEY_VARIABLES = {
+    "serpapi": "SERPER_API_KEY",
+    "brave": "BRAVE_SEARCH_API",
+    "alpha_vantage": "ALPHA_VANTAGE_API_KEY",
+    "openweather": "OPENWEATHER_API_KEY",
+}
+WORDS = ("latency throughput consistency replication queue broker consumer partition offset "
+         "backpressure retry idempotent cache index shard gradient model training").split()
+
+
+@dataclass
+class Faults:
+    """What one provider does besides answering"""
+    latency_ms: float = 0.0
+    jitter: float = 0.2            # latency varies by +/- this fraction
+    error_rate: float = 0.0        # share of requests answered with a 5xx
+    rate_limit_rps: float = 0.0    # 0 = unlimited; token bucket with a one-second burst
+    results: int = 10              # search results per response
+
+
+@dataclass
+class _Bucket:
+    rate: float
+    tokens: float = 0.0
+    updated: float = field(default_factory=time.monotonic)
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(max(self.rate, 1.0), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+def _rng(*parts: Any) -> random.Random:
+    """Deterministic content per query, so repeated calls parse identical payloads"""
+    return random.Random(hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest())
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+# ---------------------------------------------------------------------------
+# Response bodies, one per provider
+# ---------------------------------------------------------------------------
+
+
+def serpapi_body(params: Dict[str, str], faults: Faults) -> Tuple[int, Dict[str, Any]]:
+    if not params.get("api_key"):
+        return 401, {"error": "Invalid API key. Your API key should be here: https://serpapi.com/manage-api-key"}
+    query = params.get("q", "")
+    rng = _rng("serpapi", query)
+    organic = [
+        {
+            "position": i + 1,
+            "title": f"{query.title()} - {_sentence(rng, 4)}",
+            "link": f"https://example.com/{rng.getrandbits(32):x}",
+            "displayed_link": "example.com",
+            "snippet": _sentence(rng, 30),
+            "source": "Example"
+        }
+        for i in range(faults.results)
+    ]
+    return 200, {
+        "search_metadata": {"id": f"{rng.getrandbits(64):x}", "status": "Success", "total_time_taken": 0.42},
+        "search_parameters": {"engine": params.get("engine", "google"), "q": query},
+        "search_information": {"total_results": rng.randint(10_000, 10_000_000)},
+        "organic_results": organic,
+        "related_searches": [{"query": f"{query} {w}"} for w in rng.sample(WORDS, 4)]
+    }
+
+
+def brave_body(params: Dict[str, str], headers: Any, faults: Faults) -> Tuple[int, Dict[str, Any]]:
+    if not headers.get("X-Subscription-Token"):
+        return 422, {"type": "ErrorResponse", "error": {"code": "SUBSCRIPTION_TOKEN_INVALID", "status": 422}}
+    query = params.get("q", "")
+    rng = _rng("brave", query)
+    results = [
+        {
+            "type": "search_result",
+            "title": f"{query.title()}: {_sentence(rng, 5)}",
+            "url": f"https://example.org/{rng.getrandbits(32):x}",
+            "description": _sentence(rng, 35),
+            "language": "en",
+            "profile": {"name": "Example", "url": "https://example.org"}
+        }
+        for _ in range(faults.results)
+    ]
+    return 200, {"type": "search", "query": {"original": query}, "web": {"type": "search", "results": results}}
+
+
+def alpha_vantage_body(params: Dict[str, str], faults: Faults) -> Tuple[int, Dict[str, Any]]:
+    if not params.get("apikey"):
+        return 200, {"Error Message": "the parameter apikey is invalid or missing."}
+    symbol = params.get("symbol", "").upper()
+    rng = _rng("alpha_vantage", symbol)
+    previous = rng.uniform(20, 500)
+    price = previous * rng.uniform(0.95, 1.05)
+    return 200, {"Global Quote": {
+        "01. symbol": symbol,
+        "02. open": f"{previous * 1.002:.4f}",
+        "03. high": f"{max(price, previous) * 1.01:.4f}",
+        "04. low": f"{min(price, previous) * 0.99:.4f}",
+        "05. price": f"{price:.4f}",
+        "06. volume": str(rng.randint(100_000, 90_000_000)),
+        "07. latest trading day": time.strftime("%Y-%m-%d"),
+        "08. previous close": f"{previous:.4f}",
+        "09. change": f"{price - previous:.4f}",
+        "10. change percent": f"{(price / previous - 1) * 100:.4f}%"
+    }}
+
+
+def openweather_body(params: Dict[str, str], faults: Faults) -> Tuple[int, Dict[str, Any]]:
+    if not params.get("appid"):
+        return 401, {"cod": 401, "message": "Invalid API key. Please see https://openweathermap.org/faq#error401 for more info."}
+    city = params.get("q", "")
+    if not city or city.lower().startswith("nowhere"):
+        return 404, {"cod": "404", "message": "city not found"}
+    rng = _rng("openweather", city)
+    temp = rng.uniform(-10, 35)
+    return 200, {
+        "coord": {"lon": rng.uniform(-180, 180), "lat": rng.uniform(-90, 90)},
+        "weather": [{"id": 800, "main": "Clear", "description": rng.choice(["clear sky", "few clouds", "light rain"]), "icon": "01d"}],
+        "base": "stations",
+        "main": {"temp": round(temp, 2), "feels_like": round(temp - 1.5, 2), "temp_min": round(temp - 2, 2),
+                 "temp_max": round(temp + 2, 2), "pressure": 1013, "humidity": rng.randint(20, 95)},
+        "visibility": 10000,
+        "wind": {"speed": round(rng.uniform(0, 12), 2), "deg": rng.randint(0, 359)},
+        "clouds": {"all": rng.randint(0, 100)},
+        "dt": int(time.time()),
+        "sys": {"country": "US", "sunrise": 1700000000, "sunset": 1700040000},
+        "timezone": -18000,
+        "name": city.title(),
+        "cod": 200
+    }
+
+
+def provider_env(url: str) -> Dict[str, str]:
+    """Environment that points tools.py at a fake server at `url`, with dummy keys"""
+    env = {variable: url for variable, _ in API_BASES.values()}
+    env.update({variable: f"fake-{provider}-key" for provider, variable in KEY_VARIABLES.items()})
+    return env
+
+
+def _rate_limited(provider: str) -> Tuple[int, Dict[str, Any]]:
+    if provider == "alpha_vantage":
+        # Alpha Vantage answers 200 and explains the limit in the body
+        return 200, {"Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute."}
+    if provider == "openweather":
+        return 429, {"cod": 429, "message": "Your account is temporary blocked due to exceeding of requests limitation."}
+    if provider == "brave":
+        return 429, {"type": "ErrorResponse", "error": {"code": "RATE_LIMITED", "status": 429}}
+    return 429, {"error": "Your account has run out of searches."}
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # the default backlog of 5 stalls concurrent benchmarks on SYN retries
+
+
+class FakeProviders:
+    """Threaded local server for all four providers; use as a context manager"""
+
+    def __init__(self, port: int = 0, latency_ms: float = 0.0, jitter: float = 0.2, error_rate: float = 0.0,
+                 rate_limit_rps: float = 0.0, results: int = 10, seed: Optional[int] = None) -> None:
+        self.faults = {
+            provider: Faults(latency_ms, jitter, error_rate, rate_limit_rps, results) for provider in PROVIDERS
+        }
+        self.stats: Dict[str, Dict[str, int]] = {provider: {} for provider in PROVIDERS}
+        self._buckets: Dict[str, _Bucket] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._saved_env: Dict[str, Optional[str]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self.server = _Server(("127.0.0.1", port), self._handler())
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def configure(self, provider: Optional[str] = None, **changes: Any) -> None:
+        """Change faults for one provider (or all) while running"""
+        with self._lock:
+            for name in [provider] if provider else PROVIDERS:
+                for key, value in changes.items():
+                    setattr(self.faults[name], key, value)
+                self._buckets.pop(name, None)
+
+    def env(self) -> Dict[str, str]:
+        """Environment that points tools.py at this server, with dummy keys"""
+        return provider_env(self.url)
+
+    def start(self) -> "FakeProviders":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-providers", daemon=True)
+        self._thread.start()
+        for key, value in self.env().items():
+            self._saved_env[key] = os.environ.get(key)
+            os.environ[key] = value
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        for key, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        self._saved_env.clear()
+
+    def __enter__(self) -> "FakeProviders":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def _admit(self, provider: str) -> Tuple[Faults, Optional[Tuple[int, Dict[str, Any]]], float]:
+        """Faults for this request, an injected response if any, and the delay to apply"""
+        with self._lock:
+            faults = self.faults[provider]
+            if faults.rate_limit_rps > 0:
+                bucket = self._buckets.setdefault(provider, _Bucket(faults.rate_limit_rps, tokens=max(faults.rate_limit_rps, 1.0)))
+                if not bucket.take():
+                    return faults, _rate_limited(provider), 0.0
+            delay = faults.latency_ms / 1000 * self._random.uniform(1 - faults.jitter, 1 + faults.jitter)
+            if self._random.random() < faults.error_rate:
+                return faults, (self._random.choice([500, 502, 503]), {"error": "injected server error"}), delay
+            return faults, None, delay
+
+    def _count(self, provider: str, status: int) -> None:
+        with self._lock:
+            counts = self.stats[provider]
+            counts[str(status)] = counts.get(str(status), 0) + 1
+
+    def _handler(self) -> type:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+
+            def do_GET(self) -> None:
+                parts = urlsplit(self.path)
+                provider = ROUTES.get(parts.path)
+                if provider is None:
+                    return self._send(404, {"error": f"no fake provider at {parts.path}"})
+                params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+                faults, injected, delay = fake._admit(provider)
+                if delay:
+                    time.sleep(delay)
+                if injected is not None:
+                    status, body = injected
+                elif provider == "serpapi":
+                    status, body = serpapi_body(params, faults)
+                elif provider == "brave":
+                    status, body = brave_body(params, self.headers, faults)
+                elif provider == "alpha_vantage":
+                    status, body = alpha_vantage_body(params, faults)
+                else:
+                    status, body = openweather_body(params, faults)
+                fake._count(provider, status)
+                self._send(status, body)
+
+            def _send(self, status: int, body: Dict[str, Any]) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve fake SerpApi, Brave, Alpha Vantage and OpenWeather APIs")
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rps", type=float, default=0.0, help="Rate limit per provider (0 = none)")
+    parser.add_argument("--results", type=int, default=10, help="Results per search response")
+    args = parser.parse_args()
+
+    fake = FakeProviders(args.port, args.latency_ms, args.jitter, args.error_rate, args.rps, args.results)
+    print("\n" + "="*80)
+    print(f"🧪 Fake providers on {fake.url}")
+    print("="*80 + "\n")
+    print("Point the tools at it with:\n")
+    for key, value in fake.env().items():
+        print(f"export {key}={value}")
+    print("\nCtrl+C to stop.\n")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.server.server_close()
+        print(f"\n📊 Responses by status: {json.dumps(fake.stats)}")
+
+
+if __name__ == "__main__":
+    main()
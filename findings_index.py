@@ -0,0 +1,247 @@
+"""
+AutoGen Multi-Agent System - Prior Findings Index
+Local full-text index (SQLite FTS5, BM25 ranking) of past search results and final answers
+
+Web search tools wrapped with `record_findings` store every result they return,
+and the teams store each run's final answer. The Researcher gets
+`search_prior_findings` as a tool: a local BM25 query that answers in
+milliseconds, with each hit's age so stale ones can be fetched again.
+
+    researcher = AssistantAgent(..., tools=[search_prior_findings, record_findings(search_web)])
+
+The index lives in `cache/findings.sqlite` (AGENT_FINDINGS_DB). Results older
+than AGENT_FINDINGS_STALE_DAYS (default 7) are flagged `stale`.
+Run `python findings_index.py` for a local benchmark.
+"""
+
+import functools
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+DEFAULT_FINDINGS_DB = os.path.join("cache", "findings.sqlite")
+STALE_AFTER_DAYS = float(os.getenv("AGENT_FINDINGS_STALE_DAYS", "7"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS findings (
+    id INTEGER PRIMARY KEY, kind TEXT, source TEXT, query TEXT, title TEXT,
+    body TEXT, url TEXT, fingerprint TEXT UNIQUE, fetched REAL
+);
+CREATE INDEX IF NOT EXISTS findings_fetched ON findings (fetched);
+CREATE VIRTUAL TABLE IF NOT EXISTS findings_fts USING fts5(
+    title, body, query, content='findings', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS findings_ai AFTER INSERT ON findings BEGIN
+    INSERT INTO findings_fts (rowid, title, body, query) VALUES (new.id, new.title, new.body, new.query);
+END;
+CREATE TRIGGER IF NOT EXISTS findings_ad AFTER DELETE ON findings BEGIN
+    INSERT INTO findings_fts (findings_fts, rowid, title, body, query) VALUES ('delete', old.id, old.title, old.body, old.query);
+END;
+CREATE TRIGGER IF NOT EXISTS findings_au AFTER UPDATE ON findings BEGIN
+    INSERT INTO findings_fts (findings_fts, rowid, title, body, query) VALUES ('delete', old.id, old.title, old.body, old.query);
+    INSERT INTO findings_fts (rowid, title, body, query) VALUES (new.id, new.title, new.body, new.query);
+END;
+"""
+
+# Weights for bm25(title, body, query): a match in the title counts most
+_BM25 = "bm25(findings_fts, 4.0, 1.0, 2.0)"
+
+
+def match_expression(text: str) -> str:
+    """Free text to an FTS5 query: every word quoted (no syntax errors), any word may match"""
+    words = re.findall(r"\w+", text.lower())
+    return " OR ".join(f'"{w}"' for w in dict.fromkeys(words))
+
+
+class FindingsIndex:
+    """BM25-ranked store of search results and answers; safe to share between tool threads"""
+
+    def __init__(self, path: str = DEFAULT_FINDINGS_DB, stale_after_days: float = STALE_AFTER_DAYS) -> None:
+        self.path = path
+        self.stale_after_s = stale_after_days * 86400
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def add(self, kind: str, source: str, query: str, title: str, body: str, url: str = "") -> None:
+        """Store one finding; the same url (or text) seen again is refreshed, not duplicated"""
+        fingerprint = hashlib.sha1(f"{kind}|{url or title + body}".encode()).hexdigest()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO findings (kind, source, query, title, body, url, fingerprint, fetched) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (fingerprint) DO UPDATE SET "
+                "query = excluded.query, title = excluded.title, body = excluded.body, fetched = excluded.fetched",
+                (kind, source, query, title, body, url, fingerprint, time.time())
+            )
+
+    def record_search(self, source: str, query: str, results: Sequence[Dict[str, Any]]) -> int:
+        """Store the results of a web search tool (Serper or Brave result shapes)"""
+        stored = 0
+        for result in results:
+            body = result.get("snippet") or result.get("description") or ""
+            url = result.get("link") or result.get("url") or ""
+            if body or url:
+                self.add("search", source, query, result.get("title", ""), body, url)
+                stored += 1
+        return stored
+
+    def record_answer(self, task: str, answer: str, agent: str = "") -> None:
+        """Store a team's final answer to `task`"""
+        self.add("answer", agent, task, task[:200], answer)
+
+    def search(self, query: str, limit: int = 5, max_age_days: Optional[float] = None,
+               kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Best BM25 matches for `query`, each with its age and a `stale` flag"""
+        expression = match_expression(query)
+        if not expression:
+            return []
+        clauses = ["findings_fts MATCH ?"]
+        params: List[Any] = [expression]
+        if max_age_days is not None:
+            clauses.append("f.fetched >= ?")
+            params.append(time.time() - max_age_days * 86400)
+        if kind:
+            clauses.append("f.kind = ?")
+            params.append(kind)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT f.kind, f.source, f.query, f.title, f.body, f.url, f.fetched, {_BM25} AS score "
+                f"FROM findings_fts JOIN findings f ON f.id = findings_fts.rowid "
+                f"WHERE {' AND '.join(clauses)} ORDER BY score LIMIT ?",
+                params + [limit]
+            ).fetchall()
+        now = time.time()
+        return [
+            {
+                "kind": kind_,
+                "title": title,
+                "text": body,
+                "url": url,
+                "source": source,
+                "original_query": original,
+                "score": round(-score, 3),  # bm25() is lower-is-better; flip it
+                "fetched_at": datetime.fromtimestamp(fetched).isoformat(timespec="seconds"),
+                "age_hours": round((now - fetched) / 3600, 1),
+                "stale": now - fetched > self.stale_after_s
+            }
+            for kind_, source, original, title, body, url, fetched, score in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._db.execute("SELECT kind, COUNT(*), MIN(fetched) FROM findings GROUP BY kind").fetchall()
+        return {kind: {"count": count, "oldest": datetime.fromtimestamp(oldest).isoformat(timespec="seconds")}
+                for kind, count, oldest in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_index: Optional[FindingsIndex] = None
+
+
+def get_index() -> FindingsIndex:
+    """The process-wide findings index"""
+    global _index
+    if _index is None:
+        _index = FindingsIndex(os.getenv("AGENT_FINDINGS_DB", DEFAULT_FINDINGS_DB))
+    return _index
+
+
+def search_prior_findings(query: str, max_age_days: float = 30.0) -> Dict[str, Any]:
+    """
+    Search earlier web results and final answers (local, instant). Use before web search;
+    search the web only when nothing relevant comes back or the hits are stale.
+    """
+    try:
+        started = time.perf_counter()
+        results = get_index().search(query, limit=5, max_age_days=max_age_days)
+        for result in results:
+            result["text"] = result["text"][:600]
+        return {
+            "results": results,
+            "count": len(results),
+            "all_stale": bool(results) and all(r["stale"] for r in results),
+            "took_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+    except Exception as e:
+        return {"error": str(e), "results": []}
+
+
+def record_findings(search_tool: Callable[[str], Dict[str, Any]]) -> Callable[[str], Dict[str, Any]]:
+    """Wrap a web search tool so its results go into the index; keeps the signature for schema generation"""
+    @functools.wraps(search_tool)
+    def wrapper(query: str) -> Dict[str, Any]:
+        result = search_tool(query)
+        if result.get("results"):
+            try:
+                get_index().record_search(search_tool.__name__, query, result["results"])
+            except sqlite3.Error as e:
+                print(f"⚠️  Could not index {search_tool.__name__} results: {e}")
+        return result
+    return wrapper
+
+
+def record_final_answer(task: str, messages: Sequence[Any], marker: str = "FINAL ANSWER:") -> None:
+    """Index the last message containing `marker` of a team run; runs that never reached one are skipped"""
+    # Without the marker the last message is a tool result, an unfinished draft or a budget stop,
+    # and indexing it would serve a non-answer to later searches as a prior finding
+    final = next((m for m in reversed(messages) if isinstance(m.content, str) and marker in m.content), None)
+    if final is not None:
+        get_index().record_answer(task, final.content, str(final.source))
+
+
+# ---------------------------------------------------------------------------
+# Benchmark: a synthetic index of past results
+# ---------------------------------------------------------------------------
+
+
+def benchmark(findings: int = 20_000, queries: int = 200) -> None:
+    import random
+    import tempfile
+
+    topics = ["quantum computing", "machine learning", "blockchain", "binary search tree", "distributed systems",
+              "message queues", "backpressure", "service discovery", "python generators", "linear regression"]
+    words = "latency throughput consistency replication qubit gradient ledger consensus cache index shard".split()
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = FindingsIndex(os.path.join(tmp, "findings.sqlite"))
+        started = time.perf_counter()
+        for i in range(findings):
+            topic = rng.choice(topics)
+            text = f"{topic} " + " ".join(rng.choices(words, k=30))
+            index.add("search", "search_web", topic, f"{topic.title()} overview {i}", text, f"https://example.com/{i}")
+        insert_s = time.perf_counter() - started
+
+        durations = []
+        for _ in range(queries):
+            query = f"{rng.choice(topics)} {rng.choice(words)}"
+            started = time.perf_counter()
+            index.search(query)
+            durations.append((time.perf_counter() - started) * 1000)
+        durations.sort()
+        index.close()
+
+    print("\n" + "="*80)
+    print("🔎 PRIOR FINDINGS INDEX BENCHMARK")
+    print("="*80 + "\n")
+    print(f"Indexed {findings} findings in {insert_s:.1f}s")
+    print(f"{queries} queries: p50 {durations[len(durations) // 2]:.2f}ms, p95 {durations[int(len(durations) * 0.95)]:.2f}ms")
+    print("(a web search round trip is typically 500-2000ms)\n")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        print(search_prior_findings(" ".join(sys.argv[1:])))
+    else:
+        benchmark()
@@ -0,0 +1,147 @@
+"""
+AutoGen Multi-Agent System - Import Budget
+Cold-start import time of every entry point, with the slowest imports and eager-import checks
+
+Usage:
+    python import_budget.py                    # all entry points, default budgets
+    python import_budget.py dashboard --top 15
+    python import_budget.py --scale 2          # slower machine: double every budget
+
+Each module is imported in a fresh interpreter under `python -X importtime`. A
+module fails the check when its import takes longer than its budget, or when it
+pulls in one of the heavy packages that should only load when first used
+(the autogen/openai stack, HTTP clients). Exits 1 on any failure, so it can
+gate CI.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Import-time budget per entry point, in ms (cumulative, as reported by -X importtime)
+BUDGETS_MS: Dict[str, float] = {
+    "tools": 50,
+    "demo": 150,
+    "app": 150,
+    "multi_agent": 250,
+    "batch_runner": 250,
+    "dashboard": 700,
+}
+
+# Loaded by the builders and tools that need them, never by importing an entry point
+LAZY_PACKAGES: Tuple[str, ...] = (
+    "autogen_agentchat",
+    "autogen_ext",
+    "openai",
+    "requests",
+    "serpapi",
+)
+
+
+@dataclass
+class ImportProfile:
+    module: str
+    wall_ms: float                  # interpreter start + import, minus a bare interpreter
+    import_ms: float                # cumulative import time of the module itself
+    imports: List[Tuple[str, int, float, float]] = field(default_factory=list)  # name, depth, self ms, cumulative ms
+    error: Optional[str] = None
+
+    def loaded(self, package: str) -> bool:
+        return any(name == package or name.startswith(package + ".") for name, _, _, _ in self.imports)
+
+
+def _run(code: str) -> Tuple[float, subprocess.CompletedProcess]:
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    return (time.perf_counter() - started) * 1000, proc
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, float, float]]:
+    """Rows of `-X importtime` output as (module, depth, self ms, cumulative ms)"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            rows.append((name.strip(), depth, int(self_us) / 1000, int(cumulative_us) / 1000))
+        except ValueError:
+            continue
+    return rows
+
+
+def profile(module: str, repeat: int = 3) -> ImportProfile:
+    """Best of `repeat` cold imports of `module`"""
+    baseline = min(_run("pass")[0] for _ in range(repeat))
+    best: Optional[ImportProfile] = None
+    for _ in range(repeat):
+        wall_ms, proc = _run(f"import {module}")
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+            return ImportProfile(module, wall_ms - baseline, 0.0, error=error)
+        rows = parse_importtime(proc.stderr)
+        import_ms = next((cum for name, depth, _, cum in rows if name == module and depth == 0), 0.0)
+        candidate = ImportProfile(module, round(wall_ms - baseline, 1), round(import_ms, 1), rows)
+        if best is None or candidate.import_ms < best.import_ms:
+            best = candidate
+    return best
+
+
+def slowest(profile_: ImportProfile, top: int) -> List[Tuple[str, float, float]]:
+    """Top-level packages by cumulative time, excluding the module itself"""
+    totals: Dict[str, Tuple[float, float]] = {}
+    for name, depth, self_ms, cumulative_ms in profile_.imports:
+        if name == profile_.module:
+            continue
+        root = name.split(".")[0]
+        own, cumulative = totals.get(root, (0.0, 0.0))
+        # A package's first (outermost) import carries the cumulative time of its submodules
+        totals[root] = (own + self_ms, max(cumulative, cumulative_ms))
+    ranked = sorted(totals.items(), key=lambda kv: -kv[1][1])[:top]
+    return [(name, round(own, 1), round(cumulative, 1)) for name, (own, cumulative) in ranked]
+
+
+def check(modules: Sequence[str], scale: float = 1.0, top: int = 8, repeat: int = 3) -> bool:
+    """Profile each module, print the report and return True when all are within budget"""
+    print("\n" + "="*80)
+    print("⏱️  IMPORT BUDGET")
+    print("="*80 + "\n")
+    ok = True
+    for module in modules:
+        result = profile(module, repeat)
+        budget = BUDGETS_MS.get(module, 500.0) * scale
+        if result.error:
+            ok = False
+            print(f"❌ {module}: import failed ({result.error})\n")
+            continue
+
+        eager = [p for p in LAZY_PACKAGES if result.loaded(p)]
+        within = result.import_ms <= budget and not eager
+        ok = ok and within
+        status = "✅" if within else "❌"
+        print(f"{status} {module}: {result.import_ms:.0f}ms import (budget {budget:.0f}ms), {result.wall_ms:.0f}ms to ready")
+        if eager:
+            print(f"   eagerly imports: {', '.join(eager)}")
+        for name, own, cumulative in slowest(result, top):
+            print(f"   {name:32} {cumulative:8.1f}ms  (own modules {own:.1f}ms)")
+        print()
+    print("✅ All entry points within budget\n" if ok else "❌ Import budget exceeded\n")
+    return ok
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check cold-start import time of the entry points")
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS_MS), help="Modules to check (default: all entry points)")
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to list per module")
+    parser.add_argument("--repeat", type=int, default=3, help="Cold imports per module (the fastest counts)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (slow CI machines)")
+    args = parser.parse_args(argv)
+    return 0 if check(args.modules, args.scale, args.top, args.repeat) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,344 @@
+"""
+AutoGen Multi-Agent System - Kernel Sessions
+Long-lived Python interpreters for the Coder: variables and imports persist across tool calls
+
+    with KernelSession() as kernel:
+        coder = AssistantAgent(..., tools=[*kernel.tools(), save_to_file])
+
+`execute_python_code` starts a new interpreter for every call, so a multi-step
+analysis re-imports and recomputes everything each time. A KernelSession keeps
+one sandboxed interpreter per team run instead. Each kernel runs in `sandbox/`
+with an address-space limit (memory_mb), a per-call timeout (the call is
+interrupted, the state kept), and an idle timeout after which the process is
+stopped. `reset()` starts over, `snapshot()` lists the variables and
+`save()`/`restore()` move picklable state between sessions. The kernel is
+stopped when the session is closed or the process exits.
+"""
+
+import atexit
+import itertools
+import json
+import os
+import select
+import signal
+import subprocess
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from tools import SANDBOX_DIR
+
+DEFAULT_MEMORY_MB = int(os.getenv("KERNEL_MEMORY_MB", "2048"))
+DEFAULT_IDLE_TIMEOUT_S = float(os.getenv("KERNEL_IDLE_TIMEOUT_S", "600"))
+DEFAULT_CALL_TIMEOUT_S = 30.0
+OUTPUT_LIMIT = 20_000  # characters of stdout/stderr returned per call
+
+# Runs inside the kernel process. Replies go to a private copy of stdout; fd 1
+# itself points at stderr, so stray writes (child processes, C code) cannot
+# corrupt the protocol.
+_KERNEL_SOURCE = r'''
+import ast, contextlib, io, json, os, pickle, sys, traceback, types
+
+memory_mb = int(sys.argv[1])
+try:
+    import resource
+    resource.setrlimit(resource.RLIMIT_AS, (memory_mb * 2**20, memory_mb * 2**20))
+except (ImportError, ValueError, OSError):
+    pass
+
+replies = os.fdopen(os.dup(1), "w")
+os.dup2(2, 1)
+sys.stdout = sys.stderr
+
+def fresh_namespace():
+    return {"__name__": "__main__", "__builtins__": __builtins__}
+
+ns = fresh_namespace()
+count = 0
+
+def user_names():
+    return [n for n in ns if not n.startswith("_")]
+
+def run(code):
+    tree = ast.parse(code, "<cell>", "exec")
+    last = None
+    if tree.body and isinstance(tree.body[-1], ast.Expr):
+        last = ast.Expression(tree.body.pop().value)
+    exec(compile(tree, "<cell>", "exec"), ns)
+    if last is not None:
+        value = eval(compile(last, "<cell>", "eval"), ns)
+        if value is not None:
+            print(repr(value))
+
+def describe(name, value):
+    size = getattr(value, "nbytes", None) or sys.getsizeof(value)
+    shape = getattr(value, "shape", None)
+    text = repr(value) if not isinstance(value, types.ModuleType) else value.__name__
+    return {"name": name, "type": type(value).__name__, "bytes": int(size),
+            "shape": list(shape) if isinstance(shape, tuple) else None, "preview": text[:80]}
+
+def handle(request):
+    global count
+    op = request["op"]
+    if op == "exec":
+        count += 1
+        out, err = io.StringIO(), io.StringIO()
+        ok = True
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            try:
+                run(request["code"])
+            except KeyboardInterrupt:
+                ok = False
+                err.write("KeyboardInterrupt: call timed out; session state was kept\n")
+            except MemoryError:
+                ok = False
+                err.write(f"MemoryError: session limit is {memory_mb} MB\n")
+            except BaseException as e:
+                ok = False
+                tb = e.__traceback__
+                while tb is not None and tb.tb_frame.f_code.co_filename != "<cell>":
+                    tb = tb.tb_next  # hide the kernel's own frames
+                err.write("".join(traceback.format_exception(type(e), e, tb)))
+        return {"stdout": out.getvalue(), "stderr": err.getvalue(), "returncode": 0 if ok else 1,
+                "success": ok, "execution_count": count}
+    if op == "snapshot":
+        try:
+            import resource
+            peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        except ImportError:
+            peak_mb = None
+        return {"variables": [describe(n, ns[n]) for n in user_names()], "execution_count": count,
+                "peak_rss_mb": peak_mb}
+    if op == "save":
+        modules, values, skipped = {}, {}, []
+        for name in user_names():
+            value = ns[name]
+            if isinstance(value, types.ModuleType):
+                modules[name] = value.__name__
+                continue
+            try:
+                values[name] = pickle.dumps(value)
+            except Exception:
+                skipped.append(name)
+        with open(request["path"], "wb") as f:
+            pickle.dump({"modules": modules, "values": values}, f)
+        return {"saved": sorted(modules) + sorted(values), "skipped": skipped}
+    if op == "restore":
+        with open(request["path"], "rb") as f:
+            state = pickle.load(f)
+        for name, module in state["modules"].items():
+            ns[name] = __import__(module, fromlist=["_"])
+        for name, blob in state["values"].items():
+            ns[name] = pickle.loads(blob)
+        return {"restored": sorted(state["modules"]) + sorted(state["values"])}
+    raise ValueError(f"unknown op {op!r}")
+
+for line in sys.stdin:
+    try:
+        reply = handle(json.loads(line))
+    except KeyboardInterrupt:
+        reply = {"error": "interrupted"}
+    except BaseException as e:
+        reply = {"error": f"{type(e).__name__}: {e}"}
+    replies.write(json.dumps(reply) + "\n")
+    replies.flush()
+'''
+
+_ids = itertools.count(1)
+_live: Set["KernelSession"] = set()  # open sessions, stopped at exit
+
+
+class KernelSession:
+    """One persistent, resource-limited interpreter; thread-safe, restarted on demand"""
+
+    def __init__(self, name: Optional[str] = None, memory_mb: int = DEFAULT_MEMORY_MB,
+                 idle_timeout_s: float = DEFAULT_IDLE_TIMEOUT_S, call_timeout_s: float = DEFAULT_CALL_TIMEOUT_S,
+                 python: str = "python3") -> None:
+        self.name = name or f"kernel-{os.getpid()}-{next(_ids)}"
+        self.memory_mb = memory_mb
+        self.idle_timeout_s = idle_timeout_s
+        self.call_timeout_s = call_timeout_s
+        self.python = python
+        self.stats = {"calls": 0, "starts": 0, "interrupts": 0, "kills": 0, "idle_stops": 0}
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self._last_used = time.monotonic()
+        self._notice: Optional[str] = None  # told to the agent on its next call
+        self._closed = threading.Event()
+        threading.Thread(target=self._watch_idle, name=f"{self.name}-idle", daemon=True).start()
+        _live.add(self)
+
+    # -- process management ---------------------------------------------------
+
+    def _start(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            os.makedirs(SANDBOX_DIR, exist_ok=True)
+            env = {**os.environ, "PYTHONUNBUFFERED": "1", "OPENBLAS_NUM_THREADS": "1", "MKL_NUM_THREADS": "1"}
+            self._process = subprocess.Popen(
+                [self.python, "-c", _KERNEL_SOURCE, str(self.memory_mb)],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                cwd=SANDBOX_DIR, env=env, text=True, bufsize=1
+            )
+            self.stats["starts"] += 1
+        return self._process
+
+    def _stop(self) -> None:
+        process, self._process = self._process, None
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
+
+    def _request(self, request: Dict[str, Any], timeout_s: float) -> Dict[str, Any]:
+        """Send one request; interrupt after `timeout_s`, kill if the interrupt is ignored"""
+        process = self._start()
+        self._last_used = time.monotonic()
+        try:
+            process.stdin.write(json.dumps(request) + "\n")
+            process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            self._stop()
+            return {"error": "kernel exited; it has been restarted and its state lost", "success": False}
+        ready, _, _ = select.select([process.stdout], [], [], timeout_s)
+        if not ready:
+            self.stats["interrupts"] += 1
+            process.send_signal(signal.SIGINT)
+            ready, _, _ = select.select([process.stdout], [], [], 5.0)
+            if not ready:
+                self.stats["kills"] += 1
+                self._stop()
+                return {"error": f"call did not stop after {timeout_s:.0f}s; kernel restarted, state lost",
+                        "success": False}
+        line = process.stdout.readline()
+        self._last_used = time.monotonic()
+        if not line:
+            self._stop()
+            return {"error": "kernel exited (out of memory?); it has been restarted and its state lost",
+                    "success": False}
+        return json.loads(line)
+
+    def _watch_idle(self) -> None:
+        while not self._closed.wait(min(30.0, self.idle_timeout_s / 4)):
+            with self._lock:
+                idle = time.monotonic() - self._last_used
+                if self._process is not None and idle > self.idle_timeout_s:
+                    self._stop()
+                    self.stats["idle_stops"] += 1
+                    self._notice = f"kernel was stopped after {self.idle_timeout_s:.0f}s idle; earlier state is gone"
+
+    # -- public API -----------------------------------------------------------
+
+    def execute(self, code: str, timeout_s: Optional[float] = None) -> Dict[str, Any]:
+        """Run `code` in the session; the value of a trailing expression is printed"""
+        with self._lock:
+            self.stats["calls"] += 1
+            started = time.perf_counter()
+            result = self._request({"op": "exec", "code": code}, timeout_s or self.call_timeout_s)
+            if result.get("stderr", "").startswith("KeyboardInterrupt"):
+                result["stderr"] = f"Execution timeout ({timeout_s or self.call_timeout_s:.0f}s limit); session state was kept\n"
+            for stream in ("stdout", "stderr"):
+                if len(result.get(stream, "")) > OUTPUT_LIMIT:
+                    result[stream] = result[stream][:OUTPUT_LIMIT] + f"\n... [truncated at {OUTPUT_LIMIT} characters]"
+            result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            if self._notice:
+                result["notice"], self._notice = self._notice, None
+            return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Variables in the session with type, size and a short preview"""
+        with self._lock:
+            if self._process is None or self._process.poll() is not None:
+                return {"variables": [], "execution_count": 0, "running": False}
+            return {**self._request({"op": "snapshot"}, 10.0), "running": True}
+
+    def save(self, path: Optional[str] = None) -> Dict[str, Any]:
+        """Pickle the session's picklable variables (and imported module names) to `path`"""
+        path = os.path.abspath(path or os.path.join(SANDBOX_DIR, ".kernels", f"{self.name}.pkl"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock:
+            return {**self._request({"op": "save", "path": path}, 60.0), "path": path}
+
+    def restore(self, path: str) -> Dict[str, Any]:
+        """Load variables written by `save()` into this session"""
+        with self._lock:
+            return self._request({"op": "restore", "path": os.path.abspath(path)}, 60.0)
+
+    def reset(self) -> None:
+        """Drop all state by restarting the interpreter (frees its memory too)"""
+        with self._lock:
+            self._stop()
+            self._notice = None
+
+    def close(self) -> None:
+        self._closed.set()
+        with self._lock:
+            self._stop()
+        _live.discard(self)
+
+    def __enter__(self) -> "KernelSession":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def tools(self) -> List[Callable[..., Dict[str, Any]]]:
+        """Agent tools bound to this session: run_python, python_state, reset_python"""
+        def run_python(code: str) -> Dict[str, Any]:
+            """
+            Run Python in your persistent session: variables, imports and loaded data stay for later calls,
+            so run analysis step by step. The value of a trailing expression is printed.
+            """
+            return self.execute(code)
+
+        def python_state() -> Dict[str, Any]:
+            """List the variables currently defined in your Python session"""
+            return self.snapshot()
+
+        def reset_python() -> Dict[str, Any]:
+            """Clear your Python session (all variables and imports)"""
+            self.reset()
+            return {"reset": True}
+
+        return [run_python, python_state, reset_python]
+
+
+@atexit.register
+def close_all() -> None:
+    """Stop every kernel still running (called at exit)"""
+    for session in list(_live):
+        session.close()
+
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print("🧮 KERNEL SESSION DEMO")
+    print("="*80 + "\n")
+
+    steps = [
+        "import math\ndata = [math.sqrt(i) for i in range(1_000_000)]",
+        "total = sum(data)\ntotal",
+        "len(data), round(total / len(data), 4)",
+        "undefined_name",
+    ]
+    with KernelSession(call_timeout_s=3) as kernel:
+        for step in steps:
+            result = kernel.execute(step)
+            status = "✅" if result.get("success") else "❌"
+            output = (result.get("stdout") or result.get("stderr") or result.get("error", "")).strip().splitlines()
+            print(f"{status} [{result.get('execution_count')}] {step.splitlines()[0]:<50} {result['elapsed_ms']:>8}ms  {output[-1] if output else ''}")
+
+        result = kernel.execute("while True: pass")
+        print(f"⏱️  Runaway loop: {result['stderr'].strip()}")
+        print(f"   State kept: total = {kernel.execute('total')['stdout'].strip()}")
+
+        result = kernel.execute("blob = bytearray(10 * 2**30)")
+        print(f"🧱 10 GB allocation: {result['stderr'].strip().splitlines()[-1]}")
+
+        print("\n📦 Snapshot:")
+        for var in kernel.snapshot()["variables"]:
+            print(f"   {var['name']:<8} {var['type']:<8} {var['bytes']:>10} bytes  {var['preview'][:40]}")
+        saved = kernel.save()
+        kernel.reset()
+        defined = kernel.execute("'total' in dir()")["stdout"].strip()
+        print(f"\n🔄 Reset; 'total' defined: {defined}")
+        print(f"💾 Restored {kernel.restore(saved['path'])['restored']} from {saved['path']}")
+        print(f"📊 {kernel.stats}\n")
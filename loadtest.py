@@ -0,0 +1,575 @@
+"""
+AutoGen Multi-Agent System - SSE Load Test
+Ramps concurrent `/stream` clients against the dashboard and reports where it saturates
+
+    python loadtest.py                                  # local server, stub model and tools
+    python loadtest.py --stages 10,50,100,200,400 --stage-seconds 30
+    python loadtest.py --model-latency-ms 800 --tool-latency-ms 300 --json loadtest.json
+    python loadtest.py --url http://localhost:8000      # an already running dashboard
+
+By default a dashboard server is started in a subprocess with the OpenAI client
+and the web tools replaced by local stubs with configurable latency, so the
+test needs no keys and measures the app itself: the shared model client's
+limits, the tool pool, the event loop and SSE framing. Findings, vector memory
+and the archive go to a temporary directory.
+
+Each stage keeps N clients streaming in a closed loop for a fixed time and
+records time to first event and first message, the gaps between events,
+broken frames (bad JSON, missing message ids) and failed sessions. The stub
+server also reports its RSS and event-loop lag. A stage is saturated when
+sessions fail, the loop lags, throughput stops growing with load or time to
+first event explodes; the report names the first such stage.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import quote, urlsplit
+
+METRICS_PATH = "/__loadtest/metrics"
+TASK = "Research message queues, write a small Python producer/consumer example, review it and summarize."
+
+# Saturation thresholds
+MAX_FAILURE_RATE = 0.01
+MAX_LOOP_LAG_MS = 100.0
+MIN_SCALING = 1.10        # throughput must grow at least 10% when load grows
+TTFE_BLOWUP = 10.0        # p95 time to first event vs the first stage
+TTFE_FLOOR_MS = 1000.0
+
+
+# ---------------------------------------------------------------------------
+# Stub server: the real dashboard app with the model and web tools stubbed
+# ---------------------------------------------------------------------------
+
+
+_STUB_WORDS = {
+    "research": "broker partition consumer offset durability replication throughput ordering retention topic".split(),
+    "code": "producer consumer queue thread join sentinel timeout buffer worker backlog".split(),
+    "review": "correct edge case shutdown race naming docstring tests handles approve fine".split(),
+    "summary": "queues decouple services buffering bursts example shows producer consumer reviewed".split(),
+}
+
+
+def _stub_text(role: str, call: int) -> str:
+    """A reply that differs per role and per call, so the convergence check does not end the run early"""
+    words = random.choices(_STUB_WORDS[role], k=60)
+    return f"[{role} #{call}] " + " ".join(words) + "."
+
+
+def _stub_model_client(latency_ms: float, jitter: float) -> Any:
+    """A ChatCompletionClient that answers after `latency_ms` without a network"""
+    from autogen_core import FunctionCall
+    from autogen_core.models import ChatCompletionClient, CreateResult, FunctionExecutionResultMessage, RequestUsage
+
+    class StubModelClient(ChatCompletionClient):
+        def __init__(self) -> None:
+            self._usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+            self._calls = 0
+
+        async def create(self, messages, *, tools=[], json_output=None, extra_create_args={}, cancellation_token=None):
+            await asyncio.sleep(latency_ms / 1000 * random.uniform(1 - jitter, 1 + jitter))
+            self._calls += 1
+            prompt_tokens = self.count_tokens(messages)
+            system = str(messages[0].content) if messages else ""
+            tool_names = [getattr(t, "name", None) or t.get("name") for t in tools]
+            answered = bool(messages) and isinstance(messages[-1], FunctionExecutionResultMessage)
+            # Play each role so the whole 4-agent flow runs: Researcher and Coder call a tool first,
+            # the Reviewer approves and the Synthesizer's FINAL ANSWER ends the run
+            if "search_web" in tool_names and not answered:
+                content: Any = [FunctionCall(id=f"call_{self._calls}", name="search_web",
+                                             arguments=json.dumps({"query": "message queues"}))]
+                finish = "function_calls"
+            elif "run_python" in tool_names and not answered:
+                content = [FunctionCall(id=f"call_{self._calls}", name="run_python",
+                                        arguments=json.dumps({"code": f"print(sum(range({self._calls})))"}))]
+                finish = "function_calls"
+            elif "FINAL ANSWER" in system:
+                content, finish = f"FINAL ANSWER: {_stub_text('summary', self._calls)}", "stop"
+            else:
+                role = "research" if "search_web" in tool_names else "code" if tool_names else "review"
+                content, finish = _stub_text(role, self._calls), "stop"
+            usage = RequestUsage(prompt_tokens=prompt_tokens, completion_tokens=60)
+            self._usage = RequestUsage(prompt_tokens=self._usage.prompt_tokens + usage.prompt_tokens,
+                                       completion_tokens=self._usage.completion_tokens + usage.completion_tokens)
+            return CreateResult(finish_reason=finish, content=content, usage=usage, cached=False)
+
+        async def create_stream(self, messages, *, tools=[], json_output=None, extra_create_args={}, cancellation_token=None):
+            yield await self.create(messages, tools=tools)
+
+        def actual_usage(self):
+            return self._usage
+
+        def total_usage(self):
+            return self._usage
+
+        def count_tokens(self, messages, *, tools=[]):
+            return sum(len(str(m.content)) for m in messages) // 4
+
+        def remaining_tokens(self, messages, *, tools=[]):
+            return 128000 - self.count_tokens(messages)
+
+        @property
+        def capabilities(self):
+            return self.model_info
+
+        @property
+        def model_info(self):
+            return {"vision": False, "function_calling": True, "json_output": True, "family": "unknown"}
+
+    return StubModelClient()
+
+
+def _stub_tool(func: Any, latency_ms: float, jitter: float) -> Any:
+    """Replace a web tool with a sleep of `latency_ms` and a canned result; keeps its signature"""
+    import functools
+
+    @functools.wraps(func)
+    def stub(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+        time.sleep(latency_ms / 1000 * random.uniform(1 - jitter, 1 + jitter))
+        return {"results": [{"title": f"Stub result {i}", "snippet": "lorem ipsum " * 20,
+                             "link": f"https://example.com/{random.getrandbits(32)}"} for i in range(3)], "count": 3}
+    return stub
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # peak, where /proc is missing
+
+
+def serve(port: int, model_latency_ms: float, tool_latency_ms: float, jitter: float) -> None:
+    """Run the dashboard with stubs and a metrics endpoint (RSS, event-loop lag)"""
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    os.environ.setdefault("AGENT_FINDINGS_DB", os.path.join(workdir, "findings.sqlite"))
+    os.environ.setdefault("AGENT_MEMORY_DIR", os.path.join(workdir, "vector_memory"))
+    os.environ.setdefault("AGENT_ARCHIVE_DIR", os.path.join(workdir, "archive"))
+
+    import uvicorn
+    import dashboard
+    import model_registry
+
+    # The stub sits under the shared client, so its concurrency and rate limits still apply
+    model_registry.configure_limits()
+    for shared in model_registry._registry.values():
+        shared._client = _stub_model_client(model_latency_ms, jitter)
+    for name in ("search_web", "brave_search", "get_stock_data", "get_weather"):
+        setattr(dashboard, name, _stub_tool(getattr(dashboard, name), tool_latency_ms, jitter))
+
+    lags: deque = deque(maxlen=10_000)
+
+    async def watch_loop() -> None:
+        interval = 0.05
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append((time.perf_counter() - started - interval) * 1000)
+
+    watcher: List[asyncio.Task] = []
+
+    @dashboard.app.get(METRICS_PATH)
+    async def metrics() -> Dict[str, Any]:
+        if not watcher:
+            watcher.append(asyncio.create_task(watch_loop()))
+        samples = sorted(lags)
+        lags.clear()
+        return {
+            "rss_mb": round(_rss_mb(), 1),
+            "loop_lag_p95_ms": round(_percentile(samples, 95), 2),
+            "loop_lag_max_ms": round(samples[-1], 2) if samples else 0.0,
+            "tasks": len(asyncio.all_tasks()),
+            "utilization": model_registry.utilization_report()
+        }
+
+    uvicorn.run(dashboard.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+# ---------------------------------------------------------------------------
+# Client: raw asyncio HTTP/1.1 so timings are not hidden behind a client library
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class Session:
+    """One `/stream` request as seen by the client"""
+    outcome: str = "pending"    # complete | error_event | disconnected | http_error | connect_error | timeout
+    connect_ms: float = 0.0
+    ttfe_ms: Optional[float] = None           # first event of any kind
+    first_message_ms: Optional[float] = None  # first agent message
+    duration_ms: float = 0.0
+    events: int = 0
+    gaps_ms: List[float] = field(default_factory=list)
+    broken_frames: int = 0
+    missing_ids: int = 0
+    error: Optional[str] = None
+
+
+async def _read_body(reader: asyncio.StreamReader, chunked: bool):
+    """Yield the response body as it arrives, undoing chunked transfer encoding"""
+    if not chunked:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                return
+            yield data
+    while True:
+        size_line = await reader.readline()
+        if not size_line:
+            return
+        size = int(size_line.split(b";")[0].strip() or b"0", 16)
+        if size == 0:
+            return
+        data = await reader.readexactly(size)
+        await reader.readexactly(2)
+        yield data
+
+
+async def stream_session(host: str, port: int, path: str, timeout_s: float) -> Session:
+    """Open one SSE stream and read it to the end, timing every event"""
+    session = Session()
+    started = time.perf_counter()
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=10)
+        session.connect_ms = (time.perf_counter() - started) * 1000
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n"
+                     f"Connection: close\r\n\r\n".encode())
+        await writer.drain()
+
+        async def read_stream() -> None:
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = int(head.split(b" ", 2)[1])
+            if status != 200:
+                session.outcome = "http_error"
+                return
+            chunked = b"transfer-encoding: chunked" in head.lower()
+            buffer, last, next_id = b"", None, 0
+            async for data in _read_body(reader, chunked):
+                buffer += data
+                while b"\n\n" in buffer:
+                    frame, buffer = buffer.split(b"\n\n", 1)
+                    now = time.perf_counter()
+                    session.events += 1
+                    if session.ttfe_ms is None:
+                        session.ttfe_ms = (now - started) * 1000
+                    if last is not None:
+                        session.gaps_ms.append((now - last) * 1000)
+                    last = now
+                    try:
+                        event = json.loads(frame.decode().removeprefix("data: "))
+                    except (UnicodeDecodeError, ValueError):
+                        session.broken_frames += 1
+                        continue
+                    if event.get("type") == "message":
+                        if session.first_message_ms is None:
+                            session.first_message_ms = (now - started) * 1000
+                        session.missing_ids += max(0, event.get("id", next_id) - next_id)
+                        next_id = event.get("id", next_id) + 1
+                    elif event.get("type") == "error":
+                        session.outcome = "error_event"
+                        session.error = str(event.get("message"))[:200]
+                    elif event.get("type") == "complete" and session.outcome == "pending":
+                        session.outcome = "complete"
+            if buffer.strip():
+                session.broken_frames += 1
+            if session.outcome == "pending":
+                session.outcome = "disconnected"
+
+        await asyncio.wait_for(read_stream(), timeout=timeout_s)
+    except asyncio.TimeoutError:
+        session.outcome = "timeout" if session.connect_ms else "connect_error"
+    except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError, IndexError):
+        session.outcome = "connect_error" if not session.connect_ms else "disconnected"
+    finally:
+        if writer is not None:
+            writer.close()
+    session.duration_ms = (time.perf_counter() - started) * 1000
+    return session
+
+
+async def _get_json(host: str, port: int, path: str) -> Optional[Dict[str, Any]]:
+    """GET a small JSON endpoint; None when it is not there"""
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=5)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        raw = await asyncio.wait_for(reader.read(), timeout=10)
+        writer.close()
+    except (OSError, asyncio.TimeoutError):
+        return None
+    head, _, body = raw.partition(b"\r\n\r\n")
+    if b" 200 " not in head.split(b"\r\n", 1)[0]:
+        return None
+    if b"transfer-encoding: chunked" in head.lower():
+        decoded, rest = b"", body
+        while rest:
+            size_line, _, rest = rest.partition(b"\r\n")
+            size = int(size_line.split(b";")[0] or b"0", 16)
+            if size == 0:
+                break
+            decoded, rest = decoded + rest[:size], rest[size + 2:]
+        body = decoded
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Stages and report
+# ---------------------------------------------------------------------------
+
+
+def _percentile(values: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile of sorted `values` (0 when empty)"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+@dataclass
+class StageResult:
+    """Aggregates for one load level"""
+    clients: int
+    seconds: float
+    sessions: int
+    outcomes: Dict[str, int]
+    throughput_per_s: float
+    events_per_s: float
+    ttfe_p50_ms: float
+    ttfe_p95_ms: float
+    first_message_p50_ms: float
+    first_message_p95_ms: float
+    gap_p50_ms: float
+    gap_p95_ms: float
+    gap_max_ms: float
+    broken_frames: int
+    missing_ids: int
+    failure_rate: float
+    errors: Dict[str, int] = field(default_factory=dict)
+    rss_max_mb: Optional[float] = None
+    loop_lag_p95_ms: Optional[float] = None
+    loop_lag_max_ms: Optional[float] = None
+    saturated: List[str] = field(default_factory=list)
+
+
+def summarize(clients: int, seconds: float, sessions: List[Session], server: List[Dict[str, Any]]) -> StageResult:
+    ttfe = sorted(s.ttfe_ms for s in sessions if s.ttfe_ms is not None)
+    first = sorted(s.first_message_ms for s in sessions if s.first_message_ms is not None)
+    gaps = sorted(g for s in sessions for g in s.gaps_ms)
+    outcomes: Dict[str, int] = {}
+    errors: Dict[str, int] = {}
+    for s in sessions:
+        outcomes[s.outcome] = outcomes.get(s.outcome, 0) + 1
+        if s.error:
+            errors[s.error] = errors.get(s.error, 0) + 1
+    completed = outcomes.get("complete", 0)
+    result = StageResult(
+        clients=clients,
+        seconds=round(seconds, 1),
+        sessions=len(sessions),
+        outcomes=outcomes,
+        throughput_per_s=round(completed / seconds, 2),
+        events_per_s=round(sum(s.events for s in sessions) / seconds, 1),
+        ttfe_p50_ms=round(_percentile(ttfe, 50), 1),
+        ttfe_p95_ms=round(_percentile(ttfe, 95), 1),
+        first_message_p50_ms=round(_percentile(first, 50), 1),
+        first_message_p95_ms=round(_percentile(first, 95), 1),
+        gap_p50_ms=round(_percentile(gaps, 50), 1),
+        gap_p95_ms=round(_percentile(gaps, 95), 1),
+        gap_max_ms=round(gaps[-1], 1) if gaps else 0.0,
+        broken_frames=sum(s.broken_frames for s in sessions),
+        missing_ids=sum(s.missing_ids for s in sessions),
+        failure_rate=round(1 - completed / len(sessions), 4) if sessions else 0.0,
+        errors=errors
+    )
+    if server:
+        result.rss_max_mb = max(m["rss_mb"] for m in server)
+        result.loop_lag_p95_ms = max(m["loop_lag_p95_ms"] for m in server)
+        result.loop_lag_max_ms = max(m["loop_lag_max_ms"] for m in server)
+    return result
+
+
+def saturation_reasons(stage: StageResult, previous: Optional[StageResult], baseline: StageResult) -> List[str]:
+    """Why `stage` counts as saturated (empty when it is not)"""
+    reasons = []
+    if stage.failure_rate > MAX_FAILURE_RATE:
+        reasons.append(f"{stage.failure_rate:.1%} of sessions failed")
+    if stage.broken_frames or stage.missing_ids:
+        reasons.append(f"{stage.broken_frames} broken frames, {stage.missing_ids} missing message ids")
+    if stage.loop_lag_p95_ms is not None and stage.loop_lag_p95_ms > MAX_LOOP_LAG_MS:
+        reasons.append(f"event loop lag p95 {stage.loop_lag_p95_ms:.0f}ms")
+    if previous is not None and stage.clients > previous.clients:
+        expected = previous.throughput_per_s * MIN_SCALING
+        if stage.throughput_per_s < expected:
+            reasons.append(f"throughput flat ({previous.throughput_per_s} -> {stage.throughput_per_s}/s "
+                           f"at {previous.clients} -> {stage.clients} clients)")
+    if stage is not baseline and stage.ttfe_p95_ms > max(TTFE_FLOOR_MS, baseline.ttfe_p95_ms * TTFE_BLOWUP):
+        reasons.append(f"time to first event p95 {stage.ttfe_p95_ms:.0f}ms (baseline {baseline.ttfe_p95_ms:.0f}ms)")
+    return reasons
+
+
+async def run_stage(host: str, port: int, path: str, clients: int, seconds: float,
+                    timeout_s: float, metrics: bool) -> StageResult:
+    """Keep `clients` streams open for `seconds` (each client reconnects when its stream ends)"""
+    sessions: List[Session] = []
+    server: List[Dict[str, Any]] = []
+    deadline = time.perf_counter() + seconds
+
+    async def client(i: int) -> None:
+        await asyncio.sleep(random.uniform(0, min(1.0, seconds / 10)))  # spread the connects
+        while time.perf_counter() < deadline:
+            sessions.append(await stream_session(host, port, path, timeout_s))
+
+    async def poll() -> None:
+        while True:
+            sample = await _get_json(host, port, METRICS_PATH)
+            if sample:
+                server.append(sample)
+            await asyncio.sleep(0.5)
+
+    poller = asyncio.create_task(poll()) if metrics else None
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    elapsed = time.perf_counter() - started
+    if poller is not None:
+        poller.cancel()
+    return summarize(clients, elapsed, sessions, server)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_ready(host: str, port: int, path: str, timeout_s: float = 60) -> None:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if await _get_json(host, port, path) is not None:
+            return
+        await asyncio.sleep(0.25)
+    raise RuntimeError(f"server on {host}:{port} did not come up in {timeout_s:.0f}s")
+
+
+def print_report(stages: List[StageResult], knee: Optional[StageResult]) -> None:
+    print("\n" + "="*118)
+    print("📈 SSE LOAD TEST")
+    print("="*118 + "\n")
+    print(f"{'clients':>7} {'streams/s':>9} {'fail':>6} {'TTFE p50/p95':>15} {'1st msg p95':>11} "
+          f"{'gap p95/max':>15} {'broken':>6} {'RSS MB':>7} {'lag p95/max':>13}  status")
+    for stage in stages:
+        lag = (f"{stage.loop_lag_p95_ms:.0f}/{stage.loop_lag_max_ms:.0f}ms"
+               if stage.loop_lag_p95_ms is not None else "-")
+        rss = f"{stage.rss_max_mb:.0f}" if stage.rss_max_mb is not None else "-"
+        status = "⚠️  " + "; ".join(stage.saturated) if stage.saturated else "✅ ok"
+        print(f"{stage.clients:>7} {stage.throughput_per_s:>9} {stage.failure_rate:>6.1%} "
+              f"{stage.ttfe_p50_ms:>6.0f}/{stage.ttfe_p95_ms:<6.0f}ms {stage.first_message_p95_ms:>9.0f}ms "
+              f"{stage.gap_p95_ms:>6.0f}/{stage.gap_max_ms:<6.0f}ms {stage.broken_frames + stage.missing_ids:>6} "
+              f"{rss:>7} {lag:>13}  {status}")
+    print()
+    healthy = [s for s in stages if not s.saturated]
+    if knee is None:
+        print(f"✅ No saturation up to {stages[-1].clients} concurrent streams; raise --stages to find the limit.")
+    else:
+        sustained = healthy[-1].clients if healthy and healthy[-1].clients < knee.clients else None
+        print(f"🔻 Saturation at {knee.clients} concurrent streams: {'; '.join(knee.saturated)}")
+        if sustained:
+            print(f"✅ Sustained: {sustained} concurrent streams at {healthy[-1].throughput_per_s} streams/s")
+    print()
+
+
+async def load_test(args: argparse.Namespace) -> Dict[str, Any]:
+    server_process = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname or "127.0.0.1", parts.port or 80
+    else:
+        host, port = "127.0.0.1", _free_port()
+        server_process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port),
+             "--model-latency-ms", str(args.model_latency_ms), "--tool-latency-ms", str(args.tool_latency_ms),
+             "--jitter", str(args.jitter)]
+        )
+    try:
+        await _wait_ready(host, port, METRICS_PATH if server_process else "/utilization")
+        metrics = await _get_json(host, port, METRICS_PATH) is not None
+        path = f"/stream?task={quote(args.task)}&mode={args.mode}"
+        # One untimed stream first, so imports and first-use setup do not count against stage one
+        warmup = await stream_session(host, port, path, args.session_timeout)
+        if warmup.outcome != "complete":
+            print(f"⚠️  Warm-up stream ended with {warmup.outcome}: {warmup.error or ''}")
+        await _get_json(host, port, METRICS_PATH) if metrics else None
+        stages: List[StageResult] = []
+        knee = None
+        for clients in args.stages:
+            print(f"🚦 {clients} clients for {args.stage_seconds:.0f}s ...", flush=True)
+            stage = await run_stage(host, port, path, clients, args.stage_seconds, args.session_timeout, metrics)
+            stage.saturated = saturation_reasons(stage, stages[-1] if stages else None, stages[0] if stages else stage)
+            stages.append(stage)
+            if stage.saturated and knee is None:
+                knee = stage
+                if not args.keep_going:
+                    break
+        print_report(stages, knee)
+        return {
+            "target": args.url or "local stub server",
+            "model_latency_ms": args.model_latency_ms,
+            "tool_latency_ms": args.tool_latency_ms,
+            "stages": [asdict(s) for s in stages],
+            "saturation_clients": knee.clients if knee else None,
+            "saturation_reasons": knee.saturated if knee else [],
+            "utilization": (await _get_json(host, port, "/utilization")) if metrics else None
+        }
+    finally:
+        if server_process is not None:
+            server_process.send_signal(signal.SIGINT)
+            try:
+                server_process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server_process.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ramp concurrent SSE clients against the dashboard")
+    parser.add_argument("--url", help="Test a running dashboard instead of a local stub server")
+    parser.add_argument("--stages", default="10,25,50,100,200,400",
+                        type=lambda s: [int(x) for x in s.split(",")], help="Concurrent clients per stage")
+    parser.add_argument("--stage-seconds", type=float, default=20.0)
+    parser.add_argument("--session-timeout", type=float, default=120.0, help="Give up on one stream after this")
+    parser.add_argument("--model-latency-ms", type=float, default=300.0, help="Stub model latency per call")
+    parser.add_argument("--tool-latency-ms", type=float, default=200.0, help="Stub web tool latency per call")
+    parser.add_argument("--jitter", type=float, default=0.3, help="Latency varies by +/- this fraction")
+    parser.add_argument("--task", default=TASK)
+    parser.add_argument("--mode", default="round_robin", choices=["round_robin", "dag"])
+    parser.add_argument("--keep-going", action="store_true", help="Run the remaining stages after saturation")
+    parser.add_argument("--json", help="Write the report to this file")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=8000, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.model_latency_ms, args.tool_latency_ms, args.jitter)
+        return
+    report = asyncio.run(load_test(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
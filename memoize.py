@@ -0,0 +1,257 @@
+"""
+AutoGen Core - Message Handler Memoization
+Opt-in result cache for RoutedAgent handlers, keyed on the message type and field values
+
+    class ResearchAgent(RoutedAgent):
+        @message_handler
+        @memoize_handler(ttl_s=600, maxsize=256, ignore=("priority",))
+        async def handle_research(self, message: ResearchTask, ctx: MessageContext) -> ResearchTask:
+            ...
+
+The cache belongs to the handler, so every instance of the agent type in the
+process shares it (keys include the agent type): an identical query from
+another coordinator is answered without a model round trip. Concurrent
+identical messages wait for the first one instead of all calling the model. With `disk_path` the results also go to a
+SQLite file that other processes (worker processes, later runs) read.
+
+Only use it on handlers whose reply depends on the message alone. A hit skips
+the handler body, so an agent that keeps conversation history (such as an
+AssistantAgent delegate) never sees the cached turn and its context drifts from
+what callers were told. Either make the handler stateless (reset the delegate
+per message) or pass `bypass=` so messages that continue a conversation always
+reach the handler.
+
+The disk tier stores values in the compact format without pickle (reading a
+shared file must not run code): replies must be registered dataclasses or plain
+data, and anything else stays in memory only.
+"""
+
+import asyncio
+import copy
+import dataclasses
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+from opentelemetry import trace
+
+from serialization import Codec, SerializationError
+
+
+# Result of an in-flight call whose caller was cancelled: waiters start over instead of failing
+_ABANDONED = object()
+
+
+@dataclass
+class MemoStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0    # waited for an identical in-flight call
+    evictions: int = 0
+    expired: int = 0
+    not_stored: int = 0   # replies the disk tier cannot encode without pickle
+
+
+def message_fields(message: Any, ignore: Sequence[str] = ()) -> Dict[str, Any]:
+    """Field values of a dataclass or pydantic message, minus `ignore`"""
+    if dataclasses.is_dataclass(message):
+        values = {f.name: getattr(message, f.name) for f in dataclasses.fields(message)}
+    elif hasattr(message, "model_dump"):
+        values = message.model_dump()
+    else:
+        values = {"value": message}
+    return {k: v for k, v in values.items() if k not in ignore}
+
+
+def message_key(handler: str, message: Any, ignore: Sequence[str] = ()) -> str:
+    """Stable key: handler, message type and canonical JSON of its fields"""
+    payload = json.dumps(
+        [handler, f"{type(message).__module__}.{type(message).__qualname__}", message_fields(message, ignore)],
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class _DiskTier:
+    """SQLite table shared by every process that points at the same file"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._codec = Codec(allow_pickle=False)
+        self._writes = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS memo (key TEXT PRIMARY KEY, handler TEXT, created REAL, value BLOB)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, key: str, ttl_s: float) -> Tuple[bool, Any]:
+        with self._connect() as db:
+            row = db.execute("SELECT created, value FROM memo WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[0] > ttl_s:
+            return False, None
+        try:
+            return True, self._codec.loads(row[1])
+        except SerializationError:
+            return False, None  # e.g. a pickled row from an older version: recompute
+
+    def put(self, key: str, handler: str, value: Any, ttl_s: float) -> bool:
+        """Store `value`; False if it cannot be encoded without pickle"""
+        try:
+            data = self._codec.dumps(value)
+        except SerializationError:
+            return False
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO memo VALUES (?, ?, ?, ?)", (key, handler, time.time(), data))
+            self._writes += 1
+            if self._writes % 100 == 0:
+                db.execute("DELETE FROM memo WHERE handler = ? AND created < ?", (handler, time.time() - ttl_s))
+        return True
+
+
+class MemoCache:
+    """TTL + LRU cache for one handler, with single-flight and an optional disk tier"""
+
+    def __init__(self, name: str, ttl_s: float, maxsize: int, disk_path: Optional[str] = None) -> None:
+        self.name = name
+        self.ttl_s = ttl_s
+        self.maxsize = maxsize
+        self.stats = MemoStats()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._disk = _DiskTier(disk_path) if disk_path else None
+
+    def _get_memory(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if time.monotonic() - entry[0] > self.ttl_s:
+            del self._entries[key]
+            self.stats.expired += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[1]
+
+    def _put_memory(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        span = trace.get_current_span()
+        found, value = self._get_memory(key)
+        if found:
+            self.stats.hits += 1
+            span.set_attribute("memo.result", "hit")
+            return copy.deepcopy(value)
+
+        if key in self._in_flight:
+            value = await asyncio.shield(self._in_flight[key])
+            if value is _ABANDONED:
+                # The call we joined was cancelled by its own caller, not by us: retry (one waiter leads)
+                return await self.get_or_compute(key, compute)
+            self.stats.coalesced += 1
+            span.set_attribute("memo.result", "coalesced")
+            return copy.deepcopy(value)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            if self._disk is not None:
+                found, value = await asyncio.to_thread(self._disk.get, key, self.ttl_s)
+                if found:
+                    self.stats.disk_hits += 1
+                    span.set_attribute("memo.result", "disk_hit")
+                    self._put_memory(key, value)
+                    future.set_result(value)
+                    return copy.deepcopy(value)
+
+            self.stats.misses += 1
+            span.set_attribute("memo.result", "miss")
+            value = await compute()
+            self._put_memory(key, value)
+            future.set_result(value)
+            if self._disk is not None:
+                if not await asyncio.to_thread(self._disk.put, key, self.name, value, self.ttl_s):
+                    self.stats.not_stored += 1
+            return copy.deepcopy(value)
+        except asyncio.CancelledError:
+            if not future.done():
+                future.set_result(_ABANDONED)
+            raise
+        except Exception as e:
+            # Failures are not cached; callers waiting on this one see the same error
+            if not future.done():
+                future.set_exception(e)
+                future.exception()  # mark retrieved when nobody was waiting
+            raise
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def report(self) -> Dict[str, Any]:
+        lookups = self.stats.hits + self.stats.disk_hits + self.stats.misses + self.stats.coalesced
+        saved = lookups - self.stats.misses
+        return {
+            **dataclasses.asdict(self.stats),
+            "size": len(self._entries),
+            "hit_rate": round(saved / lookups, 3) if lookups else 0.0
+        }
+
+
+_caches: Dict[str, MemoCache] = {}
+
+
+def memoize_handler(
+    ttl_s: float = 600.0,
+    maxsize: int = 256,
+    disk_path: Optional[str] = None,
+    ignore: Sequence[str] = (),
+    bypass: Optional[Callable[[Any], bool]] = None
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """
+    Cache a `@message_handler` method's replies; put it *below* `@message_handler`.
+    Fields listed in `ignore` (e.g. a priority hint) are left out of the key.
+    Messages for which `bypass(message)` is true always run the handler and are
+    not cached (e.g. follow-ups whose answer depends on conversation history).
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        name = func.__qualname__
+        cache = MemoCache(name, ttl_s, maxsize, disk_path)
+        _caches[name] = cache
+
+        @functools.wraps(func)
+        async def wrapper(self: Any, message: Any, ctx: Any) -> Any:
+            if bypass is not None and bypass(message):
+                return await func(self, message, ctx)
+            # One class can back several agent types (specialists): keep their answers apart
+            key = message_key(f"{name}@{self.id.type}", message, ignore)
+            return await cache.get_or_compute(key, lambda: func(self, message, ctx))
+
+        wrapper.memo_cache = cache
+        return wrapper
+
+    return decorator
+
+
+def memo_report() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss counters for every memoized handler in this process"""
+    return {name: cache.report() for name, cache in _caches.items()}
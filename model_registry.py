@@ -0,0 +1,262 @@
+"""
+AutoGen Multi-Agent System - Shared Model Client Registry
+One OpenAI client (and HTTP connection pool) per model/config, shared by every agent in the process
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Deque, Dict, Mapping, Optional, Sequence, Tuple, Union
+
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage, ModelCapabilities, ModelInfo, RequestUsage
+from autogen_core.tools import Tool, ToolSchema
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind
+
+if TYPE_CHECKING:
+    from autogen_ext.models.openai import OpenAIChatCompletionClient
+
+_tracer = trace.get_tracer("autogen_agents.models")
+
+
+@dataclass
+class RateLimits:
+    """Process-wide limits for one model/config (defaults read from the environment when created)"""
+    max_concurrency: int = field(default_factory=lambda: int(os.getenv("MODEL_MAX_CONCURRENCY", "8")))
+    requests_per_minute: int = field(default_factory=lambda: int(os.getenv("MODEL_RPM", "500")))
+    tokens_per_minute: int = field(default_factory=lambda: int(os.getenv("MODEL_TPM", "200000")))
+
+
+@dataclass
+class AgentUsage:
+    """Utilization of the shared client by one agent"""
+    requests: int = 0
+    in_flight: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    busy_s: float = 0.0
+    waiting_s: float = 0.0
+
+
+@dataclass
+class _SharedClient:
+    config: Dict[str, Any]
+    limits: RateLimits
+    semaphore: asyncio.Semaphore
+    admission: asyncio.Lock = field(default_factory=asyncio.Lock)
+    requests: Deque[float] = field(default_factory=deque)
+    tokens: Deque[Tuple[float, int]] = field(default_factory=deque)
+    agents: Dict[str, AgentUsage] = field(default_factory=dict)
+    model: str = ""
+    _client: Optional["OpenAIChatCompletionClient"] = None
+
+    @property
+    def client(self) -> "OpenAIChatCompletionClient":
+        """The OpenAI client, created (and the openai stack imported) on first use"""
+        if self._client is None:
+            from autogen_ext.models.openai import OpenAIChatCompletionClient
+            self._client = OpenAIChatCompletionClient(model=self.model, **self.config)
+        return self._client
+
+    def _window(self, now: float) -> int:
+        while self.requests and now - self.requests[0] >= 60:
+            self.requests.popleft()
+        while self.tokens and now - self.tokens[0][0] >= 60:
+            self.tokens.popleft()
+        return sum(count for _, count in self.tokens)
+
+    async def admit(self, estimated_tokens: int) -> None:
+        """Wait until one more request fits in the RPM and TPM windows"""
+        async with self.admission:
+            while True:
+                now = time.monotonic()
+                tokens_used = self._window(now)
+                rpm_ok = len(self.requests) < self.limits.requests_per_minute
+                # An oversized request is let through alone rather than blocked forever
+                tpm_ok = tokens_used + estimated_tokens <= self.limits.tokens_per_minute or not self.tokens
+                if rpm_ok and tpm_ok:
+                    self.requests.append(now)
+                    self.tokens.append((now, estimated_tokens))
+                    return
+                oldest = min(self.requests[0] if self.requests else now, self.tokens[0][0] if self.tokens else now)
+                await asyncio.sleep(max(0.05, 60 - (now - oldest)))
+
+    def settle(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Replace a request's token estimate with its real usage"""
+        self.tokens.append((time.monotonic(), actual_tokens - estimated_tokens))
+
+
+_registry: Dict[str, _SharedClient] = {}
+
+
+def _registry_key(model: str, config: Mapping[str, Any]) -> str:
+    return json.dumps({"model": model, **config}, sort_keys=True, default=str)
+
+
+def configure_limits(model: str = "gpt-4o-mini", limits: Optional[RateLimits] = None, **config: Any) -> None:
+    """Set the limits for a model/config before its first client is created"""
+    key = _registry_key(model, config)
+    if key in _registry:
+        raise RuntimeError(f"Model client for {model} already created; configure limits first")
+    limits = limits or RateLimits()
+    _registry[key] = _SharedClient(
+        config=dict(config),
+        limits=limits,
+        semaphore=asyncio.Semaphore(limits.max_concurrency),
+        model=model
+    )
+
+
+def get_model_client(model: str = "gpt-4o-mini", agent: str = "default", **config: Any) -> "PooledModelClient":
+    """Return a per-agent handle on the process-wide client for `model` and `config`"""
+    key = _registry_key(model, config)
+    if key not in _registry:
+        configure_limits(model, None, **config)
+    return PooledModelClient(_registry[key], agent)
+
+
+def utilization_report() -> Dict[str, Dict[str, Any]]:
+    """Per-model, per-agent utilization of the shared clients"""
+    report = {}
+    now = time.monotonic()
+    for key, shared in _registry.items():
+        report[key] = {
+            "limits": shared.limits.__dict__,
+            "requests_last_min": len(shared.requests),
+            "tokens_last_min": shared._window(now),
+            "agents": {name: usage.__dict__.copy() for name, usage in shared.agents.items()}
+        }
+    return report
+
+
+class PooledModelClient(ChatCompletionClient):
+    """ChatCompletionClient that routes through a shared client under global limits"""
+
+    def __init__(self, shared: _SharedClient, agent: str) -> None:
+        self._shared = shared
+        self._agent = agent
+        self._usage = shared.agents.setdefault(agent, AgentUsage())
+        self._actual_usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+        self._total_usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+
+    async def _acquire(self, messages: Sequence[LLMMessage], tools: Sequence[Tool | ToolSchema]) -> Tuple[int, float]:
+        estimated = self._shared.client.count_tokens(messages, tools=tools)
+        waiting_from = time.monotonic()
+        await self._shared.admit(estimated)
+        await self._shared.semaphore.acquire()
+        started = time.monotonic()
+        self._usage.waiting_s += started - waiting_from
+        self._usage.requests += 1
+        self._usage.in_flight += 1
+        return estimated, started
+
+    def _span_attributes(self) -> Dict[str, Any]:
+        return {"gen_ai.system": "openai", "gen_ai.request.model": self._shared.model, "agent": self._agent}
+
+    @staticmethod
+    def _record_usage(span: Any, queued: float, started: float, usage: Optional[RequestUsage]) -> None:
+        span.set_attribute("model.queue_ms", round((started - queued) * 1000, 1))
+        if usage is not None:
+            span.set_attribute("gen_ai.usage.input_tokens", usage.prompt_tokens)
+            span.set_attribute("gen_ai.usage.output_tokens", usage.completion_tokens)
+
+    def _release(self, estimated: int, started: float, usage: Optional[RequestUsage]) -> None:
+        self._shared.semaphore.release()
+        self._usage.in_flight -= 1
+        self._usage.busy_s += time.monotonic() - started
+        if usage is not None:
+            self._usage.prompt_tokens += usage.prompt_tokens
+            self._usage.completion_tokens += usage.completion_tokens
+            self._shared.settle(estimated, usage.prompt_tokens + usage.completion_tokens)
+            self._actual_usage = RequestUsage(
+                prompt_tokens=self._actual_usage.prompt_tokens + usage.prompt_tokens,
+                completion_tokens=self._actual_usage.completion_tokens + usage.completion_tokens
+            )
+            self._total_usage = self._actual_usage
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None
+    ) -> CreateResult:
+        with _tracer.start_as_current_span(
+            f"chat {self._shared.model}", kind=SpanKind.CLIENT, attributes=self._span_attributes()
+        ) as span:
+            queued = time.monotonic()
+            estimated, started = await self._acquire(messages, tools)
+            result = None
+            try:
+                result = await self._shared.client.create(
+                    messages,
+                    tools=tools,
+                    json_output=json_output,
+                    extra_create_args=extra_create_args,
+                    cancellation_token=cancellation_token
+                )
+                return result
+            finally:
+                usage = result.usage if result is not None else None
+                self._release(estimated, started, usage)
+                self._record_usage(span, queued, started, usage)
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        # Not the current span: a generator's context would leak into the consumer between chunks
+        span = _tracer.start_span(f"chat {self._shared.model}", kind=SpanKind.CLIENT, attributes=self._span_attributes())
+        queued = time.monotonic()
+        estimated, started = await self._acquire(messages, tools)
+        usage = None
+        try:
+            async for chunk in self._shared.client.create_stream(
+                messages,
+                tools=tools,
+                json_output=json_output,
+                extra_create_args=extra_create_args,
+                cancellation_token=cancellation_token
+            ):
+                if isinstance(chunk, CreateResult):
+                    usage = chunk.usage
+                yield chunk
+        finally:
+            self._release(estimated, started, usage)
+            self._record_usage(span, queued, started, usage)
+            span.end()
+
+    def actual_usage(self) -> RequestUsage:
+        return self._actual_usage
+
+    def total_usage(self) -> RequestUsage:
+        return self._total_usage
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._shared.client.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._shared.client.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:
+        return self._shared.client.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self._shared.client.model_info
+
+    async def close(self) -> None:
+        # The underlying client is shared; it lives as long as the process
+        pass
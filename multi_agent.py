@@ -4,55 +4,98 @@ Demonstrates complex team dynamics with multiple specialized agents
 """
 
 import asyncio
+import sys
 from dotenv import load_dotenv
-from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.teams import RoundRobinGroupChat
-from autogen_agentchat.conditions import MaxMessageTermination
-from autogen_ext.models.openai import OpenAIChatCompletionClient
-from tools import search_web, execute_python_code, save_to_file
-
-load_dotenv()
-
-# Initialize model
-model = OpenAIChatCompletionClient(model="gpt-4o-mini")
-
-# Create 4 specialized agents
-researcher = AssistantAgent(
-    name="Researcher",
-    model_client=model,
-    tools=[search_web],
-    system_message="You are a research specialist. Search for information and provide detailed findings.",
-    reflect_on_tool_use=True
-)
-
-coder = AssistantAgent(
-    name="Coder",
-    model_client=model,
-    tools=[execute_python_code, save_to_file],
-    system_message="You are a Python developer. Write code to solve problems and test it.",
-    reflect_on_tool_use=True
-)
-
-reviewer = AssistantAgent(
-    name="Reviewer",
-    model_client=model,
-    system_message="You review research and code. Provide constructive feedback and suggest improvements."
-)
-
-synthesizer = AssistantAgent(
-    name="Synthesizer",
-    model_client=model,
-    system_message="You synthesize all inputs into a final recommendation. When ready, say 'FINAL ANSWER:' followed by the conclusion."
-)
-
-# Create 4-agent team
-team = RoundRobinGroupChat(
-    [researcher, coder, reviewer, synthesizer],
-    termination_condition=MaxMessageTermination(12)
-)
-
-
-async def run_complex_task(task: str):
+from tracing import get_tracer, setup_tracing, traced_tool
+
+# The autogen/openai stack is imported by the builders below, not at import time:
+# importing this module (batch_runner, worker spawns, test collection) stays cheap.
+
+
+def build_agents(kernel=None):
+    """Create the 4 specialized agents (fresh model context for every call); `kernel` gives the Coder a persistent session"""
+    from autogen_agentchat.agents import AssistantAgent
+    from model_registry import get_model_client
+    from tools import search_web, execute_python_code, save_to_file, list_files, read_file, grep_file
+    from findings_index import record_findings, search_prior_findings
+    from vector_memory import recall_memory
+    
+    researcher = AssistantAgent(
+        name="Researcher",
+        model_client=get_model_client(agent="Researcher"),
+        # Earlier results are checked locally first; new web results are indexed for later runs
+        tools=[traced_tool(search_prior_findings), traced_tool(recall_memory), traced_tool(record_findings(search_web))],
+        system_message="You are a research specialist. Check search_prior_findings first and only search the web "
+                       "when nothing relevant comes back or the hits are stale. Provide detailed findings.",
+        reflect_on_tool_use=True
+    )
+    
+    # With a kernel session, run_python keeps variables between calls instead of starting a new interpreter
+    python_tools = kernel.tools() if kernel is not None else [execute_python_code]
+    coder = AssistantAgent(
+        name="Coder",
+        model_client=get_model_client(agent="Coder"),
+        tools=[traced_tool(t) for t in (recall_memory, *python_tools, save_to_file, list_files, read_file, grep_file)],
+        system_message="You are a Python developer. Use recall_memory to reuse code from earlier runs, then write code to solve problems and test it. "
+                       "Inspect files in the sandbox with list_files, read_file (paged) and grep_file instead of printing them."
+                       + (" run_python keeps your variables and imports, so build analyses step by step without re-running earlier steps."
+                          if kernel is not None else ""),
+        reflect_on_tool_use=True
+    )
+    
+    reviewer = AssistantAgent(
+        name="Reviewer",
+        model_client=get_model_client(agent="Reviewer"),
+        system_message="You review research and code. Provide constructive feedback and suggest improvements. If the code must be changed, start a line with 'REVISE' and list the fixes."
+    )
+    
+    synthesizer = AssistantAgent(
+        name="Synthesizer",
+        model_client=get_model_client(agent="Synthesizer"),
+        system_message="You synthesize all inputs into a final recommendation. When ready, say 'FINAL ANSWER:' followed by the conclusion."
+    )
+    
+    return [researcher, coder, reviewer, synthesizer]
+
+
+def build_termination():
+    """Stop on the Synthesizer's final answer, convergence, or the message/token/time budget"""
+    from termination import smart_termination
+    return smart_termination(
+        final_text="FINAL ANSWER:",
+        max_messages=12,
+        max_tokens=60000,
+        max_seconds=300
+    )
+
+
+def build_team(mode: str = "round_robin", termination=None, agents=None, selector=None):
+    """
+    Create the 4-agent team. "dag" runs Researcher and Coder in parallel;
+    "relevance" picks each next speaker with a RelevanceSelector heuristic.
+    """
+    termination = termination or build_termination()
+    agents = agents or build_agents()
+    if mode == "dag":
+        from dag_team import research_code_review_graph
+        return research_code_review_graph(*agents, termination_condition=termination, max_turns=12)
+    if mode == "relevance":
+        from autogen_agentchat.teams import SelectorGroupChat
+        from model_registry import get_model_client
+        from speaker_selection import RelevanceSelector
+        return SelectorGroupChat(
+            agents,
+            # Shared model client (one connection pool, global rate limits) drives speaker selection
+            model_client=get_model_client(agent="Selector"),
+            termination_condition=termination,
+            selector_func=selector or RelevanceSelector(),
+            allow_repeated_speaker=True
+        )
+    from autogen_agentchat.teams import RoundRobinGroupChat
+    return RoundRobinGroupChat(agents, termination_condition=termination)
+
+
+async def run_complex_task(task: str, mode: str = "round_robin"):
     """Run a complex multi-agent collaboration"""
     print("\n" + "="*100)
     print("🚀  AUTOGEN 4-AGENT COLLABORATION SYSTEM")
@@ -67,7 +110,20 @@ async def run_complex_task(task: str):
     print("="*100)
     print("\n💬 AGENT COLLABORATION:\n")
     
-    result = await team.run(task=task)
+    if mode == "relevance":
+        from speaker_selection import RelevanceSelector
+        selector = RelevanceSelector()
+    else:
+        selector = None
+    from kernel_session import KernelSession
+    from transcript_archive import run_timed
+    stop = build_termination()
+    # One interpreter per run for the Coder; stopped when the run ends
+    with KernelSession() as kernel:
+        active_team = build_team(mode, stop, agents=build_agents(kernel), selector=selector)
+        with get_tracer().start_as_current_span("task", attributes={"task": task[:200], "team.mode": mode}):
+            result, timing = await run_timed(active_team, task)
+        print(f"🧮 Kernel session: {kernel.stats}")
     
     for i, msg in enumerate(result.messages, 1):
         agent_emoji = {
@@ -87,6 +143,25 @@ async def run_complex_task(task: str):
     print(f"📊 Total Messages: {len(result.messages)}")
     print(f"🎭 Agents Involved: 4 (Researcher, Coder, Reviewer, Synthesizer)")
     print(f"🏁 Stop Reason: {result.stop_reason}\n")
+    record = stop.last_record
+    if record:
+        print(f"🧾 Stopped after {record.messages} messages, {record.tokens} tokens, {record.elapsed_s}s\n")
+    if mode == "dag":
+        timings = active_team.last_timings
+        print(f"⏱️  Wall time: {timings['wall_s']}s (serial turns: {timings['serial_s']}s)\n")
+    if selector is not None:
+        report = selector.report()
+        print(f"⚡ Speaker turns: {report['turns']} (saved vs round-robin: {report['turns_saved']})\n")
+    
+    from findings_index import record_final_answer
+    from transcript_archive import record_result
+    from vector_memory import remember_run
+    record_final_answer(task, result.messages)
+    remember_run(task, result.messages)
+    timings = {"timings": active_team.last_timings} if mode == "dag" else {}
+    run_id = record_result(result, task, "multi_agent", stop, mode=mode, **timing, **timings)
+    if run_id:
+        print(f"🗄️  Transcript archived as run {run_id}\n")
 
 
 # Example complex tasks
@@ -98,8 +173,16 @@ TASKS = [
 
 
 async def main():
-    # Run the first complex task
-    await run_complex_task(TASKS[0])
+    load_dotenv()
+    setup_tracing("multi_agent")  # no-op unless AGENT_TRACING is set
+    
+    # Run the first complex task (--dag: parallel graph team, --relevance: skip idle agents)
+    mode = "round_robin"
+    if "--dag" in sys.argv:
+        mode = "dag"
+    elif "--relevance" in sys.argv:
+        mode = "relevance"
+    await run_complex_task(TASKS[0], mode)
 
 
 if __name__ == "__main__":
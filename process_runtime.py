@@ -0,0 +1,713 @@
+"""
+AutoGen Core - Local Multi-Process Agent Runtime
+Hosts RoutedAgents in separate OS processes on one machine, connected by pipes
+
+A working local alternative to the gRPC host/worker setup in distributed_demo.py.
+Each registered agent type runs in its own worker process(es), every worker hosts a
+SingleThreadedAgentRuntime, and the parent routes messages between them, so
+CPU-heavy handlers and many agents can spread across cores.
+
+    runtime = MultiProcessAgentRuntime()
+    await ResearchAgent.register(runtime, "research", ResearchAgent)
+    runtime.start()
+    result = await runtime.send_message(task, AgentId("research", "default"))
+    await runtime.stop()
+
+Factories must be picklable (a class or module-level function, not a lambda)
+because worker processes are spawned, not forked.
+
+Frames are pickled by default. Pass `codec=Codec(allow_pickle=True)` from
+serialization.py to send registered dataclasses in the compact binary format
+and compress large payloads (e.g. long LLM outputs) instead.
+
+Run `python process_runtime.py [processes] [--codec]` for an offline CPU-bound benchmark.
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from multiprocessing.reduction import ForkingPickler
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple, Union
+
+from autogen_core import (
+    AgentId,
+    AgentType,
+    BaseAgent,
+    CancellationToken,
+    MessageContext,
+    RoutedAgent,
+    SingleThreadedAgentRuntime,
+    message_handler,
+)
+
+import tracing
+from serialization import Codec, register_message
+
+
+class RemoteAgentError(RuntimeError):
+    """Raised in the caller when a handler in another process failed"""
+
+
+# ---------------------------------------------------------------------------
+# Wire protocol (one tuple per pipe message)
+#   ("call",   req_id, message, (type, key), sender (type, key) | None, trace carrier)
+#   ("result", req_id, ok, value | error string)
+#   ("cancel", req_id)
+#   ("ping",   req_id)            answered with a "result" frame carrying the worker's pid
+#   ("stop",)
+# ---------------------------------------------------------------------------
+
+
+def _encode(frame: tuple, codec: Optional[Codec] = None) -> bytes:
+    # Same bytes conn.send() would write, so the reader's conn.recv() is unchanged
+    return bytes(ForkingPickler.dumps(frame)) if codec is None else codec.dumps(frame)
+
+
+class _PipeWriter:
+    """
+    Writes frames to a pipe from its own thread, so a full pipe (a slow or busy
+    reader, a large payload) never blocks the event loop.
+
+    Frames are encoded by the caller, so encoding errors still raise there and a
+    frame captures the message as it was when sent; they are written in order.
+    The writer owns closing the connection: close() lets queued frames drain
+    first, and a broken pipe ends the thread (the reader side then sees EOF).
+    """
+
+    def __init__(self, conn: Connection, codec: Optional[Codec], name: str) -> None:
+        self._conn = conn
+        self._codec = codec
+        self._queue: "queue.SimpleQueue[Optional[bytes]]" = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def send(self, frame: tuple) -> None:
+        if not self._closed:
+            self._queue.put(_encode(frame, self._codec))
+
+    def _run(self) -> None:
+        try:
+            while True:
+                data = self._queue.get()
+                if data is None:
+                    return
+                self._conn.send_bytes(data)
+        except (OSError, ValueError):
+            pass  # the other end is gone
+        finally:
+            self._conn.close()
+
+    def close(self) -> None:
+        """Stop after the queued frames are written, then close the connection (does not block)"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self._thread.join(timeout)
+
+
+def _recv(conn: Connection, codec: Optional[Codec] = None) -> tuple:
+    if codec is None:
+        return conn.recv()
+    return codec.loads(conn.recv_bytes())
+
+
+def _as_tuple(agent_id: Optional[AgentId]) -> Optional[Tuple[str, str]]:
+    return (agent_id.type, agent_id.key) if agent_id is not None else None
+
+
+def _as_agent_id(value: Optional[Tuple[str, str]]) -> Optional[AgentId]:
+    return AgentId(*value) if value is not None else None
+
+
+# ---------------------------------------------------------------------------
+# Worker process side
+# ---------------------------------------------------------------------------
+
+
+class _RemoteProxy(BaseAgent):
+    """Stands in for an agent type hosted in another process; forwards to the parent"""
+
+    def __init__(self, link: "_WorkerLink") -> None:
+        super().__init__("Proxy for a remote agent type")
+        self._link = link
+
+    async def on_message_impl(self, message: Any, ctx: MessageContext) -> Any:
+        return await self._link.call_parent(message, self.id, ctx.sender, ctx.cancellation_token)
+
+
+class _WorkerLink:
+    """Pipe endpoint inside a worker process"""
+
+    def __init__(self, conn: Connection, runtime: SingleThreadedAgentRuntime, codec: Optional[Codec]) -> None:
+        self._conn = conn
+        self._runtime = runtime
+        self._codec = codec
+        self.writer = _PipeWriter(conn, codec, "pipe-writer")
+        self._ids = itertools.count(1)
+        self._outbound: Dict[int, asyncio.Future] = {}
+        self._inbound: Dict[int, asyncio.Task] = {}
+        self.stopped = asyncio.Event()
+
+    async def call_parent(self, message: Any, recipient: AgentId, sender: Optional[AgentId],
+                          token: CancellationToken) -> Any:
+        req_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._outbound[req_id] = future
+        token.add_callback(lambda: self.writer.send(("cancel", req_id)) if not future.done() else None)
+        frame = ("call", req_id, message, _as_tuple(recipient), _as_tuple(sender), tracing.inject())
+        self.writer.send(frame)
+        return await future
+
+    async def _handle_call(self, req_id: int, message: Any, recipient: Tuple[str, str],
+                           sender: Optional[Tuple[str, str]], carrier: Dict[str, str]) -> None:
+        try:
+            with tracing.attach(carrier):
+                result = await self._runtime.send_message(message, AgentId(*recipient), sender=_as_agent_id(sender))
+            frame = ("result", req_id, True, result)
+        except asyncio.CancelledError:
+            frame = ("result", req_id, False, "CancelledError: request cancelled")
+        except Exception as e:
+            frame = ("result", req_id, False, f"{type(e).__name__}: {e}")
+        finally:
+            self._inbound.pop(req_id, None)
+        try:
+            self.writer.send(frame)
+        except Exception as e:  # a result that cannot be encoded still answers the caller
+            self.writer.send(("result", req_id, False, f"{type(e).__name__}: {e}"))
+
+    def on_readable(self) -> None:
+        try:
+            while self._conn.poll():
+                frame = _recv(self._conn, self._codec)
+                op = frame[0]
+                if op == "call":
+                    _, req_id, message, recipient, sender, carrier = frame
+                    self._inbound[req_id] = asyncio.create_task(
+                        self._handle_call(req_id, message, recipient, sender, carrier)
+                    )
+                elif op == "result":
+                    _, req_id, ok, value = frame
+                    future = self._outbound.pop(req_id, None)
+                    if future is not None and not future.done():
+                        if ok:
+                            future.set_result(value)
+                        else:
+                            future.set_exception(RemoteAgentError(value))
+                elif op == "cancel":
+                    task = self._inbound.get(frame[1])
+                    if task is not None:
+                        task.cancel()
+                elif op == "ping":
+                    self.writer.send(("result", frame[1], True, os.getpid()))
+                elif op == "stop":
+                    self.stopped.set()
+                    return
+        except (EOFError, OSError):
+            self.stopped.set()
+
+
+async def _serve(conn: Connection, agent_type: str, factory: Callable[[], Any],
+                 expected_class: Optional[type], remote_types: List[str], codec: Optional[Codec]) -> None:
+    runtime = SingleThreadedAgentRuntime(tracer_provider=tracing.setup_tracing(f"worker-{agent_type}"))
+    link = _WorkerLink(conn, runtime, codec)
+    await runtime.register_factory(agent_type, factory, expected_class=expected_class)
+    for remote_type in remote_types:
+        await runtime.register_factory(remote_type, lambda: _RemoteProxy(link), expected_class=_RemoteProxy)
+    runtime.start()
+
+    loop = asyncio.get_running_loop()
+    loop.add_reader(conn.fileno(), link.on_readable)
+    link.writer.send(("result", 0, True, os.getpid()))  # ready signal
+    try:
+        await link.stopped.wait()
+    finally:
+        loop.remove_reader(conn.fileno())
+        for task in list(link._inbound.values()):
+            task.cancel()
+        await runtime.stop()
+        await runtime.close()
+        # Flush what is queued (the writer closes the pipe) before the process exits
+        link.writer.close()
+        await loop.run_in_executor(None, link.writer.join, 5.0)
+
+
+def _worker_main(conn: Connection, agent_type: str, factory: Callable[[], Any],
+                 expected_class: Optional[type], remote_types: List[str], codec: Optional[Codec]) -> None:
+    asyncio.run(_serve(conn, agent_type, factory, expected_class, remote_types, codec))
+
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class WorkerProcess:
+    """One worker process hosting (part of) an agent type"""
+    agent_type: str
+    index: int
+    process: Any
+    conn: Connection
+    writer: _PipeWriter
+    pid: int = 0
+    in_flight: int = 0
+    served: int = 0
+    alive: bool = True
+    retiring: bool = False   # draining or stopping: gets no new messages, exit is expected
+    keys: Set[str] = field(default_factory=set)
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def name(self) -> str:
+        return f"{self.agent_type}#{self.index}"
+
+
+@dataclass
+class _Pending:
+    worker: WorkerProcess
+    future: Optional[asyncio.Future] = None                     # request from the parent itself
+    origin: Optional[Tuple[WorkerProcess, int]] = None           # request relayed for a worker
+    started: float = field(default_factory=time.monotonic)
+
+
+class MultiProcessAgentRuntime:
+    """
+    Agent runtime whose agent types live in worker processes.
+
+    Supports the parts of the SingleThreadedAgentRuntime API the demos use:
+    `register_factory` (and therefore `SomeAgent.register(runtime, ...)`),
+    `start`, `send_message`, `stop`, `stop_when_idle` and `close`.
+    Publish/subscribe is not routed across processes.
+
+    The worker fleet can change while running (see supervisor.py):
+    `add_process`, `retire` (drain, then stop), `restart`, `ping` and `load`.
+    `on_worker_exit(worker, reason)` is called when a worker dies unexpectedly.
+
+    Messages, replies and factories travel through multiprocessing pipes, so
+    they must be picklable; the message dataclasses in this repo are. With a
+    `codec`, frames use the compact format from serialization.py instead.
+    """
+
+    def __init__(self, start_method: str = "spawn", codec: Optional[Codec] = None) -> None:
+        self._ctx = multiprocessing.get_context(start_method)
+        self._codec = codec
+        self._factories: Dict[str, Tuple[Callable[[], Any], Optional[type], int]] = {}
+        self._workers: Dict[str, List[WorkerProcess]] = {}
+        self._key_owner: Dict[Tuple[str, str], WorkerProcess] = {}
+        self._pending: Dict[int, _Pending] = {}
+        self._ids = itertools.count(1)
+        self._worker_index = itertools.count()
+        self._pings: Dict[int, asyncio.Future] = {}
+        self._latencies: Dict[str, Deque[Tuple[float, float]]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._started = False
+        self.on_worker_exit: Optional[Callable[[WorkerProcess, str], None]] = None
+
+    # -- registration -------------------------------------------------------
+
+    async def register_factory(
+        self,
+        type: Union[str, AgentType],
+        agent_factory: Callable[[], Any],
+        *,
+        expected_class: Optional[type] = None,
+        processes: int = 1
+    ) -> AgentType:
+        """Register an agent type to be hosted in `processes` worker processes"""
+        agent_type = type.type if isinstance(type, AgentType) else type
+        if self._started:
+            raise RuntimeError("Register all agent types before start()")
+        if agent_type in self._factories:
+            raise ValueError(f"Agent type {agent_type} already registered")
+        self._factories[agent_type] = (agent_factory, expected_class, processes)
+        return AgentType(agent_type)
+
+    def set_processes(self, agent_type: str, processes: int) -> None:
+        """Change how many worker processes an agent type starts with"""
+        factory, expected_class, _ = self._factories[agent_type]
+        self._factories[agent_type] = (factory, expected_class, processes)
+
+    async def add_subscription(self, subscription: Any) -> None:
+        # Called by BaseAgent.register; direct messaging needs no subscriptions
+        pass
+
+    def add_message_serializer(self, serializer: Any) -> None:
+        # Called by BaseAgent.register; frames are pickled or go through the runtime's codec
+        pass
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def start(self) -> None:
+        """Spawn the worker processes; call from inside the event loop"""
+        if self._started:
+            raise RuntimeError("Runtime already started")
+        self._loop = asyncio.get_running_loop()
+        self._started = True
+        for agent_type, (_, _, processes) in self._factories.items():
+            self._workers[agent_type] = []
+            for _ in range(processes):
+                self._spawn(agent_type)
+
+    def _spawn(self, agent_type: str) -> WorkerProcess:
+        factory, expected_class, _ = self._factories[agent_type]
+        remote_types = [t for t in self._factories if t != agent_type]
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, agent_type, factory, expected_class, remote_types, self._codec),
+            name=f"agent-{agent_type}",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        worker = WorkerProcess(agent_type=agent_type, index=next(self._worker_index), process=process, conn=parent_conn,
+                               writer=_PipeWriter(parent_conn, self._codec, f"pipe-writer-{agent_type}"))
+        self._workers[agent_type].append(worker)
+        self._loop.add_reader(parent_conn.fileno(), self._on_readable, worker)
+        return worker
+
+    async def wait_ready(self, timeout: float = 30.0) -> None:
+        """Wait until every worker process has started its runtime"""
+        deadline = time.monotonic() + timeout
+        while any(w.pid == 0 for workers in self._workers.values() for w in workers):
+            if time.monotonic() > deadline:
+                raise TimeoutError("Worker processes did not start in time")
+            await asyncio.sleep(0.02)
+
+    async def stop_when_idle(self) -> None:
+        """Wait for all outstanding requests, then stop"""
+        while self._pending:
+            await asyncio.sleep(0.05)
+        await self.stop()
+
+    async def stop(self) -> None:
+        """Stop every worker process"""
+        for workers in self._workers.values():
+            for worker in list(workers):
+                worker.retiring = True
+                await self._stop_worker(worker)
+        self._workers.clear()
+        self._key_owner.clear()
+        self._started = False
+
+    async def close(self) -> None:
+        if self._started:
+            await self.stop()
+
+    async def _stop_worker(self, worker: WorkerProcess, timeout: float = 5.0) -> None:
+        if worker.alive:
+            worker.writer.send(("stop",))
+        await asyncio.get_running_loop().run_in_executor(None, worker.process.join, timeout)
+        if worker.process.is_alive():
+            worker.process.terminate()
+        self._detach(worker, "worker stopped")
+
+    def _detach(self, worker: WorkerProcess, reason: str) -> None:
+        """Forget a worker and fail everything that was waiting on it"""
+        if worker.alive:
+            worker.alive = False
+            self._loop.remove_reader(worker.conn.fileno())
+            worker.writer.close()
+        for req_id, pending in list(self._pending.items()):
+            if pending.worker is worker:
+                self._resolve(req_id, False, f"{worker.name} exited: {reason}")
+        self._release_keys(worker)
+        workers = self._workers.get(worker.agent_type, [])
+        if worker in workers:
+            workers.remove(worker)
+            if not worker.retiring and self.on_worker_exit is not None:
+                self.on_worker_exit(worker, reason)
+
+    def _release_keys(self, worker: WorkerProcess) -> None:
+        for key in worker.keys:
+            if self._key_owner.get((worker.agent_type, key)) is worker:
+                del self._key_owner[(worker.agent_type, key)]
+        worker.keys.clear()
+
+    # -- fleet management ---------------------------------------------------
+
+    @property
+    def agent_types(self) -> List[str]:
+        return list(self._factories)
+
+    def workers(self, agent_type: str) -> List[WorkerProcess]:
+        """Live worker processes of a type, including ones being retired"""
+        return list(self._workers.get(agent_type, []))
+
+    def add_process(self, agent_type: str) -> WorkerProcess:
+        """Start one more worker process for a registered type"""
+        if not self._started:
+            raise RuntimeError("Runtime not started")
+        return self._spawn(agent_type)
+
+    async def retire(self, worker: WorkerProcess, timeout: float = 30.0) -> None:
+        """
+        Drain a worker, then stop it: it takes no new messages (its agent keys
+        move to other workers, losing in-memory agent state), finishes what it
+        has in flight, and is stopped after at most `timeout` seconds.
+        """
+        worker.retiring = True
+        self._release_keys(worker)
+        deadline = time.monotonic() + timeout
+        while worker.alive and worker.in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        await self._stop_worker(worker)
+
+    async def restart(self, worker: WorkerProcess) -> WorkerProcess:
+        """Kill a (hung) worker and start a replacement; its in-flight requests fail"""
+        worker.retiring = True
+        if worker.process.is_alive():
+            worker.process.kill()
+        self._detach(worker, "restarted")
+        await asyncio.get_running_loop().run_in_executor(None, worker.process.join, 5.0)
+        return self._spawn(worker.agent_type)
+
+    async def ping(self, worker: WorkerProcess, timeout: float = 5.0) -> bool:
+        """Health check: True if the worker's event loop answers within `timeout`"""
+        if not worker.alive:
+            return False
+        req_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pings[req_id] = future
+        try:
+            worker.writer.send(("ping", req_id))
+            await asyncio.wait_for(future, timeout)
+            return True
+        except (asyncio.TimeoutError, OSError):
+            return False
+        finally:
+            self._pings.pop(req_id, None)
+
+    def load(self, agent_type: str, window_s: float = 30.0) -> Dict[str, Any]:
+        """Current load of an agent type: outstanding requests and recent latency"""
+        workers = self._workers.get(agent_type, [])
+        active = [w for w in workers if w.alive and not w.retiring]
+        now = time.monotonic()
+        recent = sorted(latency for finished, latency in self._latencies.get(agent_type, ()) if now - finished <= window_s)
+        return {
+            "processes": len(active),
+            "retiring": len(workers) - len(active),
+            "in_flight": sum(w.in_flight for w in workers),
+            "completed": len(recent),
+            "latency_p50_s": round(recent[len(recent) // 2], 3) if recent else 0.0,
+            "latency_p95_s": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 3) if recent else 0.0
+        }
+
+    # -- routing ------------------------------------------------------------
+
+    def _route(self, recipient: Tuple[str, str]) -> WorkerProcess:
+        owner = self._key_owner.get(recipient)
+        if owner is not None and owner.alive:
+            return owner
+        candidates = [w for w in self._workers.get(recipient[0], []) if w.alive and not w.retiring]
+        if not candidates:
+            raise LookupError(f"No live worker process for agent type {recipient[0]}")
+        # Each key (agent instance) lives in exactly one process; new keys go to the least busy one
+        worker = min(candidates, key=lambda w: (w.in_flight, len(w.keys)))
+        worker.keys.add(recipient[1])
+        self._key_owner[recipient] = worker
+        return worker
+
+    def _dispatch(self, message: Any, recipient: Tuple[str, str], sender: Optional[Tuple[str, str]],
+                  carrier: Dict[str, str], pending: Callable[[WorkerProcess], _Pending]) -> int:
+        worker = self._route(recipient)
+        req_id = next(self._ids)
+        self._pending[req_id] = pending(worker)
+        try:
+            worker.writer.send(("call", req_id, message, recipient, sender, carrier))
+        except Exception:
+            del self._pending[req_id]
+            raise
+        worker.in_flight += 1
+        return req_id
+
+    def _resolve(self, req_id: int, ok: bool, value: Any) -> None:
+        pending = self._pending.pop(req_id, None)
+        if pending is None:
+            return
+        pending.worker.in_flight -= 1
+        pending.worker.served += 1
+        now = time.monotonic()
+        self._latencies.setdefault(pending.worker.agent_type, deque(maxlen=1024)).append((now, now - pending.started))
+        if pending.future is not None:
+            if not pending.future.done():
+                if ok:
+                    pending.future.set_result(value)
+                else:
+                    pending.future.set_exception(RemoteAgentError(value))
+        elif pending.origin is not None:
+            origin, origin_req_id = pending.origin
+            if origin.alive:
+                origin.writer.send(("result", origin_req_id, ok, value))
+
+    def _on_readable(self, worker: WorkerProcess) -> None:
+        try:
+            while worker.alive and worker.conn.poll():
+                frame = _recv(worker.conn, self._codec)
+                op = frame[0]
+                if op == "result":
+                    _, req_id, ok, value = frame
+                    if req_id == 0:
+                        worker.pid = value
+                    elif req_id in self._pings:
+                        if not self._pings[req_id].done():
+                            self._pings[req_id].set_result(value)
+                    else:
+                        self._resolve(req_id, ok, value)
+                elif op == "call":
+                    _, origin_req_id, message, recipient, sender, carrier = frame
+                    try:
+                        self._dispatch(message, recipient, sender, carrier,
+                                       lambda w: _Pending(worker=w, origin=(worker, origin_req_id)))
+                    except LookupError as e:
+                        worker.writer.send(("result", origin_req_id, False, str(e)))
+                elif op == "cancel":
+                    for req_id, pending in list(self._pending.items()):
+                        if pending.origin == (worker, frame[1]) and pending.worker.alive:
+                            pending.worker.writer.send(("cancel", req_id))
+        except (EOFError, OSError):
+            self._detach(worker, "connection lost")
+
+    async def send_message(
+        self,
+        message: Any,
+        recipient: AgentId,
+        *,
+        sender: Optional[AgentId] = None,
+        cancellation_token: Optional[CancellationToken] = None,
+        message_id: Optional[str] = None
+    ) -> Any:
+        """Send a message to an agent in a worker process and await its reply"""
+        if not self._started:
+            raise RuntimeError("Runtime not started")
+        with tracing.get_tracer().start_as_current_span(
+            f"process_runtime send {recipient.type}", attributes={"agent.recipient": str(recipient)}
+        ):
+            future = asyncio.get_running_loop().create_future()
+            req_id = self._dispatch(message, _as_tuple(recipient), _as_tuple(sender), tracing.inject(),
+                                    lambda w: _Pending(worker=w, future=future))
+            if cancellation_token is not None:
+                def cancel() -> None:
+                    pending = self._pending.get(req_id)
+                    if pending is not None and pending.worker.alive:
+                        pending.worker.writer.send(("cancel", req_id))
+                cancellation_token.add_callback(cancel)
+                cancellation_token.link_future(future)
+            return await future
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-type view of worker processes and their load"""
+        return {
+            agent_type: [
+                {"worker": w.name, "pid": w.pid, "in_flight": w.in_flight, "served": w.served, "keys": len(w.keys),
+                 "retiring": w.retiring}
+                for w in workers
+            ]
+            for agent_type, workers in self._workers.items()
+        }
+
+
+# ---------------------------------------------------------------------------
+# Offline demo: CPU-bound agents, one process vs. several
+# ---------------------------------------------------------------------------
+
+
+@register_message
+@dataclass
+class PrimeRange:
+    start: int
+    stop: int
+
+
+@register_message
+@dataclass
+class PrimeCount:
+    count: int
+    pids: List[int]
+
+
+@register_message
+@dataclass
+class PrimeJob:
+    limit: int
+    chunks: int
+
+
+class PrimeCounterAgent(RoutedAgent):
+    """CPU-heavy worker: counts primes in a range"""
+
+    def __init__(self) -> None:
+        super().__init__("Counts primes")
+
+    @message_handler
+    async def count(self, message: PrimeRange, ctx: MessageContext) -> PrimeCount:
+        count = 0
+        for n in range(max(message.start, 2), message.stop):
+            if all(n % d for d in range(2, int(n ** 0.5) + 1)):
+                count += 1
+        return PrimeCount(count=count, pids=[os.getpid()])
+
+
+class PrimeCoordinatorAgent(RoutedAgent):
+    """Splits a job and fans it out to counter instances (possibly in other processes)"""
+
+    def __init__(self) -> None:
+        super().__init__("Splits prime counting jobs")
+
+    @message_handler
+    async def split(self, message: PrimeJob, ctx: MessageContext) -> PrimeCount:
+        step = message.limit // message.chunks
+        replies = await asyncio.gather(*(
+            self.send_message(PrimeRange(i * step, (i + 1) * step), AgentId("counter", f"chunk-{i}"))
+            for i in range(message.chunks)
+        ))
+        return PrimeCount(count=sum(r.count for r in replies), pids=sorted({pid for r in replies for pid in r.pids}))
+
+
+async def _run_job(runtime: Any, job: PrimeJob) -> Tuple[PrimeCount, float]:
+    runtime.start()
+    if isinstance(runtime, MultiProcessAgentRuntime):
+        await runtime.wait_ready()
+    started = time.perf_counter()
+    result = await runtime.send_message(job, AgentId("coordinator", "default"))
+    elapsed = time.perf_counter() - started
+    await runtime.stop()
+    return result, elapsed
+
+
+async def demo(processes: int = 4, codec: Optional[Codec] = None) -> None:
+    job = PrimeJob(limit=400_000, chunks=processes * 2)
+    print("\n" + "="*80)
+    print("🧮 MULTI-PROCESS AGENT RUNTIME (offline CPU benchmark)")
+    print("="*80 + "\n")
+
+    single = SingleThreadedAgentRuntime(tracer_provider=tracing.setup_tracing("process_runtime_demo"))
+    await PrimeCounterAgent.register(single, "counter", PrimeCounterAgent)
+    await PrimeCoordinatorAgent.register(single, "coordinator", PrimeCoordinatorAgent)
+    result, single_s = await _run_job(single, job)
+    print(f"SingleThreadedAgentRuntime : {result.count} primes in {single_s:.2f}s")
+
+    multi = MultiProcessAgentRuntime(codec=codec)
+    await PrimeCounterAgent.register(multi, "counter", PrimeCounterAgent)
+    await PrimeCoordinatorAgent.register(multi, "coordinator", PrimeCoordinatorAgent)
+    multi.set_processes("counter", processes)
+    result, multi_s = await _run_job(multi, job)
+    wire = f", {codec.compression} codec" if codec is not None else ""
+    print(f"MultiProcessAgentRuntime   : {result.count} primes in {multi_s:.2f}s across {len(result.pids)} processes{wire}")
+    print(f"\n⚡ Speedup: {single_s / multi_s:.1f}x with {processes} counter processes\n")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    asyncio.run(demo(int(args[0]) if args else 4, Codec() if "--codec" in sys.argv else None))
@@ -0,0 +1,468 @@
+"""
+AutoGen Core - Compact Message Serialization
+Binary encoding with optional compression for messages that cross process or host boundaries
+
+Encoding is a small tagged format: varint integers, length-prefixed strings and
+bytes, and registered dataclasses written as (type id, schema version, field
+values) instead of repeating every field name like JSON does. Bodies above a
+size threshold are compressed with zstd or lz4 when installed, zlib otherwise.
+
+    @register_message(version=2)
+    @dataclass
+    class ResearchTask:
+        query: str
+        complexity: str
+        sources: List[str] = field(default_factory=list)   # added in version 2
+
+    codec = Codec()
+    data = codec.dumps(ResearchTask("agents", "high"))
+    task = codec.loads(data)
+
+Schema evolution is append-only: new fields go at the end with a default, so a
+payload written by an older version still decodes (missing fields take their
+defaults) and a newer payload decodes on an older reader (extra fields dropped).
+
+Run `python serialization.py` for a size/speed comparison with the JSON path.
+"""
+
+import dataclasses
+import json
+import os
+import pickle
+import struct
+import sys
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # optional
+    lz4_frame = None
+
+
+COMPACT_DATA_CONTENT_TYPE = "application/x-autogen-compact"
+
+_MAGIC = 0xAC
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _BYTES, _LIST, _TUPLE, _DICT, _RECORD, _PICKLE = range(12)
+_COMPRESSION_IDS = {"none": 0, "zlib": 1, "zstd": 2, "lz4": 3}
+_DOUBLE = struct.Struct("<d")
+
+
+class SerializationError(ValueError):
+    """Raised when a value cannot be encoded or a payload cannot be decoded"""
+
+
+# ---------------------------------------------------------------------------
+# Dataclass registry
+# ---------------------------------------------------------------------------
+
+
+@dataclasses.dataclass
+class _Schema:
+    cls: type
+    name: str
+    type_id: int
+    version: int
+    names: List[str]
+    defaults: List[Optional[Callable[[], Any]]]  # None means the field is required
+
+
+_schemas_by_type: Dict[type, _Schema] = {}
+_schemas_by_id: Dict[int, _Schema] = {}
+
+
+def _qualified_name(cls: type) -> str:
+    """module.qualname, with a script's module named after its file so every process agrees"""
+    module = cls.__module__
+    if module in ("__main__", "__mp_main__"):
+        main = sys.modules.get(module)
+        spec = getattr(main, "__spec__", None)
+        if spec is not None and spec.name not in ("__main__", "__mp_main__"):
+            module = spec.name
+        elif getattr(main, "__file__", None):
+            module = os.path.splitext(os.path.basename(main.__file__))[0]
+    return f"{module}.{cls.__qualname__}"
+
+
+def register_message(cls: Optional[type] = None, *, name: Optional[str] = None, version: int = 1) -> Any:
+    """
+    Register a dataclass for compact encoding; use as `@register_message` or
+    `@register_message(version=2)` above `@dataclass`.
+
+    The type id is derived from `name` (default: module and qualified name of
+    the class), so every process that registers the class agrees on it without
+    coordination. Registering a different schema under a name (or id) already
+    taken raises ValueError; re-registering the same schema (a module imported
+    twice, e.g. as a script and by name) replaces the class used for decoding.
+    """
+    def wrap(cls: type) -> type:
+        if not dataclasses.is_dataclass(cls):
+            raise TypeError(f"{cls.__name__} must be a dataclass to be registered")
+        type_name = name or _qualified_name(cls)
+        type_id = zlib.crc32(type_name.encode())
+        existing = _schemas_by_id.get(type_id)
+        if existing is not None and existing.name != type_name:
+            raise ValueError(f"Type id clash between {type_name} and {existing.name}; pass a different name=")
+        names, defaults = [], []
+        for f in dataclasses.fields(cls):
+            if not f.init:
+                continue
+            names.append(f.name)
+            if f.default is not dataclasses.MISSING:
+                defaults.append(lambda value=f.default: value)
+            elif f.default_factory is not dataclasses.MISSING:
+                defaults.append(f.default_factory)
+            else:
+                defaults.append(None)
+        if existing is not None and existing.cls is not cls and (existing.version, existing.names) != (version, names):
+            raise ValueError(
+                f"{type_name} is already registered by {existing.cls.__module__}.{existing.cls.__qualname__} "
+                f"with a different schema; pass a different name="
+            )
+        schema = _Schema(cls=cls, name=type_name, type_id=type_id, version=version, names=names, defaults=defaults)
+        _schemas_by_type[cls] = schema
+        _schemas_by_id[type_id] = schema
+        return cls
+
+    return wrap(cls) if cls is not None else wrap
+
+
+def is_registered(cls: type) -> bool:
+    return cls in _schemas_by_type
+
+
+# ---------------------------------------------------------------------------
+# Encoder / decoder
+# ---------------------------------------------------------------------------
+
+
+def _write_varint(out: bytearray, n: int) -> None:
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _encode(value: Any, out: bytearray, allow_pickle: bool) -> None:
+    # Exact type checks first: they are the common case and bool is a subclass of int
+    kind = type(value)
+    if kind is str:
+        raw = value.encode("utf-8")
+        out.append(_STR)
+        _write_varint(out, len(raw))
+        out += raw
+    elif value is None:
+        out.append(_NONE)
+    elif kind is bool:
+        out.append(_TRUE if value else _FALSE)
+    elif kind is int:
+        out.append(_INT)
+        _write_varint(out, value << 1 if value >= 0 else ((-value) << 1) - 1)  # zigzag
+    elif kind is float:
+        out.append(_FLOAT)
+        out += _DOUBLE.pack(value)
+    elif kind is list or kind is tuple:
+        out.append(_LIST if kind is list else _TUPLE)
+        _write_varint(out, len(value))
+        for item in value:
+            _encode(item, out, allow_pickle)
+    elif kind is dict:
+        out.append(_DICT)
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            _encode(key, out, allow_pickle)
+            _encode(item, out, allow_pickle)
+    elif kind is bytes or kind is bytearray:
+        out.append(_BYTES)
+        _write_varint(out, len(value))
+        out += value
+    elif kind in _schemas_by_type:
+        schema = _schemas_by_type[kind]
+        out.append(_RECORD)
+        _write_varint(out, schema.type_id)
+        _write_varint(out, schema.version)
+        _write_varint(out, len(schema.names))
+        for name in schema.names:
+            _encode(getattr(value, name), out, allow_pickle)
+    elif allow_pickle:
+        raw = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        out.append(_PICKLE)
+        _write_varint(out, len(raw))
+        out += raw
+    else:
+        raise SerializationError(f"Cannot encode {kind.__name__}; register it with @register_message")
+
+
+def _decode(data: bytes, pos: int, allow_pickle: bool) -> Tuple[Any, int]:
+    tag = data[pos]
+    pos += 1
+    if tag == _STR:
+        size, pos = _read_varint(data, pos)
+        return str(data[pos:pos + size], "utf-8"), pos + size
+    if tag == _NONE:
+        return None, pos
+    if tag == _TRUE or tag == _FALSE:
+        return tag == _TRUE, pos
+    if tag == _INT:
+        n, pos = _read_varint(data, pos)
+        return (n >> 1) if not n & 1 else -((n + 1) >> 1), pos
+    if tag == _FLOAT:
+        return _DOUBLE.unpack_from(data, pos)[0], pos + 8
+    if tag == _LIST or tag == _TUPLE:
+        size, pos = _read_varint(data, pos)
+        items = []
+        for _ in range(size):
+            item, pos = _decode(data, pos, allow_pickle)
+            items.append(item)
+        return (items if tag == _LIST else tuple(items)), pos
+    if tag == _DICT:
+        size, pos = _read_varint(data, pos)
+        result = {}
+        for _ in range(size):
+            key, pos = _decode(data, pos, allow_pickle)
+            result[key], pos = _decode(data, pos, allow_pickle)
+        return result, pos
+    if tag == _BYTES:
+        size, pos = _read_varint(data, pos)
+        return bytes(data[pos:pos + size]), pos + size
+    if tag == _RECORD:
+        type_id, pos = _read_varint(data, pos)
+        _version, pos = _read_varint(data, pos)
+        count, pos = _read_varint(data, pos)
+        schema = _schemas_by_id.get(type_id)
+        if schema is None:
+            raise SerializationError(f"Unknown message type id {type_id}; is its module imported in this process?")
+        values = []
+        for _ in range(count):
+            item, pos = _decode(data, pos, allow_pickle)
+            values.append(item)
+        # Newer writer: drop fields we do not know. Older writer: fill in defaults.
+        del values[len(schema.names):]
+        for name, default in zip(schema.names[len(values):], schema.defaults[len(values):]):
+            if default is None:
+                raise SerializationError(f"{schema.cls.__name__} payload is missing required field {name!r}")
+            values.append(default())
+        return schema.cls(*values), pos
+    if tag == _PICKLE:
+        if not allow_pickle:
+            raise SerializationError("Payload contains a pickled value but this codec does not allow pickle")
+        size, pos = _read_varint(data, pos)
+        return pickle.loads(data[pos:pos + size]), pos + size
+    raise SerializationError(f"Unknown tag {tag} at offset {pos - 1}")
+
+
+# ---------------------------------------------------------------------------
+# Codec
+# ---------------------------------------------------------------------------
+
+
+def best_compression() -> str:
+    """The fastest compressor installed: zstd, then lz4, then zlib"""
+    if zstandard is not None:
+        return "zstd"
+    if lz4_frame is not None:
+        return "lz4"
+    return "zlib"
+
+
+class Codec:
+    """
+    Encodes values to `bytes` and back.
+
+    Frame layout: magic byte, compression id, then the (possibly compressed)
+    body. Bodies shorter than `threshold` bytes are sent as-is since compressing
+    small messages costs more CPU than it saves on the wire. Readers decompress
+    whatever the writer chose, so processes may use different settings as long
+    as the readers have the library installed.
+
+    `allow_pickle` lets values the format does not know (unregistered classes)
+    through as embedded pickles; only enable it between trusted processes.
+    """
+
+    def __init__(self, compression: str = "auto", threshold: int = 1024, level: Optional[int] = None,
+                 allow_pickle: bool = False) -> None:
+        compression = best_compression() if compression == "auto" else compression
+        if compression not in _COMPRESSION_IDS:
+            raise ValueError(f"Unknown compression {compression!r}; choose from {sorted(_COMPRESSION_IDS)} or 'auto'")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd compression needs `pip install zstandard`")
+        if compression == "lz4" and lz4_frame is None:
+            raise ImportError("lz4 compression needs `pip install lz4`")
+        self.compression = compression
+        self.threshold = threshold
+        self.level = level
+        self.allow_pickle = allow_pickle
+        self._zstd_compressor = None
+        self._zstd_decompressor = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Compressor contexts are not picklable; worker processes build their own
+        return {**self.__dict__, "_zstd_compressor": None, "_zstd_decompressor": None}
+
+    def _compress(self, body: bytes) -> bytes:
+        if self.compression == "zstd":
+            if self._zstd_compressor is None:
+                self._zstd_compressor = zstandard.ZstdCompressor(level=self.level or 3)
+            return self._zstd_compressor.compress(body)
+        if self.compression == "lz4":
+            return lz4_frame.compress(body, compression_level=self.level or 0)
+        return zlib.compress(body, self.level or 6)
+
+    def _decompress(self, compression_id: int, body: bytes) -> bytes:
+        if compression_id == 1:
+            return zlib.decompress(body)
+        if compression_id == 2:
+            if zstandard is None:
+                raise SerializationError("Payload is zstd-compressed; `pip install zstandard` to read it")
+            if self._zstd_decompressor is None:
+                self._zstd_decompressor = zstandard.ZstdDecompressor()
+            return self._zstd_decompressor.decompress(body)
+        if compression_id == 3:
+            if lz4_frame is None:
+                raise SerializationError("Payload is lz4-compressed; `pip install lz4` to read it")
+            return lz4_frame.decompress(body)
+        raise SerializationError(f"Unknown compression id {compression_id}")
+
+    def dumps(self, value: Any) -> bytes:
+        body = bytearray()
+        _encode(value, body, self.allow_pickle)
+        if self.compression != "none" and len(body) >= self.threshold:
+            compressed = self._compress(bytes(body))
+            if len(compressed) < len(body):
+                return bytes((_MAGIC, _COMPRESSION_IDS[self.compression])) + compressed
+        return bytes((_MAGIC, 0)) + body
+
+    def loads(self, data: bytes) -> Any:
+        if len(data) < 3 or data[0] != _MAGIC:
+            raise SerializationError("Not a compact-codec payload")
+        body = data[2:] if data[1] == 0 else self._decompress(data[1], data[2:])
+        value, pos = _decode(body, 0, self.allow_pickle)
+        if pos != len(body):
+            raise SerializationError(f"{len(body) - pos} trailing bytes after payload")
+        return value
+
+
+class CodecSerializer:
+    """
+    autogen_core `MessageSerializer` for a registered dataclass, for
+    `runtime.add_message_serializer(...)`.
+
+    The 0.4 gRPC runtimes only route the JSON and protobuf content types; to use
+    the compact format there, pass `content_type=JSON_DATA_CONTENT_TYPE` and add
+    the serializers after registering agents so they replace the JSON ones.
+    Every process must then use the same codec for those types.
+    """
+
+    def __init__(self, cls: type, codec: Optional[Codec] = None,
+                 content_type: str = COMPACT_DATA_CONTENT_TYPE) -> None:
+        if not is_registered(cls):
+            register_message(cls)
+        self.cls = cls
+        self.codec = codec or Codec()
+        self._content_type = content_type
+
+    @property
+    def data_content_type(self) -> str:
+        return self._content_type
+
+    @property
+    def type_name(self) -> str:
+        return self.cls.__name__
+
+    def serialize(self, message: Any) -> bytes:
+        return self.codec.dumps(message)
+
+    def deserialize(self, payload: bytes) -> Any:
+        message = self.codec.loads(payload)
+        if not isinstance(message, self.cls):
+            raise SerializationError(f"Expected {self.cls.__name__}, got {type(message).__name__}")
+        return message
+
+
+def serializers_for(*classes: type, codec: Optional[Codec] = None,
+                    content_type: str = COMPACT_DATA_CONTENT_TYPE) -> List[CodecSerializer]:
+    """One CodecSerializer per message class, sharing a codec"""
+    codec = codec or Codec()
+    return [CodecSerializer(cls, codec, content_type) for cls in classes]
+
+
+# ---------------------------------------------------------------------------
+# Benchmark: compact codec vs. the JSON path autogen uses for dataclasses
+# ---------------------------------------------------------------------------
+
+
+@register_message
+@dataclasses.dataclass
+class _BenchMessage:
+    query: str
+    complexity: str
+    session_id: str
+    scores: List[float]
+    attempt: int
+
+
+def _bench_payloads() -> Dict[str, _BenchMessage]:
+    paragraph = (
+        "Multi-agent systems split a task across specialised agents. The researcher gathers "
+        "sources, the coder implements and tests, and the reviewer checks the result before "
+        "the synthesizer writes the final answer. "
+    )
+    return {
+        "small (routing msg)": _BenchMessage("Explain Python generators", "low", "s-42", [0.9, 0.4], 1),
+        "medium (1 reply)": _BenchMessage(paragraph * 8, "medium", "s-42", [0.1 * i for i in range(20)], 2),
+        "large (transcript)": _BenchMessage(paragraph * 200, "high", "s-42", [0.1 * i for i in range(200)], 3),
+    }
+
+
+def _time_it(func: Callable[[], Any], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def benchmark(repeat: int = 2000) -> None:
+    json_dumps = lambda m: json.dumps(dataclasses.asdict(m)).encode("utf-8")
+    json_loads = lambda b: _BenchMessage(**json.loads(b.decode("utf-8")))
+    codecs = {
+        "json (autogen default)": (json_dumps, json_loads),
+        "compact": (Codec(compression="none").dumps, Codec(compression="none").loads),
+        f"compact+{best_compression()}": (Codec().dumps, Codec().loads),
+        "pickle": (pickle.dumps, pickle.loads),
+    }
+
+    print("\n" + "="*80)
+    print("📦 MESSAGE SERIALIZATION BENCHMARK")
+    print("="*80)
+    for label, message in _bench_payloads().items():
+        print(f"\n{label}")
+        print(f"   {'format':24} {'bytes':>9} {'encode µs':>11} {'decode µs':>11}")
+        runs = max(20, repeat // (1 + len(message.query) // 1000))
+        for name, (dumps, loads) in codecs.items():
+            payload = dumps(message)
+            assert loads(payload) == message
+            encode_us = _time_it(lambda: dumps(message), runs)
+            decode_us = _time_it(lambda: loads(payload), runs)
+            print(f"   {name:24} {len(payload):9,} {encode_us:11.1f} {decode_us:11.1f}")
+    print()
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
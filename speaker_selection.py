@@ -0,0 +1,114 @@
+"""
+AutoGen Multi-Agent System - Relevance-Based Speaker Selection
+Cheap heuristics pick the next speaker so idle agents never cost an LLM call
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence
+
+from autogen_agentchat.messages import AgentEvent, ChatMessage, TextMessage, ToolCallSummaryMessage
+
+from dag_team import REVISE_DIRECTIVE
+
+
+RESEARCH_KEYWORDS = {
+    "research", "find", "explain", "what", "why", "who", "history", "information", "compare",
+    "latest", "news", "trend", "trends", "search", "summarize", "overview", "weather", "stock",
+    "price", "market", "technology", "benefits", "about", "basics"
+}
+
+CODE_KEYWORDS = {
+    "code", "implement", "python", "function", "script", "write", "program", "algorithm",
+    "simulate", "simulation", "test", "bug", "debug", "compute", "calculate", "class",
+    "regression", "create", "build", "plot", "parse"
+}
+
+
+def keyword_score(text: str, keywords: set) -> int:
+    """Number of keyword hits in `text` (the whole "classifier")"""
+    return sum(1 for word in re.findall(r"[a-z]+", text.lower()) if word in keywords)
+
+
+class RelevanceSelector:
+    """
+    `selector_func` for SelectorGroupChat that walks the Researcher -> Coder ->
+    Reviewer -> Synthesizer pipeline but skips roles the task does not need:
+    a pure research question never wakes the Coder and vice versa.
+
+    Every choice is compared with what round-robin would have picked; the
+    agents jumped over are counted as saved turns (see `report()`).
+    """
+
+    def __init__(
+        self,
+        researcher: str = "Researcher",
+        coder: str = "Coder",
+        reviewer: str = "Reviewer",
+        synthesizer: str = "Synthesizer"
+    ) -> None:
+        self.researcher = researcher
+        self.coder = coder
+        self.reviewer = reviewer
+        self.synthesizer = synthesizer
+        self._order = [researcher, coder, reviewer, synthesizer]
+        self._needs_research = True
+        self._needs_code = True
+        self._previous: Optional[str] = None
+        self.turns = 0
+        self.turns_saved = 0
+        self.history: List[Dict[str, int]] = []
+
+    def _start_run(self, task: str) -> None:
+        if self.turns:
+            self.history.append(self.report())
+        research = keyword_score(task, RESEARCH_KEYWORDS)
+        code = keyword_score(task, CODE_KEYWORDS)
+        # No signal either way: keep both roles rather than guess
+        self._needs_research = research > 0 or code == 0
+        self._needs_code = code > 0 or research == 0
+        self._previous = None
+        self.turns = 0
+        self.turns_saved = 0
+
+    def _choose(self, last: Optional[ChatMessage]) -> str:
+        if last is None or last.source == "user":
+            if self._needs_research:
+                return self.researcher
+            return self.coder if self._needs_code else self.synthesizer
+
+        content = str(last.content)
+        if last.source == self.researcher:
+            return self.coder if self._needs_code else self.reviewer
+        if last.source == self.coder:
+            return self.reviewer
+        if last.source == self.reviewer:
+            if REVISE_DIRECTIVE.search(content):
+                # Send the revision to whichever role the feedback is about
+                about_code = keyword_score(content, CODE_KEYWORDS) >= keyword_score(content, RESEARCH_KEYWORDS)
+                if self._needs_code and (about_code or not self._needs_research):
+                    return self.coder
+                return self.researcher
+            return self.synthesizer
+        # Synthesizer spoke without finishing: get one more review before it retries
+        return self.reviewer
+
+    def __call__(self, messages: Sequence[AgentEvent | ChatMessage]) -> Optional[str]:
+        replies = [m for m in messages if isinstance(m, (TextMessage, ToolCallSummaryMessage))]
+        if replies and replies[0].source == "user" and len(replies) == 1:
+            self._start_run(replies[0].content)
+
+        speaker = self._choose(replies[-1] if replies else None)
+
+        # Compare with round-robin: everyone between the previous and the chosen speaker was skipped
+        if self._previous in self._order and speaker in self._order:
+            gap = (self._order.index(speaker) - self._order.index(self._previous) - 1) % len(self._order)
+        else:
+            gap = self._order.index(speaker) if speaker in self._order else 0
+        self.turns += 1
+        self.turns_saved += gap
+        self._previous = speaker
+        return speaker
+
+    def report(self) -> Dict[str, int]:
+        """Turns taken and turns round-robin would have spent on idle agents"""
+        return {"turns": self.turns, "turns_saved": self.turns_saved}
@@ -0,0 +1,278 @@
+"""
+AutoGen Core - Autoscaling Worker Supervisor
+Keeps each agent type's worker processes in MultiProcessAgentRuntime sized to its load
+
+Every `interval_s` the supervisor looks at each agent type's outstanding requests
+and recent latency and:
+
+- spawns workers when requests per process exceed `target_in_flight` or p95
+  latency exceeds `max_latency_s` (immediately, up to `max_processes`);
+- retires one worker at a time when load has stayed low for `scale_down_after_s`
+  (drained gracefully, down to `min_processes`);
+- pings every worker every `health_interval_s` and restarts the ones that do not
+  answer, and replaces workers that crash.
+
+    runtime = MultiProcessAgentRuntime()
+    await WorkerAgent.register(runtime, "worker", WorkerAgent)
+    runtime.start()
+    supervisor = Supervisor(runtime, {"worker": ScalingPolicy(min_processes=1, max_processes=4)})
+    supervisor.start()
+    ...
+    await supervisor.stop()
+    await runtime.stop()
+
+Run `python supervisor.py` for an offline demo (load ramp, crash, scale-down).
+"""
+
+import asyncio
+import math
+import os
+import signal
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from autogen_core import AgentId
+
+from process_runtime import MultiProcessAgentRuntime, PrimeCounterAgent, PrimeRange, RemoteAgentError, WorkerProcess
+
+
+@dataclass
+class ScalingPolicy:
+    """Bounds and thresholds for one agent type"""
+    min_processes: int = 1
+    max_processes: int = os.cpu_count() or 2
+    target_in_flight: float = 4.0          # outstanding requests per process before scaling up
+    max_latency_s: Optional[float] = None  # also scale up when p95 latency is above this
+    scale_down_after_s: float = 30.0       # load must stay low this long before retiring a worker
+    cooldown_s: float = 5.0                # minimum time between scaling actions
+    drain_timeout_s: float = 30.0
+    health_interval_s: float = 10.0
+    ping_timeout_s: float = 5.0
+
+
+@dataclass
+class ScalingEvent:
+    at: float
+    agent_type: str
+    action: str       # "scale_up", "scale_down", "restart", "replace"
+    processes: int    # active processes after the action
+    reason: str
+
+
+@dataclass
+class _TypeState:
+    last_action: float = 0.0
+    low_since: Optional[float] = None
+    last_health_check: float = field(default_factory=time.monotonic)
+
+
+class Supervisor:
+    """Autoscaler and health checker for a MultiProcessAgentRuntime"""
+
+    def __init__(
+        self,
+        runtime: MultiProcessAgentRuntime,
+        policies: Optional[Dict[str, ScalingPolicy]] = None,
+        default: Optional[ScalingPolicy] = None,
+        interval_s: float = 1.0,
+        verbose: bool = True
+    ) -> None:
+        self.runtime = runtime
+        self.policies = policies or {}
+        self.default = default
+        self.interval_s = interval_s
+        self.verbose = verbose
+        self.events: List[ScalingEvent] = []
+        self._state: Dict[str, _TypeState] = {}
+        self._exited: List[WorkerProcess] = []
+        self._task: Optional[asyncio.Task] = None
+        self._background: Set[asyncio.Task] = set()
+        runtime.on_worker_exit = self._on_worker_exit
+
+    def _policy(self, agent_type: str) -> Optional[ScalingPolicy]:
+        return self.policies.get(agent_type, self.default)
+
+    def _managed_types(self) -> List[str]:
+        return [t for t in self.runtime.agent_types if self._policy(t) is not None]
+
+    def _record(self, agent_type: str, action: str, reason: str) -> None:
+        processes = self.runtime.load(agent_type)["processes"]
+        event = ScalingEvent(time.monotonic(), agent_type, action, processes, reason)
+        self.events.append(event)
+        if self.verbose:
+            print(f"[SUPERVISOR] {agent_type}: {action} → {processes} process(es) ({reason})")
+
+    def _on_worker_exit(self, worker: WorkerProcess, reason: str) -> None:
+        self._exited.append(worker)
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def start(self) -> None:
+        """Bring every managed type to its minimum and start the control loop"""
+        for agent_type in self._managed_types():
+            policy = self._policy(agent_type)
+            for _ in range(policy.min_processes - self.runtime.load(agent_type)["processes"]):
+                self.runtime.add_process(agent_type)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            await self.tick()
+            await asyncio.sleep(self.interval_s)
+
+    # -- control loop -------------------------------------------------------
+
+    async def tick(self) -> None:
+        """One supervision pass; also callable directly for tests and scripts"""
+        now = time.monotonic()
+        exited, self._exited = self._exited, []
+        for worker in exited:
+            if self._policy(worker.agent_type) is not None:
+                self.runtime.add_process(worker.agent_type)
+                self._record(worker.agent_type, "replace", f"{worker.name} (pid {worker.pid}) exited")
+
+        for agent_type in self._managed_types():
+            policy = self._policy(agent_type)
+            state = self._state.setdefault(agent_type, _TypeState())
+            if now - state.last_health_check >= policy.health_interval_s:
+                state.last_health_check = now
+                await self._health_check(agent_type, policy)
+            self._scale(agent_type, policy, state, now)
+
+    async def _health_check(self, agent_type: str, policy: ScalingPolicy) -> None:
+        workers = [w for w in self.runtime.workers(agent_type) if w.pid and not w.retiring]
+        healthy = await asyncio.gather(*(self.runtime.ping(w, policy.ping_timeout_s) for w in workers))
+        for worker, ok in zip(workers, healthy):
+            if not ok and worker.alive:
+                await self.runtime.restart(worker)
+                self._record(agent_type, "restart", f"{worker.name} did not answer a ping in {policy.ping_timeout_s}s")
+
+    def _scale(self, agent_type: str, policy: ScalingPolicy, state: _TypeState, now: float) -> None:
+        load = self.runtime.load(agent_type)
+        current = load["processes"]
+        desired = math.ceil(load["in_flight"] / policy.target_in_flight) if policy.target_in_flight else current
+        slow = policy.max_latency_s is not None and load["latency_p95_s"] > policy.max_latency_s
+        if slow and load["in_flight"]:
+            desired = max(desired, current + 1)
+        desired = max(policy.min_processes, min(policy.max_processes, desired))
+        cooling = now - state.last_action < policy.cooldown_s
+
+        if current < policy.min_processes or (desired > current and not cooling):
+            state.low_since = None
+            state.last_action = now
+            for _ in range(desired - current):
+                self.runtime.add_process(agent_type)
+            reason = f"{load['in_flight']} in flight"
+            if slow:
+                reason += f", p95 {load['latency_p95_s']:.1f}s"
+            self._record(agent_type, "scale_up", reason)
+        elif desired < current:
+            state.low_since = state.low_since or now
+            if now - state.low_since >= policy.scale_down_after_s and not cooling:
+                state.low_since = None
+                state.last_action = now
+                self._retire_one(agent_type, policy, load)
+        else:
+            state.low_since = None
+
+    def _retire_one(self, agent_type: str, policy: ScalingPolicy, load: Dict[str, Any]) -> None:
+        candidates = [w for w in self.runtime.workers(agent_type) if w.alive and not w.retiring]
+        # Cheapest to drain: least work in flight, then the newest
+        worker = min(candidates, key=lambda w: (w.in_flight, -w.index))
+        worker.retiring = True  # stop routing to it now, not when the drain task first runs
+        task = asyncio.create_task(self.runtime.retire(worker, policy.drain_timeout_s))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        self._record(agent_type, "scale_down", f"{worker.name} draining, {load['in_flight']} in flight")
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-type load plus the scaling history"""
+        return {
+            "load": {t: self.runtime.load(t) for t in self._managed_types()},
+            "events": [e.__dict__ for e in self.events]
+        }
+
+
+# ---------------------------------------------------------------------------
+# Offline demo: load ramp, a crashed worker, then scale-down
+# ---------------------------------------------------------------------------
+
+
+async def _drive_load(runtime: MultiProcessAgentRuntime, concurrency: int, seconds: float) -> Dict[str, int]:
+    """Keep `concurrency` prime-counting requests outstanding for `seconds`"""
+    deadline = time.monotonic() + seconds
+    counts = {"ok": 0, "failed": 0}
+    job_ids = iter(range(10**9))
+
+    async def client() -> None:
+        while time.monotonic() < deadline:
+            # A fresh key per request lets new workers pick up work right away
+            recipient = AgentId("counter", f"job-{next(job_ids)}")
+            try:
+                await runtime.send_message(PrimeRange(0, 40_000), recipient)
+                counts["ok"] += 1
+            except (RemoteAgentError, LookupError):
+                counts["failed"] += 1
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return counts
+
+
+async def demo() -> None:
+    print("\n" + "="*80)
+    print("📈 AUTOSCALING WORKER SUPERVISOR (offline demo)")
+    print("="*80 + "\n")
+
+    runtime = MultiProcessAgentRuntime()
+    await PrimeCounterAgent.register(runtime, "counter", PrimeCounterAgent)
+    runtime.set_processes("counter", 1)
+    runtime.start()
+    supervisor = Supervisor(
+        runtime,
+        {"counter": ScalingPolicy(min_processes=1, max_processes=4, target_in_flight=2,
+                                  scale_down_after_s=3, cooldown_s=1, health_interval_s=2)},
+        interval_s=0.5
+    )
+    supervisor.start()
+    await runtime.wait_ready()
+
+    print("▶️  Phase 1: 8 concurrent clients for 6s")
+    load_task = asyncio.create_task(_drive_load(runtime, concurrency=8, seconds=6))
+    await asyncio.sleep(4)
+
+    victim = next(w for w in runtime.workers("counter") if w.pid and not w.retiring)
+    print(f"\n💥 Phase 2: killing {victim.name} (pid {victim.pid})")
+    os.kill(victim.pid, signal.SIGKILL)
+    counts = await load_task
+    print(f"\n   {counts['ok']} requests ok, {counts['failed']} failed with the killed worker")
+
+    print("\n💤 Phase 3: idle, the fleet drains back to its minimum")
+    await asyncio.sleep(10)
+
+    await supervisor.stop()
+    print("\n📊 Scaling history:")
+    started = supervisor.events[0].at if supervisor.events else 0.0
+    for event in supervisor.events:
+        print(f"   +{event.at - started:5.1f}s  {event.action:10} → {event.processes}  {event.reason}")
+    print(f"\n   Final: {runtime.load('counter')}\n")
+    await runtime.stop()
+
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        print("The demo uses SIGKILL to simulate a crash; run it on Linux or macOS")
+    else:
+        asyncio.run(demo())
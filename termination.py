@@ -0,0 +1,215 @@
+"""
+AutoGen Multi-Agent System - Smart Termination
+Composite stop conditions: final markers, convergence, token and wall-clock budgets
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Sequence
+
+from autogen_agentchat.base import TerminatedException, TerminationCondition
+from autogen_agentchat.conditions import MaxMessageTermination, TextMentionTermination, TokenUsageTermination
+from autogen_agentchat.messages import AgentEvent, ChatMessage, StopMessage, TextMessage, ToolCallExecutionEvent
+
+
+class ConvergenceTermination(TerminationCondition):
+    """Stop when consecutive agent replies are near-duplicates of each other"""
+
+    def __init__(self, similarity: float = 0.92, min_length: int = 20) -> None:
+        self._similarity = similarity
+        self._min_length = min_length
+        self._previous: Optional[str] = None
+        self._terminated = False
+
+    @property
+    def terminated(self) -> bool:
+        return self._terminated
+
+    async def __call__(self, messages: Sequence[AgentEvent | ChatMessage]) -> StopMessage | None:
+        if self._terminated:
+            raise TerminatedException("Termination condition has already been reached")
+        for message in messages:
+            if not isinstance(message, TextMessage) or message.source == "user":
+                continue
+            text = " ".join(message.content.split())
+            if len(text) < self._min_length:
+                continue
+            if self._previous is not None:
+                ratio = SequenceMatcher(None, self._previous, text).ratio()
+                if ratio >= self._similarity:
+                    self._terminated = True
+                    return StopMessage(
+                        content=f"Converged: consecutive replies are {ratio:.0%} similar",
+                        source="ConvergenceTermination"
+                    )
+            self._previous = text
+        return None
+
+    async def reset(self) -> None:
+        self._previous = None
+        self._terminated = False
+
+
+class NoNewToolOutputTermination(TerminationCondition):
+    """Stop after `patience` agent replies without any tool output not seen before"""
+
+    def __init__(self, patience: int = 4) -> None:
+        self._patience = patience
+        self._seen: set = set()
+        self._idle_replies = 0
+        self._terminated = False
+
+    @property
+    def terminated(self) -> bool:
+        return self._terminated
+
+    async def __call__(self, messages: Sequence[AgentEvent | ChatMessage]) -> StopMessage | None:
+        if self._terminated:
+            raise TerminatedException("Termination condition has already been reached")
+        for message in messages:
+            if isinstance(message, ToolCallExecutionEvent):
+                for result in message.content:
+                    digest = hashlib.sha1(result.content.encode()).hexdigest()
+                    if digest not in self._seen:
+                        self._seen.add(digest)
+                        self._idle_replies = 0
+            elif isinstance(message, TextMessage) and message.source != "user":
+                self._idle_replies += 1
+        if self._idle_replies >= self._patience:
+            self._terminated = True
+            return StopMessage(
+                content=f"No new tool output in the last {self._idle_replies} replies",
+                source="NoNewToolOutputTermination"
+            )
+        return None
+
+    async def reset(self) -> None:
+        self._seen.clear()
+        self._idle_replies = 0
+        self._terminated = False
+
+
+class WallClockTermination(TerminationCondition):
+    """Stop once a run exceeds its wall-clock budget; the clock starts on the run's first message"""
+
+    def __init__(self, seconds: float) -> None:
+        self._seconds = seconds
+        self._started: Optional[float] = None
+        self._terminated = False
+
+    @property
+    def terminated(self) -> bool:
+        return self._terminated
+
+    async def __call__(self, messages: Sequence[AgentEvent | ChatMessage]) -> StopMessage | None:
+        if self._terminated:
+            raise TerminatedException("Termination condition has already been reached")
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+        if now - self._started >= self._seconds:
+            self._terminated = True
+            return StopMessage(
+                content=f"Wall-clock budget of {self._seconds}s exceeded",
+                source="WallClockTermination"
+            )
+        return None
+
+    async def reset(self) -> None:
+        self._started = None
+        self._terminated = False
+
+
+@dataclass
+class StopRecord:
+    """Why and when a run stopped"""
+    reason: str
+    messages: int
+    tokens: int
+    elapsed_s: float
+    stopped_at: str
+
+
+class RecordedTermination(TerminationCondition):
+    """Wraps a (composite) condition and records a StopRecord every time it fires"""
+
+    def __init__(self, condition: TerminationCondition) -> None:
+        self._condition = condition
+        self._started: Optional[float] = None
+        self._messages = 0
+        self._tokens = 0
+        self.history: List[StopRecord] = []
+
+    @property
+    def terminated(self) -> bool:
+        return self._condition.terminated
+
+    @property
+    def last_record(self) -> Optional[StopRecord]:
+        return self.history[-1] if self.history else None
+
+    async def __call__(self, messages: Sequence[AgentEvent | ChatMessage]) -> StopMessage | None:
+        if self._started is None:
+            self._started = time.monotonic()
+        self._messages += len(messages)
+        for message in messages:
+            if message.models_usage is not None:
+                self._tokens += message.models_usage.prompt_tokens + message.models_usage.completion_tokens
+
+        stop_message = await self._condition(messages)
+        if stop_message is not None:
+            self.history.append(StopRecord(
+                reason=stop_message.content,
+                messages=self._messages,
+                tokens=self._tokens,
+                elapsed_s=round(time.monotonic() - self._started, 2),
+                stopped_at=datetime.now().isoformat()
+            ))
+        return stop_message
+
+    async def reset(self) -> None:
+        await self._condition.reset()
+        self._started = None
+        self._messages = 0
+        self._tokens = 0
+
+    def report(self) -> Dict[str, Any]:
+        """Latest stop record as a plain dict (empty if the run has not stopped yet)"""
+        return asdict(self.last_record) if self.last_record else {}
+
+
+def smart_termination(
+    final_text: Optional[str] = None,
+    max_messages: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    max_seconds: Optional[float] = None,
+    converge: bool = True,
+    tool_patience: Optional[int] = None
+) -> RecordedTermination:
+    """
+    Build the composite stop condition used by the teams. Whichever condition
+    fires first ends the run, so no turns are spent after a final answer.
+    """
+    conditions: List[TerminationCondition] = []
+    if final_text:
+        conditions.append(TextMentionTermination(final_text))
+    if max_messages:
+        conditions.append(MaxMessageTermination(max_messages))
+    if max_tokens:
+        conditions.append(TokenUsageTermination(max_total_token=max_tokens))
+    if max_seconds:
+        conditions.append(WallClockTermination(max_seconds))
+    if converge:
+        conditions.append(ConvergenceTermination())
+    if tool_patience:
+        conditions.append(NoNewToolOutputTermination(tool_patience))
+    if not conditions:
+        raise ValueError("smart_termination needs at least one condition")
+
+    combined = conditions[0]
+    for condition in conditions[1:]:
+        combined = combined | condition
+    return RecordedTermination(combined)
@@ -1,6 +1,9 @@
 """
 Comprehensive Tool Testing Suite
 Tests all AutoGen tools end-to-end
+
+    python test_all_tools.py            # live APIs (keys from .env)
+    python test_all_tools.py --offline  # network tools served by fake_providers.py
 """
 
 import os
@@ -16,17 +19,26 @@ from tools import (
     get_stock_data,
     get_weather,
     execute_python_code,
-    save_to_file
+    save_to_file,
+    list_files,
+    read_file,
+    grep_file
 )
 
+# Offline: the fake server's URLs and dummy keys are set before .env is read, so they win
+fake = None
+if "--offline" in sys.argv:
+    from fake_providers import FakeProviders
+    fake = FakeProviders().start()
+
 load_dotenv()
 
 print("\n" + "="*80)
-print("AUTOGEN TOOLS - COMPREHENSIVE END-TO-END TEST")
+print("AUTOGEN TOOLS - COMPREHENSIVE END-TO-END TEST" + (f" (offline, fake providers at {fake.url})" if fake else ""))
 print("="*80 + "\n")
 
 # Test 1: Serper Web Search
-print("[1/6] Testing Serper Web Search...")
+print("[1/9] Testing Serper Web Search...")
 print("-" * 80)
 result = search_web("artificial intelligence 2024")
 print(f"Status: {'✅ SUCCESS' if result.get('count', 0) > 0 else '❌ FAILED'}")
@@ -38,7 +50,7 @@ if result.get('results'):
 print()
 
 # Test 2: Brave Search
-print("[2/6] Testing Brave Search...")
+print("[2/9] Testing Brave Search...")
 print("-" * 80)
 result = brave_search("machine learning trends")
 print(f"Status: {'✅ SUCCESS' if result.get('count', 0) > 0 else '❌ FAILED'}")
@@ -50,7 +62,7 @@ if result.get('results'):
 print()
 
 # Test 3: Alpha Vantage Stock Data
-print("[3/6] Testing Alpha Vantage Stock Data...")
+print("[3/9] Testing Alpha Vantage Stock Data...")
 print("-" * 80)
 result = get_stock_data("AAPL")
 print(f"Status: {'✅ SUCCESS' if 'symbol' in result else '❌ FAILED'}")
@@ -63,7 +75,7 @@ else:
 print()
 
 # Test 4: OpenWeather
-print("[4/6] Testing OpenWeather API...")
+print("[4/9] Testing OpenWeather API...")
 print("-" * 80)
 result = get_weather("New York")
 print(f"Status: {'✅ SUCCESS' if 'city' in result else '❌ FAILED'}")
@@ -77,7 +89,7 @@ else:
 print()
 
 # Test 5: Python Code Execution
-print("[5/6] Testing Python Code Execution...")
+print("[5/9] Testing Python Code Execution...")
 print("-" * 80)
 test_code = """
 import numpy as np
@@ -96,7 +108,7 @@ else:
 print()
 
 # Test 6: File Management
-print("[6/6] Testing File Save...")
+print("[6/9] Testing File Save...")
 print("-" * 80)
 result = save_to_file("test_output.txt", "AutoGen tool test successful!")
 print(f"Status: {'✅ SUCCESS' if result.get('status') == 'success' else '❌ FAILED'}")
@@ -106,10 +118,47 @@ else:
     print(f"Error: {result.get('message')}")
 print()
 
+# Test 7: List Sandbox Files
+print("[7/9] Testing File Listing...")
+print("-" * 80)
+result = list_files()
+print(f"Status: {'✅ SUCCESS' if 'error' not in result else '❌ FAILED'}")
+print(f"Files in sandbox: {result.get('count', 0)}")
+if result.get('error'):
+    print(f"Error: {result['error']}")
+print()
+
+# Test 8: Paged File Read
+print("[8/9] Testing Paged File Read...")
+print("-" * 80)
+save_to_file("test_large.log", "".join(f"{i} {'ERROR' if i % 1000 == 0 else 'INFO'} line {i}\n" for i in range(20000)))
+result = read_file("test_large.log", length=200)
+print(f"Status: {'✅ SUCCESS' if result.get('line_count') == 20000 and result.get('length') == 200 else '❌ FAILED'}")
+if result.get('error'):
+    print(f"Error: {result['error']}")
+else:
+    print(f"Size: {result.get('size')} bytes, lines: {result.get('line_count')}, next offset: {result.get('next_offset')}")
+    print(f"Tail: {result.get('tail', [])[-1:]}")
+print()
+
+# Test 9: Grep File
+print("[9/9] Testing File Grep...")
+print("-" * 80)
+result = grep_file("test_large.log", r"ERROR")
+print(f"Status: {'✅ SUCCESS' if result.get('count') == 20 else '❌ FAILED'}")
+if result.get('error'):
+    print(f"Error: {result['error']}")
+else:
+    print(f"Matches: {result.get('count')}, first: {result['matches'][0] if result.get('matches') else 'N/A'}")
+print()
+
 # Summary
 print("="*80)
 print("TEST SUMMARY")
 print("="*80)
-print("Tools tested: 6")
+print("Tools tested: 9")
 print("Check results above for detailed status of each tool")
+if fake is not None:
+    print(f"Fake provider responses: {fake.stats}")
+    fake.stop()
 print()
@@ -0,0 +1,142 @@
+"""
+AutoGen Multi-Agent System - Parallel Tool Executor
+Runs the independent tool calls of one agent turn concurrently
+"""
+
+import asyncio
+import functools
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+from opentelemetry import trace
+from opentelemetry.trace import Status, StatusCode
+
+_tracer = trace.get_tracer("autogen_agents.tools")
+
+
+# Shared pool for the blocking tools in tools.py (HTTP calls, subprocesses)
+TOOL_THREADS = 16
+_thread_pool: Optional[ThreadPoolExecutor] = None
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """Return the process-wide bounded pool used for sync tools"""
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(max_workers=TOOL_THREADS, thread_name_prefix="tool")
+    return _thread_pool
+
+
+@dataclass
+class ToolCallTiming:
+    """Timing record for a single tool call"""
+    turn: int
+    tool: str
+    arguments: Dict[str, Any]
+    queued_ms: float
+    duration_ms: float
+    success: bool
+
+
+class ParallelToolExecutor:
+    """
+    Wraps tool functions so the calls an agent emits in one turn run concurrently.
+
+    AssistantAgent already gathers the tool calls of a turn; the wrappers make
+    sure each sync tool runs on a bounded thread pool (instead of the loop's
+    default executor) and that no more than `max_concurrency` calls from this
+    executor are in flight at once. Async tools are awaited natively.
+
+    A turn is a burst of overlapping calls: a call that starts while the
+    executor is idle opens a new turn.
+    """
+
+    def __init__(self, max_concurrency: int = 4, pool: Optional[ThreadPoolExecutor] = None) -> None:
+        self.max_concurrency = max_concurrency
+        self._pool = pool
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._turn = 0
+        self._turn_started: Dict[int, float] = {}
+        self._turn_ended: Dict[int, float] = {}
+        self.timings: List[ToolCallTiming] = []
+
+    def wrap(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Return an async wrapper with the same name, docstring and signature"""
+        is_async = inspect.iscoroutinefunction(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return await self._run(func, is_async, args, kwargs)
+
+        return wrapper
+
+    def wrap_all(self, funcs: List[Callable[..., Any]]) -> List[Callable[..., Any]]:
+        """Wrap a list of tools for an agent's `tools=` argument"""
+        return [self.wrap(func) for func in funcs]
+
+    async def _run(self, func: Callable[..., Any], is_async: bool, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        if self._in_flight == 0:
+            self._turn += 1
+            self._turn_started[self._turn] = time.perf_counter()
+        turn = self._turn
+        self._in_flight += 1
+
+        queued_at = time.perf_counter()
+        success = False
+        try:
+            async with self._semaphore:
+                started = time.perf_counter()
+                span = _tracer.start_span(f"tool {func.__name__}", attributes={
+                    "tool.name": func.__name__,
+                    "tool.turn": turn,
+                    "tool.queue_ms": round((started - queued_at) * 1000, 1)
+                })
+                try:
+                    if is_async:
+                        with trace.use_span(span, end_on_exit=False):
+                            result = await func(*args, **kwargs)
+                    else:
+                        loop = asyncio.get_running_loop()
+                        pool = self._pool or get_thread_pool()
+                        result = await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+                    success = not (isinstance(result, dict) and "error" in result)
+                    return result
+                finally:
+                    if not success:
+                        span.set_status(Status(StatusCode.ERROR))
+                    span.end()
+                    ended = time.perf_counter()
+                    self.timings.append(ToolCallTiming(
+                        turn=turn,
+                        tool=func.__name__,
+                        arguments=dict(kwargs),
+                        queued_ms=round((started - queued_at) * 1000, 1),
+                        duration_ms=round((ended - started) * 1000, 1),
+                        success=success
+                    ))
+        finally:
+            self._in_flight -= 1
+            self._turn_ended[turn] = time.perf_counter()
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per-turn report: wall time versus the serial sum of call durations"""
+        turns = []
+        for turn in sorted(self._turn_started):
+            calls = [t for t in self.timings if t.turn == turn]
+            wall_ms = (self._turn_ended.get(turn, self._turn_started[turn]) - self._turn_started[turn]) * 1000
+            serial_ms = sum(t.duration_ms for t in calls)
+            turns.append({
+                "turn": turn,
+                "calls": [asdict(t) for t in calls],
+                "wall_ms": round(wall_ms, 1),
+                "serial_ms": round(serial_ms, 1),
+                "speedup": round(serial_ms / wall_ms, 2) if wall_ms > 0 else 1.0
+            })
+        return turns
@@ -3,21 +3,41 @@ AutoGen Multi-Agent System - Tools
 Implements web search, code execution, weather, stock data, and file tools
 """
 
+import fnmatch
+import mmap
 import os
+import re
 import subprocess
 import tempfile
-import requests
-from typing import Dict, Any
-from serpapi import GoogleSearch
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+# HTTP clients are imported by the tools that use them, so importing this module stays cheap
+
+# Provider endpoints; override them to point the tools at fake_providers.py or a proxy
+API_BASES = {
+    "serpapi": ("SERPAPI_BASE_URL", "https://serpapi.com"),
+    "brave": ("BRAVE_API_BASE_URL", "https://api.search.brave.com"),
+    "alpha_vantage": ("ALPHA_VANTAGE_BASE_URL", "https://www.alphavantage.co"),
+    "openweather": ("OPENWEATHER_BASE_URL", "http://api.openweathermap.org"),
+}
+
+
+def api_base(provider: str) -> str:
+    """Base URL for `provider`, read from its environment variable at call time"""
+    variable, default = API_BASES[provider]
+    return os.getenv(variable, default).rstrip("/")
 
 
 def search_web(query: str) -> Dict[str, Any]:
     """Search the web using Google Serper API"""
     try:
+        from serpapi import GoogleSearch
         search = GoogleSearch({
             "q": query,
             "api_key": os.getenv("SERPER_API_KEY")
         })
+        search.BACKEND = api_base("serpapi")
         results = search.get_dict()
         
         # Extract top 3 results
@@ -38,6 +58,7 @@ def search_web(query: str) -> Dict[str, Any]:
 def brave_search(query: str) -> Dict[str, Any]:
     """Search the web using Brave Search API (alternative to Serper)"""
     try:
+        import requests
         api_key = os.getenv("BRAVE_SEARCH_API")
         if not api_key:
             return {"error": "Brave Search API key not configured", "results": []}
@@ -49,7 +70,7 @@ def brave_search(query: str) -> Dict[str, Any]:
         }
         
         response = requests.get(
-            f"https://api.search.brave.com/res/v1/web/search?q={query}",
+            f"{api_base('brave')}/res/v1/web/search?q={query}",
             headers=headers,
             timeout=10
         )
@@ -73,11 +94,12 @@ def brave_search(query: str) -> Dict[str, Any]:
 def get_stock_data(symbol: str) -> Dict[str, Any]:
     """Get stock market data using Alpha Vantage API"""
     try:
+        import requests
         api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
         if not api_key:
             return {"error": "Alpha Vantage API key not configured"}
         
-        url = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={api_key}"
+        url = f"{api_base('alpha_vantage')}/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={api_key}"
         response = requests.get(url, timeout=10)
         
         if response.status_code == 200:
@@ -104,11 +126,12 @@ def get_stock_data(symbol: str) -> Dict[str, Any]:
 def get_weather(city: str) -> Dict[str, Any]:
     """Get current weather data using OpenWeather API"""
     try:
+        import requests
         api_key = os.getenv("OPENWEATHER_API_KEY")
         if not api_key:
             return {"error": "OpenWeather API key not configured"}
         
-        url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
+        url = f"{api_base('openweather')}/data/2.5/weather?q={city}&appid={api_key}&units=metric"
         response = requests.get(url, timeout=10)
         
         if response.status_code == 200:
@@ -158,14 +181,136 @@ def execute_python_code(code: str) -> Dict[str, Any]:
         return {"error": str(e), "success": False}
 
 
+SANDBOX_DIR = "sandbox"
+MAX_READ_BYTES = 16_000        # largest window read_file returns
+EXACT_LINE_COUNT_BYTES = 512 * 1024 * 1024  # above this the line count is estimated
+_SCAN_CHUNK = 64 * 1024 * 1024
+
+
+def _sandbox_path(filename: str) -> str:
+    """Resolve `filename` inside the sandbox; raise ValueError if it points outside"""
+    root = os.path.realpath(SANDBOX_DIR)
+    path = os.path.realpath(os.path.join(root, filename))
+    if path != root and not path.startswith(root + os.sep):
+        raise ValueError(f"{filename!r} is outside the sandbox")
+    return path
+
+
+def _count_lines(mm: mmap.mmap, start: int = 0, end: Optional[int] = None) -> int:
+    """Newlines in mm[start:end], scanned in bounded chunks"""
+    end = len(mm) if end is None else end
+    return sum(mm[pos:min(end, pos + _SCAN_CHUNK)].count(b"\n") for pos in range(start, end, _SCAN_CHUNK))
+
+
+def _summary(mm: mmap.mmap, lines: int = 5) -> Dict[str, Any]:
+    size = len(mm)
+    if size <= EXACT_LINE_COUNT_BYTES:
+        line_count, estimated = _count_lines(mm) + (0 if mm[-1:] == b"\n" else 1), False
+    else:
+        sample = _count_lines(mm, 0, _SCAN_CHUNK)
+        line_count, estimated = int(sample * size / _SCAN_CHUNK), True
+    head = mm[:MAX_READ_BYTES // 4].decode("utf-8", errors="replace").splitlines()[:lines]
+    tail = mm[max(0, size - MAX_READ_BYTES // 4):].decode("utf-8", errors="replace").splitlines()[-lines:]
+    return {"line_count": line_count, "line_count_estimated": estimated, "head": head, "tail": tail}
+
+
+def list_files(subdir: str = "", pattern: str = "*") -> Dict[str, Any]:
+    """List files in the sandbox directory (name, size in bytes, modified time); at most 200 entries"""
+    try:
+        directory = _sandbox_path(subdir)
+        entries = []
+        total = 0
+        for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+            if not fnmatch.fnmatch(entry.name, pattern):
+                continue
+            total += 1
+            if len(entries) < 200:
+                stat = entry.stat()
+                entries.append({
+                    "name": os.path.join(subdir, entry.name) if subdir else entry.name,
+                    "is_dir": entry.is_dir(),
+                    "size": stat.st_size,
+                    "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(timespec="seconds")
+                })
+        return {"files": entries, "count": total, "truncated": total > len(entries)}
+    except Exception as e:
+        return {"error": str(e), "files": []}
+
+
+def read_file(filename: str, offset: int = 0, length: int = 4000) -> Dict[str, Any]:
+    """
+    Read a window of a sandbox file (bytes offset..offset+length, max 16000) without loading the
+    whole file. The first window also returns size, line count, head and tail. Page with next_offset.
+    """
+    try:
+        path = _sandbox_path(filename)
+        size = os.path.getsize(path)
+        length = max(1, min(length, MAX_READ_BYTES))  # a 0-byte window would page forever
+        offset = max(0, min(offset, size))
+        result: Dict[str, Any] = {"filename": filename, "size": size, "offset": offset}
+        if size == 0:
+            result.update({"content": "", "length": 0, "next_offset": None, "eof": True, "line_count": 0})
+            return result
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            window = mm[offset:offset + length]
+            end = offset + len(window)
+            result.update({
+                "content": window.decode("utf-8", errors="replace"),
+                "length": len(window),
+                "next_offset": end if end < size else None,
+                "eof": end >= size
+            })
+            if offset == 0:
+                result.update(_summary(mm))
+        return result
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def grep_file(filename: str, pattern: str, max_matches: int = 50, ignore_case: bool = False) -> Dict[str, Any]:
+    """
+    Search a sandbox file for a regular expression, streaming through it with mmap. Returns line
+    numbers, byte offsets (for read_file) and the matching lines (truncated to 300 chars).
+    """
+    try:
+        path = _sandbox_path(filename)
+        regex = re.compile(pattern.encode(), re.MULTILINE | (re.IGNORECASE if ignore_case else 0))
+        matches: List[Dict[str, Any]] = []
+        truncated = False
+        if os.path.getsize(path) == 0:
+            return {"filename": filename, "matches": [], "count": 0, "truncated": False}
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            line, counted_to = 1, 0
+            last_line_start = -1
+            for match in regex.finditer(mm):
+                start = mm.rfind(b"\n", 0, match.start()) + 1
+                if start == last_line_start:
+                    continue  # one entry per line
+                if len(matches) >= max_matches:
+                    truncated = True
+                    break
+                line += _count_lines(mm, counted_to, start)
+                counted_to = start
+                last_line_start = start
+                end = mm.find(b"\n", match.start())
+                text = mm[start:end if end != -1 else len(mm)][:300].decode("utf-8", errors="replace")
+                matches.append({"line": line, "offset": start, "text": text})
+        return {"filename": filename, "matches": matches, "count": len(matches), "truncated": truncated}
+    except re.error as e:
+        return {"error": f"Invalid pattern: {e}", "matches": []}
+    except Exception as e:
+        return {"error": str(e), "matches": []}
+
+
 def save_to_file(filename: str, content: str) -> Dict[str, str]:
     """Save content to a file in the sandbox directory"""
     try:
-        sandbox_dir = "sandbox"
-        os.makedirs(sandbox_dir, exist_ok=True)
+        os.makedirs(SANDBOX_DIR, exist_ok=True)
         
-        filepath = os.path.join(sandbox_dir, filename)
-        with open(filepath, 'w') as f:
+        # Same containment check as the read tools: no "../" or absolute paths out of the sandbox
+        path = _sandbox_path(filename)
+        filepath = os.path.join(SANDBOX_DIR, os.path.relpath(path, os.path.realpath(SANDBOX_DIR)))
+        with open(path, 'w') as f:
             f.write(content)
         
         return {"status": "success", "filepath": filepath}
@@ -0,0 +1,270 @@
+"""
+AutoGen Core - Distributed Tracing
+OpenTelemetry spans for agent messages, model calls and tool calls, exported offline
+
+Tracing is off unless enabled, and then costs one span per hop:
+
+    AGENT_TRACING=jsonl python distributed_demo.py --pipeline
+    python tracing.py                      # critical path of the latest trace
+
+- message send/handle: autogen's runtimes create these spans when given the
+  tracer provider from `setup_tracing()` (the demos pass it in);
+- model calls: every `model_registry` client call is a `chat <model>` span;
+- tool calls: tools wrapped by `traced_tool` or `ParallelToolExecutor`;
+- across processes: `process_runtime` carries the W3C `traceparent` in its
+  frames and the gRPC runtime in its message metadata, so one task is one trace.
+
+AGENT_TRACING is `jsonl` (spans appended to AGENT_TRACE_FILE, default
+traces/spans.jsonl), `console` or `off`. Exporting needs `opentelemetry-sdk`
+(requirements-full.txt); without it the API calls are no-ops.
+"""
+
+import argparse
+import contextlib
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from opentelemetry import context as otel_context
+from opentelemetry import propagate, trace
+from opentelemetry.trace import Status, StatusCode
+
+try:
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SimpleSpanProcessor, SpanExportResult
+except ImportError:  # API-only install: spans are no-ops
+    TracerProvider = None
+
+
+DEFAULT_TRACE_FILE = os.path.join("traces", "spans.jsonl")
+
+_provider: Optional[Any] = None
+_tracer = trace.get_tracer("autogen_agents")
+
+
+class JsonlSpanExporter:
+    """SpanExporter that appends one JSON object per finished span to a file"""
+
+    def __init__(self, path: str = DEFAULT_TRACE_FILE) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    @staticmethod
+    def to_dict(span: Any) -> Dict[str, Any]:
+        parent = span.parent
+        return {
+            "trace_id": f"{span.context.trace_id:032x}",
+            "span_id": f"{span.context.span_id:016x}",
+            "parent_id": f"{parent.span_id:016x}" if parent is not None else None,
+            "name": span.name,
+            "kind": span.kind.name,
+            "service": span.resource.attributes.get("service.name", ""),
+            "pid": span.resource.attributes.get("process.pid", 0),
+            "start_ns": span.start_time,
+            "end_ns": span.end_time,
+            "duration_ms": round((span.end_time - span.start_time) / 1e6, 3),
+            "status": span.status.status_code.name,
+            "attributes": {k: v if isinstance(v, (str, int, float, bool)) else list(v) for k, v in span.attributes.items()}
+        }
+
+    def export(self, spans: Sequence[Any]) -> Any:
+        lines = "".join(json.dumps(self.to_dict(span)) + "\n" for span in spans)
+        # One append per batch keeps lines from several processes intact
+        with self._lock, open(self.path, "a") as f:
+            f.write(lines)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+def setup_tracing(service_name: str = "autogen-agents", exporter: Optional[str] = None,
+                  path: Optional[str] = None) -> Optional[Any]:
+    """
+    Install a tracer provider for this process and return it (None when tracing
+    is off or the SDK is missing). Safe to call more than once; pass the result
+    to `SingleThreadedAgentRuntime(tracer_provider=...)`.
+    """
+    global _provider
+    exporter = exporter or os.getenv("AGENT_TRACING", "off")
+    if exporter == "off":
+        return None
+    if _provider is not None:
+        return _provider
+    if TracerProvider is None:
+        print("⚠️  AGENT_TRACING is set but opentelemetry-sdk is not installed; spans are not exported")
+        return None
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name, "process.pid": os.getpid()}))
+    if exporter == "console":
+        provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter()))
+    elif exporter == "jsonl":
+        path = path or os.getenv("AGENT_TRACE_FILE", DEFAULT_TRACE_FILE)
+        provider.add_span_processor(BatchSpanProcessor(JsonlSpanExporter(path), schedule_delay_millis=1000))
+    else:
+        raise ValueError(f"Unknown AGENT_TRACING exporter {exporter!r}; use jsonl, console or off")
+    trace.set_tracer_provider(provider)
+    _provider = provider
+    return provider
+
+
+def get_tracer() -> Any:
+    return _tracer
+
+
+def inject() -> Dict[str, str]:
+    """The current trace context as a carrier dict (W3C traceparent) for another process"""
+    carrier: Dict[str, str] = {}
+    propagate.inject(carrier)
+    return carrier
+
+
+@contextlib.contextmanager
+def attach(carrier: Optional[Dict[str, str]]) -> Iterator[None]:
+    """Make a propagated trace context current, so new spans join the caller's trace"""
+    if not carrier:
+        yield
+        return
+    token = otel_context.attach(propagate.extract(carrier))
+    try:
+        yield
+    finally:
+        otel_context.detach(token)
+
+
+def traced_tool(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a tool so each call is a span; keeps the signature for schema generation"""
+    name = f"tool {func.__name__}"
+
+    def finish(span: Any, result: Any) -> Any:
+        if isinstance(result, dict) and "error" in result:
+            span.set_status(Status(StatusCode.ERROR, str(result["error"])[:200]))
+        return result
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with _tracer.start_as_current_span(name, attributes={"tool.name": func.__name__}) as span:
+                return finish(span, await func(*args, **kwargs))
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with _tracer.start_as_current_span(name, attributes={"tool.name": func.__name__}) as span:
+            return finish(span, func(*args, **kwargs))
+    return wrapper
+
+
+# ---------------------------------------------------------------------------
+# Critical-path summary
+# ---------------------------------------------------------------------------
+
+
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    spans = []
+    with open(path) as f:
+        for line in f:
+            try:
+                spans.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # partial line from a killed process
+    return spans
+
+
+def critical_path(root: Dict[str, Any], children: Dict[str, List[Dict[str, Any]]], depth: int = 0) -> List[tuple]:
+    """
+    The chain of spans that determined `root`'s end time: walking back from
+    the end, take the child that finished last, then the one that finished
+    before that child started, and so on; recurse into each.
+    """
+    chain = []
+    cursor = root["end_ns"]
+    for child in sorted(children.get(root["span_id"], []), key=lambda s: s["end_ns"], reverse=True):
+        if child["end_ns"] <= cursor:
+            chain.append(child)
+            cursor = child["start_ns"]
+    path = [(root, depth, (root["end_ns"] - root["start_ns"] - sum(c["end_ns"] - c["start_ns"] for c in chain)) / 1e6)]
+    for child in reversed(chain):
+        path.extend(critical_path(child, children, depth + 1))
+    return path
+
+
+def summarize(spans: List[Dict[str, Any]], trace_id: Optional[str] = None) -> None:
+    """Print the critical path and the busiest span names of one trace"""
+    by_trace: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for span in spans:
+        by_trace[span["trace_id"]].append(span)
+    if not by_trace:
+        print("No spans recorded")
+        return
+    if trace_id is None:
+        trace_id = max(by_trace, key=lambda t: max(s["end_ns"] for s in by_trace[t]))
+    trace_spans = by_trace.get(trace_id)
+    if not trace_spans:
+        print(f"No spans for trace {trace_id}")
+        return
+
+    ids = {s["span_id"] for s in trace_spans}
+    children: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    roots = []
+    for span in trace_spans:
+        if span["parent_id"] in ids:
+            children[span["parent_id"]].append(span)
+        else:
+            roots.append(span)
+    root = max(roots, key=lambda s: s["end_ns"] - s["start_ns"])
+    total_ms = (root["end_ns"] - root["start_ns"]) / 1e6
+    services = sorted({f"{s['service']}:{s['pid']}" for s in trace_spans})
+
+    print("\n" + "="*80)
+    print(f"🔭 TRACE {trace_id}")
+    print("="*80)
+    print(f"{len(trace_spans)} spans across {len(services)} process(es), root '{root['name']}' {total_ms:.0f}ms\n")
+    print("Critical path (self time = time not covered by a child on the path):")
+    for span, depth, self_ms in critical_path(root, children):
+        where = f"[{span['service']}:{span['pid']}]"
+        print(f"   {'  ' * depth}{span['name']:<{48 - 2 * depth}} {span['duration_ms']:9.1f}ms  self {self_ms:8.1f}ms  {where}")
+
+    totals: Dict[str, List[float]] = defaultdict(list)
+    for span in trace_spans:
+        totals[span["name"]].append(span["duration_ms"])
+    print("\nBusiest span names:")
+    for name, durations in sorted(totals.items(), key=lambda kv: -sum(kv[1]))[:10]:
+        print(f"   {name:48} {len(durations):4}x  total {sum(durations):9.1f}ms  max {max(durations):8.1f}ms")
+    print()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Print the critical path of a recorded trace")
+    parser.add_argument("path", nargs="?", default=os.getenv("AGENT_TRACE_FILE", DEFAULT_TRACE_FILE))
+    parser.add_argument("--trace", help="Trace id (default: the most recent trace)")
+    parser.add_argument("--list", action="store_true", help="List recorded traces")
+    args = parser.parse_args(argv)
+
+    spans = load_spans(args.path)
+    if args.list:
+        by_trace: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for span in spans:
+            by_trace[span["trace_id"]].append(span)
+        for trace_id, items in sorted(by_trace.items(), key=lambda kv: min(s["start_ns"] for s in kv[1])):
+            started = time.strftime("%H:%M:%S", time.localtime(min(s["start_ns"] for s in items) / 1e9))
+            wall_ms = (max(s["end_ns"] for s in items) - min(s["start_ns"] for s in items)) / 1e6
+            print(f"{trace_id}  {started}  {len(items):4} spans  {wall_ms:9.1f}ms")
+        return
+    summarize(spans, args.trace)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
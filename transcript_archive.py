@@ -0,0 +1,507 @@
+"""
+AutoGen Multi-Agent System - Transcript Archive
+Every team and runtime transcript appended to compressed JSONL segments with a SQLite index
+
+    archive/
+        segments/20261019-101500-4242-0000.jsonl.gz   # gzip members, one per chunk of a run
+        index.sqlite                                   # runs, agents per run, chunk offsets
+
+A run is written in chunks of up to `chunk_messages` messages. Each chunk is one
+gzip member appended to the current segment (so `zcat` reads a whole segment),
+and the index records its byte offset, so a run or an agent's messages are read
+one chunk at a time without loading whole runs or segments into memory.
+
+    result, timing = await run_timed(team, task)              # team.run() with timestamps
+    record_result(result, task, "multi_agent", termination, **timing)
+    python transcript_archive.py list --agent Coder --since 2026-10-01
+    python transcript_archive.py show RUN_ID
+    python transcript_archive.py export out/ --format parquet
+
+AGENT_ARCHIVE=off disables recording; AGENT_ARCHIVE_DIR moves the archive
+(default ./archive). Export writes Parquet when pyarrow is installed and one
+gzip file per column otherwise.
+"""
+
+import argparse
+import dataclasses
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+DEFAULT_ARCHIVE_DIR = "archive"
+
+# Columns of a message record, in export order
+COLUMNS = ("run_id", "seq", "ts", "agent", "recipient", "type", "content", "is_tool", "prompt_tokens", "completion_tokens")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY, entry_point TEXT, task TEXT, task_hash TEXT,
+    started REAL, ended REAL, stop_reason TEXT, messages INTEGER DEFAULT 0,
+    tokens INTEGER DEFAULT 0, extra TEXT
+);
+CREATE TABLE IF NOT EXISTS run_agents (
+    run_id TEXT, agent TEXT, messages INTEGER, PRIMARY KEY (run_id, agent)
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    run_id TEXT, seq INTEGER, segment TEXT, offset INTEGER, length INTEGER,
+    first_ts REAL, last_ts REAL, count INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started);
+CREATE INDEX IF NOT EXISTS runs_task_hash ON runs (task_hash);
+CREATE INDEX IF NOT EXISTS run_agents_agent ON run_agents (agent);
+CREATE INDEX IF NOT EXISTS chunks_run ON chunks (run_id, seq);
+"""
+
+
+def task_hash(task: str) -> str:
+    return hashlib.sha1(task.strip().encode()).hexdigest()[:16]
+
+
+def _jsonable(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return value
+
+
+def _content(value: Any) -> str:
+    """Message content as text; structured content (tool calls, dataclasses) as JSON"""
+    return value if isinstance(value, str) else json.dumps(_jsonable(value), default=str)
+
+
+def message_record(message: Any, **fields: Any) -> Dict[str, Any]:
+    """Archive record for an autogen chat message/event, or a runtime message with `agent` given"""
+    usage = getattr(message, "models_usage", None)
+    type_name = type(message).__name__
+    record = {
+        "ts": time.time(),
+        "agent": str(getattr(message, "source", "")),
+        "recipient": "",
+        "type": type_name,
+        "content": _content(getattr(message, "content", message)),
+        "is_tool": type_name.startswith("ToolCall"),
+        "prompt_tokens": usage.prompt_tokens if usage is not None else 0,
+        "completion_tokens": usage.completion_tokens if usage is not None else 0,
+    }
+    record.update(fields)
+    return record
+
+
+class RunWriter:
+    """Appends one run's messages; buffered up to a chunk, then written and indexed"""
+
+    def __init__(self, archive: "Archive", run_id: str) -> None:
+        self.archive = archive
+        self.run_id = run_id
+        self.messages = 0
+        self.tokens = 0
+        self.agents: Dict[str, int] = {}
+        self._buffer: List[Dict[str, Any]] = []
+        self._chunks = 0
+        self._closed = False
+
+    def append(self, message: Any, **fields: Any) -> None:
+        """Add an autogen message (or a ready record dict) to the run"""
+        record = dict(message, **fields) if isinstance(message, dict) else message_record(message, **fields)
+        record["run_id"] = self.run_id
+        record["seq"] = self.messages
+        self.messages += 1
+        self.tokens += record.get("prompt_tokens", 0) + record.get("completion_tokens", 0)
+        agent = record.get("agent", "")
+        self.agents[agent] = self.agents.get(agent, 0) + 1
+        self._buffer.append(record)
+        if len(self._buffer) >= self.archive.chunk_messages:
+            self.flush()
+
+    def extend(self, messages: Iterable[Any]) -> None:
+        for message in messages:
+            self.append(message)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self.archive._write_chunk(self.run_id, self._chunks, self._buffer)
+            self._chunks += 1
+            self._buffer = []
+
+    def close(self, stop_reason: Optional[str] = None, ended: Optional[float] = None, **extra: Any) -> None:
+        """Write the last chunk and complete the run's index entry (`ended` defaults to now)"""
+        if self._closed:
+            return
+        self._closed = True
+        self.flush()
+        self.archive._finish_run(self, stop_reason, extra, ended)
+
+    def __enter__(self) -> "RunWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.close(stop_reason=f"error: {exc_type.__name__}: {exc}" if exc_type else "complete")
+
+
+class Archive:
+    """Compressed, append-only transcript store with an index by run, agent, time and task"""
+
+    def __init__(self, root: str = DEFAULT_ARCHIVE_DIR, chunk_messages: int = 1000,
+                 segment_bytes: int = 64 * 1024 * 1024) -> None:
+        self.root = root
+        self.chunk_messages = chunk_messages
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._segment: Optional[str] = None
+        self._segment_count = 0
+        os.makedirs(os.path.join(root, "segments"), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(root, "index.sqlite"), timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    # -- writing ------------------------------------------------------------
+
+    def open_run(self, task: str, entry_point: str, run_id: Optional[str] = None,
+                 started: Optional[float] = None) -> RunWriter:
+        """Start a run; `started` (epoch seconds) defaults to now"""
+        run_id = run_id or uuid.uuid4().hex[:16]
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO runs (run_id, entry_point, task, task_hash, started) VALUES (?, ?, ?, ?, ?)",
+                (run_id, entry_point, task, task_hash(task), started if started is not None else time.time())
+            )
+        return RunWriter(self, run_id)
+
+    def _segment_path(self) -> str:
+        """This process's current segment, rotated by size"""
+        if self._segment is None or os.path.getsize(os.path.join(self.root, "segments", self._segment)) >= self.segment_bytes:
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            self._segment = f"{stamp}-{os.getpid()}-{self._segment_count:04}.jsonl.gz"
+            self._segment_count += 1
+            open(os.path.join(self.root, "segments", self._segment), "ab").close()
+        return self._segment
+
+    def _write_chunk(self, run_id: str, seq: int, records: List[Dict[str, Any]]) -> None:
+        body = "".join(json.dumps(r, default=str) + "\n" for r in records).encode()
+        member = gzip.compress(body, compresslevel=6)
+        with self._lock:
+            segment = self._segment_path()
+            with open(os.path.join(self.root, "segments", segment), "ab") as f:
+                offset = f.tell()
+                f.write(member)
+            with self._db:
+                self._db.execute(
+                    "INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, seq, segment, offset, len(member), records[0]["ts"], records[-1]["ts"], len(records))
+                )
+
+    def _finish_run(self, run: RunWriter, stop_reason: Optional[str], extra: Dict[str, Any],
+                    ended: Optional[float] = None) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE runs SET ended = ?, stop_reason = ?, messages = ?, tokens = ?, extra = ? WHERE run_id = ?",
+                (ended if ended is not None else time.time(), stop_reason, run.messages, run.tokens, json.dumps(extra, default=str), run.run_id)
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO run_agents VALUES (?, ?, ?)",
+                [(run.run_id, agent, count) for agent, count in run.agents.items()]
+            )
+
+    # -- reading ------------------------------------------------------------
+
+    @staticmethod
+    def _filters(agent: Optional[str], since: Optional[float], until: Optional[float],
+                 task_hash_: Optional[str], entry_point: Optional[str]) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if agent:
+            clauses.append("r.run_id IN (SELECT run_id FROM run_agents WHERE agent = ?)")
+            params.append(agent)
+        if since is not None:
+            clauses.append("r.started >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("r.started < ?")
+            params.append(until)
+        if task_hash_:
+            clauses.append("r.task_hash = ?")
+            params.append(task_hash_)
+        if entry_point:
+            clauses.append("r.entry_point = ?")
+            params.append(entry_point)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def runs(self, agent: Optional[str] = None, since: Optional[float] = None, until: Optional[float] = None,
+             task_hash: Optional[str] = None, entry_point: Optional[str] = None,
+             limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Index entries of matching runs, newest first"""
+        where, params = self._filters(agent, since, until, task_hash, entry_point)
+        query = f"SELECT * FROM runs r{where} ORDER BY r.started DESC"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        with self._lock:
+            cursor = self._db.execute(query, params)
+            names = [c[0] for c in cursor.description]
+            rows = cursor.fetchall()
+        return [dict(zip(names, row)) for row in rows]
+
+    def _read_chunk(self, segment: str, offset: int, length: int) -> Iterator[Dict[str, Any]]:
+        with open(os.path.join(self.root, "segments", segment), "rb") as f:
+            f.seek(offset)
+            data = gzip.decompress(f.read(length))
+        for line in data.splitlines():
+            yield json.loads(line)
+
+    def iter_messages(self, run_id: Optional[str] = None, agent: Optional[str] = None,
+                      since: Optional[float] = None, until: Optional[float] = None,
+                      task_hash: Optional[str] = None, entry_point: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Stream matching message records, one chunk in memory at a time, oldest run first"""
+        where, params = self._filters(agent, since, until, task_hash, entry_point)
+        if run_id:
+            where += (" AND " if where else " WHERE ") + "r.run_id = ?"
+            params.append(run_id)
+        with self._lock:
+            chunks = self._db.execute(
+                f"SELECT c.segment, c.offset, c.length FROM chunks c JOIN runs r ON r.run_id = c.run_id{where} "
+                "ORDER BY r.started, c.run_id, c.seq",
+                params
+            ).fetchall()
+        for segment, offset, length in chunks:
+            for record in self._read_chunk(segment, offset, length):
+                if agent and record.get("agent") != agent:
+                    continue
+                yield record
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            runs, messages, tokens = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(messages), 0), COALESCE(SUM(tokens), 0) FROM runs"
+            ).fetchone()
+            agents = self._db.execute("SELECT COUNT(DISTINCT agent) FROM run_agents").fetchone()[0]
+        segments = os.listdir(os.path.join(self.root, "segments"))
+        size = sum(os.path.getsize(os.path.join(self.root, "segments", s)) for s in segments)
+        return {"runs": runs, "messages": messages, "tokens": tokens, "agents": agents,
+                "segments": len(segments), "compressed_bytes": size}
+
+    # -- export -------------------------------------------------------------
+
+    def export_columnar(self, out: str, fmt: str = "auto", batch_rows: int = 50_000, **filters: Any) -> Dict[str, Any]:
+        """
+        Write matching messages column-wise: `out/messages.parquet` with pyarrow,
+        else `out/<column>.jsonl.gz` (one JSON value per line) plus `out/schema.json`.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:  # fall back to per-column gzip files
+            pa = None
+        if fmt == "auto":
+            fmt = "parquet" if pa is not None else "columns"
+        if fmt == "parquet" and pa is None:
+            raise RuntimeError("Parquet export needs pyarrow; use --format columns")
+        os.makedirs(out, exist_ok=True)
+        rows = 0
+        batch: Dict[str, List[Any]] = {c: [] for c in COLUMNS}
+
+        if fmt == "parquet":
+            path = os.path.join(out, "messages.parquet")
+            writer = None
+            try:
+                for record in self.iter_messages(**filters):
+                    for column in COLUMNS:
+                        batch[column].append(record.get(column))
+                    rows += 1
+                    if len(batch["seq"]) >= batch_rows:
+                        table = pa.table(batch)
+                        writer = writer or pq.ParquetWriter(path, table.schema, compression="zstd")
+                        writer.write_table(table)
+                        batch = {c: [] for c in COLUMNS}
+                if batch["seq"] or writer is None:
+                    table = pa.table(batch)
+                    writer = writer or pq.ParquetWriter(path, table.schema, compression="zstd")
+                    writer.write_table(table)
+            finally:
+                if writer is not None:
+                    writer.close()
+            return {"format": "parquet", "path": path, "rows": rows}
+
+        files = {c: gzip.open(os.path.join(out, f"{c}.jsonl.gz"), "wt") for c in COLUMNS}
+        try:
+            for record in self.iter_messages(**filters):
+                for column in COLUMNS:
+                    files[column].write(json.dumps(record.get(column)) + "\n")
+                rows += 1
+        finally:
+            for f in files.values():
+                f.close()
+        with open(os.path.join(out, "schema.json"), "w") as f:
+            json.dump({"columns": list(COLUMNS), "rows": rows}, f, indent=2)
+        return {"format": "columns", "path": out, "rows": rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class RuntimeTranscript:
+    """
+    Intervention handler that archives every message an agent runtime delivers:
+    `SingleThreadedAgentRuntime(intervention_handlers=[RuntimeTranscript(run)])`.
+    """
+
+    def __init__(self, run: RunWriter) -> None:
+        self.run = run
+
+    def _append(self, message: Any, sender: Any, recipient: Any, kind: str) -> None:
+        self.run.append(
+            message,
+            agent=str(sender.type) if sender is not None else "client",
+            recipient=str(recipient.type) if recipient is not None else "",
+            type=f"{kind}:{type(message).__name__}",
+            content=_content(message)
+        )
+
+    async def on_send(self, message: Any, *, message_context: Any, recipient: Any) -> Any:
+        self._append(message, message_context.sender, recipient, "send")
+        return message
+
+    async def on_publish(self, message: Any, *, message_context: Any) -> Any:
+        self._append(message, message_context.sender, message_context.topic_id, "publish")
+        return message
+
+    async def on_response(self, message: Any, *, sender: Any, recipient: Any) -> Any:
+        self._append(message, sender, recipient, "response")
+        return message
+
+    def close(self, stop_reason: str = "complete", **extra: Any) -> None:
+        self.run.close(stop_reason=stop_reason, **extra)
+
+
+_archive: Optional[Archive] = None
+
+
+def get_archive() -> Optional[Archive]:
+    """The process-wide archive, or None when AGENT_ARCHIVE=off"""
+    global _archive
+    if os.getenv("AGENT_ARCHIVE", "on") == "off":
+        return None
+    if _archive is None:
+        _archive = Archive(os.getenv("AGENT_ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR))
+    return _archive
+
+
+def open_runtime_transcript(task: str, entry_point: str) -> Optional[RuntimeTranscript]:
+    """An intervention handler recording a runtime session as one run, or None when archiving is off"""
+    archive = get_archive()
+    return RuntimeTranscript(archive.open_run(task, entry_point)) if archive is not None else None
+
+
+async def run_timed(team: Any, task: str) -> Tuple[Any, Dict[str, Any]]:
+    """team.run(task) through run_stream, timing the run and each message as it arrives
+
+    Returns the TaskResult and the `started`/`ended`/`message_times` keywords for record_result.
+    """
+    from autogen_agentchat.base import TaskResult
+
+    started, message_times, result = time.time(), [], None
+    async for item in team.run_stream(task=task):
+        if isinstance(item, TaskResult):
+            result = item
+        else:
+            message_times.append(time.time())
+    return result, {"started": started, "ended": time.time(), "message_times": message_times}
+
+
+def record_result(result: Any, task: str, entry_point: str, termination: Any = None,
+                  started: Optional[float] = None, ended: Optional[float] = None,
+                  message_times: Optional[Sequence[float]] = None, **extra: Any) -> Optional[str]:
+    """Archive a team's TaskResult with its stop reason and timings; returns the run id
+
+    `started`/`ended` are when the run itself began and finished, and `message_times[i]` when
+    `result.messages[i]` was produced (all epoch seconds, as from run_timed). Archiving usually
+    happens after the run, so without them the run would be stamped with the time of recording.
+    """
+    archive = get_archive()
+    if archive is None:
+        return None
+    run = archive.open_run(task, entry_point, started=started)
+    times = list(message_times or [])
+    for i, message in enumerate(result.messages):
+        # A message without its own time gets the previous one's (or the run's start)
+        ts = times[i] if i < len(times) else (times[-1] if times else started)
+        run.append(message, **({"ts": ts} if ts is not None else {}))
+    if termination is not None and hasattr(termination, "report"):
+        extra["stop"] = termination.report()
+    run.close(stop_reason=result.stop_reason, ended=ended, **extra)
+    return run.run_id
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Query and export the transcript archive")
+    parser.add_argument("--dir", default=os.getenv("AGENT_ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR))
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("list", "export"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("--agent")
+        cmd.add_argument("--since", help="ISO date/time")
+        cmd.add_argument("--until", help="ISO date/time")
+        cmd.add_argument("--task", help="Runs of exactly this task (matched by hash)")
+        cmd.add_argument("--entry-point")
+        if name == "list":
+            cmd.add_argument("--limit", type=int, default=20)
+        else:
+            cmd.add_argument("out")
+            cmd.add_argument("--format", choices=("auto", "parquet", "columns"), default="auto")
+    show = sub.add_parser("show")
+    show.add_argument("run_id")
+    show.add_argument("--chars", type=int, default=300)
+    sub.add_parser("stats")
+    args = parser.parse_args(argv)
+
+    archive = Archive(args.dir)
+    if args.command == "stats":
+        for key, value in archive.stats().items():
+            print(f"{key:17} {value}")
+        return
+    if args.command == "show":
+        for record in archive.iter_messages(run_id=args.run_id):
+            content = record["content"]
+            content = content[:args.chars] + "..." if len(content) > args.chars else content
+            print(f"[{record['seq']}] {record['agent']} ({record['type']}): {content}\n")
+        return
+
+    filters = {
+        "agent": args.agent,
+        "since": _timestamp(args.since),
+        "until": _timestamp(args.until),
+        "task_hash": task_hash(args.task) if args.task else None,
+        "entry_point": args.entry_point,
+    }
+    if args.command == "list":
+        for run in archive.runs(limit=args.limit, **filters):
+            started = datetime.fromtimestamp(run["started"]).strftime("%Y-%m-%d %H:%M:%S")
+            task = run["task"][:60] + "..." if len(run["task"]) > 60 else run["task"]
+            print(f"{run['run_id']}  {started}  {run['entry_point']:16} {run['messages']:5} msgs "
+                  f"{run['tokens']:7} tok  {run['stop_reason'] or '(running)'}  {task}")
+        return
+    result = archive.export_columnar(args.out, args.format, **filters)
+    print(f"✅ Exported {result['rows']} messages ({result['format']}) to {result['path']}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,230 @@
+"""
+AutoGen Multi-Agent System - Transcript Store
+Per-session message bodies under a memory cap; older bodies spill to disk and are read back by handle
+
+    store = open_store()
+    entry = store.append("Coder", "TextMessage", content)
+    event = store.event(entry, content)        # preview + handle (session, id) for the client
+    for chunk in store.iter_body(entry.id): ...  # full body, from memory or disk
+
+A session's resident bodies are counted in bytes (sys.getsizeof). When they
+exceed the cap (AGENT_TRANSCRIPT_CAP_MB, default 4), the oldest are appended
+to a spill file under `cache/transcripts/` and dropped from memory. A finished
+session spills everything, so it holds only metadata while its messages stay
+available for reload. The last AGENT_TRANSCRIPT_SESSIONS (default 64) sessions
+are kept; older finished ones and their spill files are removed (sessions
+still streaming are never evicted, so the count can run over while they last).
+"""
+
+import atexit
+import os
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_SPILL_DIR = os.path.join("cache", "transcripts")
+DEFAULT_CAP_BYTES = int(float(os.getenv("AGENT_TRANSCRIPT_CAP_MB", "4")) * 2**20)
+RETAINED_SESSIONS = int(os.getenv("AGENT_TRANSCRIPT_SESSIONS", "64"))
+PREVIEW_CHARS = 1000
+READ_CHUNK = 64 * 1024
+
+
+@dataclass
+class Entry:
+    """Metadata of one message; the body is resident or at `offset` in the spill file"""
+    id: int
+    agent: str
+    type: str
+    is_tool: bool
+    timestamp: str
+    length: int                 # UTF-8 bytes of the body
+    body: Optional[str] = None
+    offset: int = -1
+
+    @property
+    def spilled(self) -> bool:
+        return self.body is None
+
+
+class TranscriptStore:
+    """One session's messages with resident bodies capped at `cap_bytes`"""
+
+    def __init__(self, session_id: Optional[str] = None, cap_bytes: int = DEFAULT_CAP_BYTES,
+                 spill_dir: str = DEFAULT_SPILL_DIR) -> None:
+        self.session_id = session_id or uuid.uuid4().hex[:12]
+        self.cap_bytes = cap_bytes
+        self.path = os.path.join(spill_dir, f"{self.session_id}.spill")
+        self.entries: List[Entry] = []
+        self.resident_bytes = 0
+        self.peak_resident_bytes = 0
+        self.spilled_bytes = 0
+        self.finished = False
+        self._spill_file = None
+        self._oldest_resident = 0  # entries before this index are all spilled
+        self._lock = threading.Lock()
+
+    def append(self, agent: str, type_name: str, content: str, is_tool: bool = False) -> Entry:
+        """Add a message body; spills the oldest bodies if the session goes over its cap"""
+        with self._lock:
+            entry = Entry(
+                id=len(self.entries), agent=agent, type=type_name, is_tool=is_tool,
+                timestamp=datetime.now().isoformat(), length=len(content.encode()), body=content
+            )
+            self.entries.append(entry)
+            self.resident_bytes += sys.getsizeof(content)
+            self._enforce_cap()
+            self.peak_resident_bytes = max(self.peak_resident_bytes, self.resident_bytes)
+            return entry
+
+    def append_message(self, message: Any) -> Entry:
+        """Add an autogen chat message or event"""
+        content = str(message.content) if message.content else ""
+        # Same test the dashboard has always used to badge tool traffic
+        is_tool = "FunctionCall" in content or "FunctionExecution" in content
+        return self.append(str(message.source), type(message).__name__, content, is_tool)
+
+    def _enforce_cap(self) -> None:
+        while self.resident_bytes > self.cap_bytes and self._oldest_resident < len(self.entries):
+            self._spill(self.entries[self._oldest_resident])
+            self._oldest_resident += 1
+
+    def _spill(self, entry: Entry) -> None:
+        if entry.body is None:
+            return
+        if self._spill_file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._spill_file = open(self.path, "ab")
+        entry.offset = self._spill_file.tell()
+        self._spill_file.write(entry.body.encode())
+        self._spill_file.flush()
+        self.resident_bytes -= sys.getsizeof(entry.body)
+        self.spilled_bytes += entry.length
+        entry.body = None
+
+    def event(self, entry: Entry, content: Optional[str] = None) -> Dict[str, Any]:
+        """SSE payload for `entry`: a preview of the body and the handle to fetch the rest"""
+        if content is None:
+            content = self.body(entry.id, limit=PREVIEW_CHARS * 4)
+        return {
+            "type": "message",
+            "session": self.session_id,
+            "id": entry.id,
+            "agent": entry.agent,
+            "content": content[:PREVIEW_CHARS],
+            "truncated": len(content) > PREVIEW_CHARS or entry.length > len(content.encode()),
+            "size": entry.length,
+            "is_tool": entry.is_tool,
+            "timestamp": entry.timestamp
+        }
+
+    def iter_body(self, message_id: int, chunk_size: int = READ_CHUNK) -> Iterator[bytes]:
+        """The full body of message `message_id` as UTF-8 chunks, read from disk if spilled"""
+        entry = self.entries[message_id]
+        body = entry.body
+        if body is not None:
+            data = body.encode()
+            for start in range(0, len(data), chunk_size):
+                yield data[start:start + chunk_size]
+            return
+        with open(self.path, "rb") as f:
+            f.seek(entry.offset)
+            remaining = entry.length
+            while remaining > 0:
+                data = f.read(min(chunk_size, remaining))
+                if not data:
+                    return
+                remaining -= len(data)
+                yield data
+
+    def body(self, message_id: int, limit: Optional[int] = None) -> str:
+        """The body of message `message_id` (its first `limit` bytes if given)"""
+        data = bytearray()
+        for chunk in self.iter_body(message_id):
+            data += chunk
+            if limit is not None and len(data) >= limit:
+                return bytes(data[:limit]).decode(errors="ignore")
+        return data.decode()
+
+    def finish(self) -> None:
+        """Spill every resident body; the session keeps only metadata in memory"""
+        with self._lock:
+            for entry in self.entries[self._oldest_resident:]:
+                self._spill(entry)
+            self._oldest_resident = len(self.entries)
+            self.finished = True
+            if self._spill_file is not None:
+                self._spill_file.close()
+                self._spill_file = None
+
+    def close(self) -> None:
+        """Finish and delete the spill file"""
+        self.finish()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "session": self.session_id,
+            "messages": len(self.entries),
+            "spilled_messages": sum(1 for e in self.entries if e.spilled),
+            "resident_bytes": self.resident_bytes,
+            "peak_resident_bytes": self.peak_resident_bytes,
+            "spilled_bytes": self.spilled_bytes,
+            "cap_bytes": self.cap_bytes,
+            "finished": self.finished
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Stats plus each message's metadata (no bodies)"""
+        return {
+            **self.stats(),
+            "entries": [
+                {"id": e.id, "agent": e.agent, "type": e.type, "is_tool": e.is_tool,
+                 "timestamp": e.timestamp, "size": e.length, "spilled": e.spilled}
+                for e in self.entries
+            ]
+        }
+
+
+_stores: "OrderedDict[str, TranscriptStore]" = OrderedDict()
+_stores_lock = threading.Lock()
+
+
+def open_store(session_id: Optional[str] = None, cap_bytes: Optional[int] = None) -> TranscriptStore:
+    """Create and register a session's store; the oldest finished sessions beyond RETAINED_SESSIONS are removed"""
+    store = TranscriptStore(session_id, cap_bytes if cap_bytes is not None else DEFAULT_CAP_BYTES,
+                            os.getenv("AGENT_TRANSCRIPT_DIR", DEFAULT_SPILL_DIR))
+    with _stores_lock:
+        _stores[store.session_id] = store
+        # Only finished sessions are evicted: a streaming one still appends to its spill file
+        excess = len(_stores) - RETAINED_SESSIONS
+        for old in [s for s in _stores.values() if s.finished][:max(0, excess)]:
+            del _stores[old.session_id]
+            old.close()
+    return store
+
+
+def get_store(session_id: str) -> Optional[TranscriptStore]:
+    return _stores.get(session_id)
+
+
+def memory_report() -> Dict[str, Any]:
+    """Resident and spilled bytes across all retained sessions"""
+    stores = list(_stores.values())
+    return {
+        "sessions": len(stores),
+        "active": sum(1 for s in stores if not s.finished),
+        "resident_bytes": sum(s.resident_bytes for s in stores),
+        "spilled_bytes": sum(s.spilled_bytes for s in stores)
+    }
+
+
+@atexit.register
+def _remove_spill_files() -> None:
+    # The transcript archive is the durable record; spill files only serve live sessions
+    for store in list(_stores.values()):
+        store.close()
@@ -0,0 +1,381 @@
+"""
+AutoGen Multi-Agent System - Vector Memory
+Offline semantic recall of prior research and code: hashing embeddings in a memory-mapped NumPy index
+
+    memory = get_memory()
+    memory.add(["Qubits are two-state quantum systems ..."], kind="answer", task="What is a qubit?")
+    memory.search("superposition of quantum bits", k=5)
+
+- Embeddings: signed feature hashing of words and word bigrams with sublinear
+  term frequency, L2-normalized. No model and no network, so writing and
+  recalling cost microseconds to milliseconds.
+- Index: one float32 matrix in `vectors.f32`, memory-mapped and grown in place;
+  metadata in SQLite. Exact search is a batched matrix product with a top-k
+  partition per block, so the corpus never has to fit in RAM at once.
+- Approximate mode (IVF): spherical k-means centroids; a query scans only the
+  `nprobe` nearest lists. Used automatically above APPROX_THRESHOLD vectors.
+
+autogen-agentchat 0.4.0 has no agent memory interface, so the teams use it as a
+tool (`recall_memory`) and store each run's answer and code via `remember_run`.
+Run `python vector_memory.py` for query latency against corpus size.
+"""
+
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_MEMORY_DIR = os.path.join("cache", "vector_memory")
+APPROX_THRESHOLD = 50_000   # vectors; below this exact search is fast enough
+SEARCH_BLOCK_ROWS = 65_536  # rows of the memmap multiplied at once
+
+
+class HashingEmbedder:
+    """Signed feature hashing of words and bigrams into `dim` dimensions"""
+
+    def __init__(self, dim: int = 512) -> None:
+        self.dim = dim
+
+    def features(self, text: str) -> Counter:
+        words = re.findall(r"\w+", text.lower())
+        return Counter(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, count in self.features(text).items():
+                h = zlib.crc32(feature.encode())
+                sign = 1.0 if h & 0x80000000 else -1.0
+                matrix[row, h % self.dim] += sign * (1.0 + math.log(count))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest scores along the last axis, best first"""
+    k = min(k, scores.shape[-1])
+    part = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=-1), axis=-1)
+    return np.take_along_axis(part, order, axis=-1)
+
+
+class VectorMemory:
+    """Append-only vector store with exact (blocked) and IVF approximate cosine top-k"""
+
+    def __init__(self, root: str = DEFAULT_MEMORY_DIR, dim: int = 512) -> None:
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(root, "items.sqlite"), timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS items (row INTEGER PRIMARY KEY, kind TEXT, source TEXT, task TEXT, text TEXT, created REAL);"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);"
+        )
+        stored = self._db.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+        self.dim = int(stored[0]) if stored else dim
+        if not stored:
+            with self._db:
+                self._db.execute("INSERT INTO meta VALUES ('dim', ?)", (str(self.dim),))
+        self.embedder = HashingEmbedder(self.dim)
+        self.count = self._db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM items").fetchone()[0]
+        self._path = os.path.join(root, "vectors.f32")
+        self._vectors: Optional[np.memmap] = None
+        self._capacity = 0
+        self._map(max(self.count, 1024))
+        self._ivf = self._load_ivf()
+
+    # -- storage ------------------------------------------------------------
+
+    def _map(self, rows: int) -> None:
+        """(Re)map the vector file with room for at least `rows` rows"""
+        if rows <= self._capacity:
+            return
+        capacity = max(rows, self._capacity * 2)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._path, "ab") as f:
+            if f.tell() < capacity * self.dim * 4:
+                f.truncate(capacity * self.dim * 4)
+        self._vectors = np.memmap(self._path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self._capacity = capacity
+
+    def add(self, texts: Sequence[str], kind: str = "note", source: str = "", task: str = "") -> List[int]:
+        """Embed and store texts; returns their row ids"""
+        texts = [t for t in texts if t and t.strip()]
+        if not texts:
+            return []
+        return self.add_vectors(self.embedder.embed(texts), [
+            {"kind": kind, "source": source, "task": task, "text": t} for t in texts
+        ])
+
+    def add_vectors(self, vectors: np.ndarray, items: Sequence[Dict[str, Any]]) -> List[int]:
+        """Store precomputed unit vectors with their metadata"""
+        with self._lock:
+            # Other processes append to the same directory: rows are allocated inside a write
+            # transaction, and the vectors are written before it commits, so a row is only ever
+            # visible (and never overwritten) once its vector is in place.
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                start = self._db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM items").fetchone()[0]
+                now = time.time()
+                self._db.executemany(
+                    "INSERT INTO items VALUES (?, ?, ?, ?, ?, ?)",
+                    [(start + i, it.get("kind", "note"), it.get("source", ""), it.get("task", ""), it.get("text", ""), now)
+                     for i, it in enumerate(items)]
+                )
+                self._map(start + len(vectors))
+                self._vectors[start:start + len(vectors)] = vectors
+                self._vectors.flush()
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+            self.count = start + len(vectors)
+            return list(range(start, self.count))
+
+    def refresh(self) -> int:
+        """Pick up rows added by other processes; returns the row count"""
+        with self._lock:
+            self.count = self._db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM items").fetchone()[0]
+            self._map(self.count)
+            return self.count
+
+    def flush(self) -> None:
+        if self._vectors is not None:
+            self._vectors.flush()
+
+    # -- approximate index --------------------------------------------------
+
+    def _load_ivf(self) -> Optional[Dict[str, np.ndarray]]:
+        path = os.path.join(self.root, "ivf.npz")
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            ivf = {name: data[name] for name in data.files}
+        return ivf if ivf["centroids"].shape[1] == self.dim else None
+
+    def build_ivf(self, nlist: Optional[int] = None, iterations: int = 8, sample: int = 50_000, seed: int = 0) -> None:
+        """Cluster the vectors into `nlist` lists (spherical k-means on a sample)"""
+        n = self.refresh()
+        if n == 0:
+            return
+        nlist = nlist or int(min(4096, max(16, math.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        rows = np.sort(rng.choice(n, size=min(n, sample), replace=False))
+        train = np.asarray(self._vectors[rows])
+        centroids = train[rng.choice(len(train), size=min(nlist, len(train)), replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(train @ centroids.T, axis=1)
+            for c in range(len(centroids)):
+                members = train[assign == c]
+                if len(members):
+                    center = members.sum(axis=0)
+                    centroids[c] = center / max(np.linalg.norm(center), 1e-12)
+
+        assign = np.empty(n, dtype=np.int32)
+        for start in range(0, n, SEARCH_BLOCK_ROWS):
+            block = np.asarray(self._vectors[start:min(n, start + SEARCH_BLOCK_ROWS)])
+            assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable").astype(np.int64)
+        offsets = np.searchsorted(assign[order], np.arange(len(centroids) + 1)).astype(np.int64)
+        self._ivf = {"centroids": centroids, "order": order, "offsets": offsets, "rows": np.array(n)}
+        np.savez(os.path.join(self.root, "ivf.npz"), **self._ivf)
+
+    def _ivf_candidates(self, query: np.ndarray, nprobe: int, n: int) -> np.ndarray:
+        ivf = self._ivf
+        probes = _top_k(ivf["centroids"] @ query, nprobe)
+        lists = [ivf["order"][ivf["offsets"][c]:ivf["offsets"][c + 1]] for c in probes]
+        # Vectors added since the index was built are scanned exactly
+        lists.append(np.arange(int(ivf["rows"]), n))
+        return np.sort(np.concatenate(lists))
+
+    # -- search -------------------------------------------------------------
+
+    def search_vectors(self, queries: np.ndarray, k: int = 5, approximate: Optional[bool] = None,
+                       nprobe: int = 8) -> List[List[Tuple[int, float]]]:
+        """Top-k (row, cosine) per query vector; exact blocked scan or IVF"""
+        self.refresh()
+        with self._lock:  # a concurrent add may remap the file; search the rows stored so far
+            vectors, n = self._vectors, self.count
+        if n == 0:
+            return [[] for _ in range(len(queries))]
+        if approximate is None:
+            approximate = n >= APPROX_THRESHOLD
+        if approximate:
+            if self._ivf is None or int(self._ivf["rows"]) < 0.8 * n:
+                self.build_ivf()
+            results = []
+            for query in queries:
+                rows = self._ivf_candidates(query, nprobe, n)
+                scores = np.asarray(vectors[rows]) @ query
+                best = _top_k(scores, k)
+                results.append([(int(rows[i]), float(scores[i])) for i in best])
+            return results
+
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, n, SEARCH_BLOCK_ROWS):
+            block = np.asarray(vectors[start:min(n, start + SEARCH_BLOCK_ROWS)])
+            scores = queries @ block.T                      # (queries, block rows)
+            local = _top_k(scores, k)
+            rows = np.concatenate([best_rows, local + start], axis=1)
+            merged = np.concatenate([best_scores, np.take_along_axis(scores, local, axis=1)], axis=1)
+            keep = _top_k(merged, k)
+            best_rows = np.take_along_axis(rows, keep, axis=1)
+            best_scores = np.take_along_axis(merged, keep, axis=1)
+        return [[(int(r), float(s)) for r, s in zip(rows, scores)] for rows, scores in zip(best_rows, best_scores)]
+
+    def search(self, query: str, k: int = 5, approximate: Optional[bool] = None,
+               kind: Optional[str] = None, min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """Stored texts most similar to `query`, best first"""
+        hits = self.search_vectors(self.embedder.embed([query]), k * 4 if kind else k, approximate)[0]
+        if not hits:
+            return []
+        with self._lock:
+            rows = {
+                row: (kind_, source, task, text, created)
+                for row, kind_, source, task, text, created in self._db.execute(
+                    f"SELECT row, kind, source, task, text, created FROM items WHERE row IN ({','.join('?' * len(hits))})",
+                    [row for row, _ in hits]
+                )
+            }
+        results = []
+        for row, score in hits:
+            kind_, source, task, text, created = rows[row]
+            if (kind and kind_ != kind) or score <= min_score:
+                continue
+            results.append({"row": row, "score": round(score, 4), "kind": kind_, "source": source,
+                            "task": task, "text": text, "age_hours": round((time.time() - created) / 3600, 1)})
+        return results[:k]
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._db.close()
+
+
+_memory: Optional[VectorMemory] = None
+
+
+def get_memory() -> VectorMemory:
+    """The process-wide vector memory (AGENT_MEMORY_DIR, default cache/vector_memory)"""
+    global _memory
+    if _memory is None:
+        _memory = VectorMemory(os.getenv("AGENT_MEMORY_DIR", DEFAULT_MEMORY_DIR))
+    return _memory
+
+
+def recall_memory(query: str, k: int = 5) -> Dict[str, Any]:
+    """
+    Recall research notes, answers and code from earlier runs that are semantically
+    similar to `query` (local, no network). Use it before starting work from scratch.
+    """
+    try:
+        started = time.perf_counter()
+        results = get_memory().search(query, k=k, min_score=0.05)
+        for result in results:
+            result["text"] = result["text"][:800]
+        return {"results": results, "count": len(results), "took_ms": round((time.perf_counter() - started) * 1000, 2)}
+    except Exception as e:
+        return {"error": str(e), "results": []}
+
+
+def _passages(text: str, size: int = 1200) -> List[str]:
+    """Split long text on paragraph boundaries into passages of about `size` chars"""
+    passages, current = [], ""
+    for paragraph in text.split("\n\n"):
+        if current and len(current) + len(paragraph) > size:
+            passages.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        passages.append(current)
+    return passages
+
+
+def remember_run(task: str, messages: Sequence[Any], agents: Sequence[str] = ("Researcher", "Coder", "Synthesizer")) -> int:
+    """Store the text replies of `agents` from a team run; code blocks are stored whole as kind "code"."""
+    memory = get_memory()
+    stored = 0
+    for message in messages:
+        if str(message.source) not in agents or not isinstance(message.content, str):
+            continue
+        code = re.findall(r"```(?:python)?\n(.*?)```", message.content, flags=re.S)
+        prose = re.sub(r"```.*?```", "", message.content, flags=re.S)
+        kind = "answer" if "FINAL ANSWER:" in prose else "research"
+        stored += len(memory.add(_passages(prose), kind=kind, source=str(message.source), task=task))
+        stored += len(memory.add(code, kind="code", source=str(message.source), task=task))
+    memory.flush()
+    return stored
+
+
+# ---------------------------------------------------------------------------
+# Benchmark: query latency against corpus size
+# ---------------------------------------------------------------------------
+
+
+def benchmark(sizes: Sequence[int] = (10_000, 50_000, 200_000), dim: int = 256, queries: int = 50) -> None:
+    import shutil
+    import tempfile
+
+    print("\n" + "="*80)
+    print(f"🧠 VECTOR MEMORY BENCHMARK (dim {dim}, {queries} queries, k=10)")
+    print("="*80 + "\n")
+    print(f"{'corpus':>9} {'exact p50':>11} {'batched/q':>11} {'ivf p50':>9} {'recall@10':>10} {'ivf build':>10}")
+    rng = np.random.default_rng(0)
+    for size in sizes:
+        root = tempfile.mkdtemp(prefix="vector_memory_")
+        try:
+            memory = VectorMemory(root, dim=dim)
+            # Clustered unit vectors, like topics in real transcripts
+            centers = rng.standard_normal((max(16, size // 500), dim)).astype(np.float32)
+            for start in range(0, size, 50_000):
+                rows = min(50_000, size - start)
+                vectors = centers[rng.integers(0, len(centers), rows)] + 0.6 * rng.standard_normal((rows, dim)).astype(np.float32)
+                vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+                memory.add_vectors(vectors, [{"text": ""}] * rows)
+            probe = centers[rng.integers(0, len(centers), queries)] + 0.6 * rng.standard_normal((queries, dim)).astype(np.float32)
+            probe /= np.linalg.norm(probe, axis=1, keepdims=True)
+
+            exact_ms, exact = [], []
+            for query in probe:
+                started = time.perf_counter()
+                exact.append(memory.search_vectors(query[None, :], k=10, approximate=False)[0])
+                exact_ms.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            memory.search_vectors(probe, k=10, approximate=False)
+            batched_ms = (time.perf_counter() - started) * 1000 / queries
+
+            started = time.perf_counter()
+            memory.build_ivf()
+            build_s = time.perf_counter() - started
+            ivf_ms, recall = [], []
+            for query, truth in zip(probe, exact):
+                started = time.perf_counter()
+                approx = memory.search_vectors(query[None, :], k=10, approximate=True)[0]
+                ivf_ms.append((time.perf_counter() - started) * 1000)
+                recall.append(len({r for r, _ in approx} & {r for r, _ in truth}) / len(truth))
+            memory.close()
+            print(f"{size:>9} {np.median(exact_ms):>9.2f}ms {batched_ms:>9.2f}ms {np.median(ivf_ms):>7.2f}ms "
+                  f"{np.mean(recall):>10.2f} {build_s:>9.1f}s")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+    print()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        print(json.dumps(recall_memory(" ".join(sys.argv[1:])), indent=2))
+    else:
+        benchmark()
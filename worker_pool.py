@@ -0,0 +1,103 @@
+"""
+AutoGen Core - Load-Aware Worker Pool
+Spreads messages for one agent type across N instances (agent keys)
+"""
+
+from typing import Any, Dict, List, Optional
+
+from autogen_core import AgentId, CancellationToken
+
+
+class WorkerPool:
+    """
+    N instances of one registered agent type, addressed as AgentId(type, "<prefix>-<i>").
+
+    The runtime creates each instance lazily from the type's factory the first
+    time its key is used, so the pool only has to choose keys:
+
+    - messages go to the instance with the fewest outstanding requests
+      (ties go to the one that has served the fewest messages);
+    - a `session_key` pins a conversation to one instance while it is in the pool;
+    - `grow()` / `shrink()` change the size at runtime. Retired instances stop
+      receiving new work, finish what they have, and their sessions move on.
+
+    `sender` is anything with `send_message(message, recipient, cancellation_token=...)`:
+    a RoutedAgent (inside a handler) or the runtime itself.
+    """
+
+    def __init__(self, agent_type: str, size: int = 2, prefix: str = "w") -> None:
+        if size < 1:
+            raise ValueError("WorkerPool needs at least one instance")
+        self.agent_type = agent_type
+        self._prefix = prefix
+        self._next_index = 0
+        self._keys: List[str] = []
+        self._outstanding: Dict[str, int] = {}
+        self._served: Dict[str, int] = {}
+        self._sessions: Dict[str, str] = {}
+        self.grow(size)
+
+    @property
+    def size(self) -> int:
+        return len(self._keys)
+
+    def grow(self, count: int = 1) -> List[str]:
+        """Add `count` instances; returns the new keys"""
+        added = []
+        for _ in range(count):
+            key = f"{self._prefix}-{self._next_index}"
+            self._next_index += 1
+            self._keys.append(key)
+            self._outstanding.setdefault(key, 0)
+            self._served.setdefault(key, 0)
+            added.append(key)
+        return added
+
+    def shrink(self, count: int = 1) -> List[str]:
+        """Retire up to `count` of the least-busy instances, always keeping one"""
+        count = max(0, min(count, len(self._keys) - 1))
+        sticky = list(self._sessions.values())
+        # Prefer idle instances without pinned sessions, newest first
+        retired = sorted(
+            self._keys,
+            key=lambda k: (self._outstanding[k], sticky.count(k), -self._keys.index(k))
+        )[:count]
+        for key in retired:
+            self._keys.remove(key)
+        self._sessions = {s: k for s, k in self._sessions.items() if k in self._keys}
+        return retired
+
+    def pick(self, session_key: Optional[str] = None) -> AgentId:
+        """Choose the instance for the next message"""
+        if session_key is not None and session_key in self._sessions:
+            return AgentId(self.agent_type, self._sessions[session_key])
+        key = min(self._keys, key=lambda k: (self._outstanding[k], self._served[k]))
+        if session_key is not None:
+            self._sessions[session_key] = key
+        return AgentId(self.agent_type, key)
+
+    async def send(
+        self,
+        sender: Any,
+        message: Any,
+        session_key: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None
+    ) -> Any:
+        """Route `message` to the least-loaded (or sticky) instance and await its reply"""
+        agent_id = self.pick(session_key)
+        self._outstanding[agent_id.key] += 1
+        try:
+            return await sender.send_message(message, agent_id, cancellation_token=cancellation_token)
+        finally:
+            self._outstanding[agent_id.key] -= 1
+            self._served[agent_id.key] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-instance load, for logs and autoscaling decisions"""
+        return {
+            "agent_type": self.agent_type,
+            "size": self.size,
+            "outstanding": {k: self._outstanding[k] for k in self._keys},
+            "served": {k: self._served[k] for k in self._keys},
+            "sessions": len(self._sessions)
+        }